@@ -0,0 +1,4 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+pytest_plugins = ["cpu.tests.bench_plugin"]
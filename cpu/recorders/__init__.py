@@ -0,0 +1,18 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+from .columnar_recorder import ColumnarRecorder
+from .streaming_recorder import (
+    StreamingRecorder,
+    read_recording,
+    recording_columns,
+    write_recording,
+)
+
+__all__ = [
+    "ColumnarRecorder",
+    "StreamingRecorder",
+    "read_recording",
+    "recording_columns",
+    "write_recording",
+]
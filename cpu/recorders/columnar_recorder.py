@@ -0,0 +1,207 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import copy
+import threading
+from numbers import Complex, Integral, Real
+
+import numpy as np
+import pandas as pd
+from cosapp.core.execution import ExecutionType
+from cosapp.recorders.recorder import BaseRecorder
+
+
+def column_dtype(value):
+    """Return the buffer dtype and row shape used to store `value`."""
+    if isinstance(value, (bool, np.bool_)):
+        return np.bool_, ()
+    if isinstance(value, Integral):
+        return np.int64, ()
+    if isinstance(value, Real):
+        return np.float64, ()
+    if isinstance(value, Complex):
+        return np.complex128, ()
+    if isinstance(value, np.ndarray) and np.issubdtype(value.dtype, np.number):
+        return value.dtype, value.shape
+    return object, ()
+
+
+class ColumnarRecorder(BaseRecorder):
+    """Record data into preallocated, typed NumPy columns.
+
+    Each recorded variable gets its own buffer, typed from its first recorded value
+    (8 bytes per step for a float), which is written in place at every step and grown
+    by doubling its capacity. Non numerical values fall back to object columns. In
+    multithreading execution, rows are appended under a lock.
+
+    Parameters
+    ----------
+    includes : str or list of str, optional
+        Variables matching these patterns will be included; default `'*'` (i.e. all
+        variables).
+    excludes : str or list of str or None, optional
+        Variables matching these patterns will be excluded; default `None` (i.e. nothing is
+        excluded).
+    numerical_only : bool, optional
+        Keep only numerical variables (i.e. number or numerical vector); default False.
+    section : str, optional
+        Current section name; default `''`.
+    precision : int, optional
+        Precision digits when writing floating point number; default 9.
+    hold : bool, optional
+        Append the new data or not; default `False`.
+    raw_output : bool, optional
+        Raw output; default `True`.
+    chunk_size : int, optional
+        Initial number of rows allocated for each column; default 1024.
+    """
+
+    def __init__(
+        self,
+        includes="*",
+        excludes=None,
+        numerical_only=False,
+        section="",
+        precision=9,
+        hold=False,
+        raw_output=True,
+        chunk_size=1024,
+    ):
+        super().__init__(includes, excludes, numerical_only, section, precision, hold, raw_output)
+        self.chunk_size = chunk_size
+        self._size = 0
+        self._specials = []
+        self._columns = []
+        self._lock = None
+
+    @classmethod
+    def extend(cls, recorder, includes=None, excludes=None):
+        """Return a new recorder similar to `recorder`, with extended `includes` and `excludes`."""
+        new = super().extend(recorder, includes, excludes)
+        new.chunk_size = recorder.chunk_size
+        return new
+
+    def _allocate(self, line):
+        capacity = self.chunk_size
+        self._specials = [np.empty(capacity, dtype=object) for _ in range(4)]
+        self._columns = []
+        for value in line[4:]:
+            dtype, shape = column_dtype(value)
+            self._columns.append(np.empty((capacity, *shape), dtype=dtype))
+
+    def _grow(self):
+        def grown(buffer):
+            new = np.empty((2 * len(buffer), *buffer.shape[1:]), dtype=buffer.dtype)
+            new[: self._size] = buffer[: self._size]
+            return new
+
+        self._specials = [grown(buffer) for buffer in self._specials]
+        self._columns = [grown(buffer) for buffer in self._columns]
+
+    def _record(self, line):
+        if self._lock is None:
+            self._append(line)
+        else:
+            with self._lock:
+                self._append(line)
+
+    def _append(self, line):
+        if not self._columns and not self._specials:
+            self._allocate(line)
+        elif self._size == len(self._specials[0]):
+            self._grow()
+
+        row = self._size
+        for buffer, value in zip(self._specials, line[:4]):
+            buffer[row] = value
+        for i, value in enumerate(line[4:]):
+            buffer = self._columns[i]
+            if buffer.dtype.kind == "i" and not isinstance(value, Integral):
+                # Integer column receiving a non-integer value
+                self._columns[i] = buffer = self._widen(buffer, value)
+            try:
+                buffer[row] = value
+                stored = buffer.dtype.kind != "b" or np.array_equal(buffer[row], value)
+            except (TypeError, ValueError):
+                stored = False
+            if not stored:
+                # Type or shape change: fall back to an object column
+                self._columns[i] = buffer = self._widen(buffer, None)
+                buffer[row] = copy.deepcopy(value)
+        self._size += 1
+
+    def _widen(self, buffer, value):
+        """Return a copy of `buffer` able to store `value`, either as float or as object."""
+        if isinstance(value, Real) and not isinstance(value, (bool, np.bool_)):
+            return buffer.astype(np.float64)
+        column = np.empty(len(buffer), dtype=object)
+        column[: self._size] = list(buffer[: self._size])
+        return column
+
+    def _batch_record(self, lines):
+        for line in lines:
+            self._record(line)
+
+    def formatted_data(self):
+        """Collect recorded data from watched object into a list."""
+        return self.collected_data()
+
+    def _headers(self):
+        specials = self.SPECIALS
+        headers = [specials.section, specials.status, specials.code, specials.reference]
+        varlist = self.field_names()
+        if self._raw_output:
+            headers.extend(varlist)
+        else:
+            headers.extend(f"{v} [{u}]" for v, u in zip(varlist, self._get_units(varlist)))
+        return headers
+
+    @property
+    def data(self):
+        """pandas.DataFrame: View of the recorded columns, without copy."""
+        n = self._size
+        columns = {}
+        for name, buffer in zip(self._headers(), self._specials + self._columns):
+            view = buffer[:n]
+            columns[name] = view if view.ndim == 1 else list(view)
+        return pd.DataFrame(columns, copy=False)
+
+    def export_data(self):
+        """Export recorded results into a pandas.DataFrame object."""
+        return self.data.copy()
+
+    @property
+    def _raw_data(self):
+        """Return a raw/unformatted version of records."""
+        buffers = self._specials + self._columns
+        return [[buffer[row] for buffer in buffers] for row in range(self._size)]
+
+    def start(self):
+        """Initialize recording support."""
+        super().start()
+        if not self.hold:
+            self._size = 0
+
+    def _enable_parallel_execution(self, exec_type, _):
+        """Enable the use of this recorder in parallel execution.
+
+        Threads share the buffers, so rows are appended under a lock; in multiprocessing,
+        each process records into its own copy.
+        """
+        if exec_type == ExecutionType.MULTI_THREADING:
+            self._lock = threading.RLock()
+
+    def _disable_parallel_execution(self, exec_type, chunk_id):
+        """Disable the use of this recorder in parallel execution."""
+        self._lock = None
+
+    def exit(self):
+        """Close recording session."""
+        pass
+
+    def clear(self):
+        """Clear all previously stored data."""
+        self._size = 0
+        self._specials = []
+        self._columns = []
+        super().clear()
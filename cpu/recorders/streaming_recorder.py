@@ -0,0 +1,260 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from cosapp.utils.find_variables import make_wishlist
+
+from .columnar_recorder import ColumnarRecorder
+
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def recording_columns(filename):
+    """Return the column names of a recording file, without reading its data."""
+    filename = Path(filename)
+    suffix = filename.suffix.lower()
+    if suffix == ".parquet":
+        return pq.read_schema(filename).names
+    if suffix in ARROW_SUFFIXES:
+        with pa.memory_map(str(filename)) as source:
+            return pa.ipc.open_file(source).schema.names
+    return list(pd.read_csv(filename, nrows=0).columns)
+
+
+def read_recording(filename, columns=None):
+    """Read a recording into a pandas.DataFrame, keeping only `columns` if given.
+
+    Parquet and Arrow IPC files are memory-mapped and only the requested columns are
+    read; other files are read as CSV.
+
+    Parameters
+    ----------
+    filename : str or Path
+        Recording file (`.parquet`, `.arrow`, `.feather`, `.ipc` or CSV).
+    columns : list of str, optional
+        Columns to read; default `None` reads all columns.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Recorded data.
+    """
+    filename = Path(filename)
+    suffix = filename.suffix.lower()
+    if suffix == ".parquet":
+        return pq.read_table(filename, columns=columns, memory_map=True).to_pandas()
+    if suffix in ARROW_SUFFIXES:
+        with pa.memory_map(str(filename)) as source:
+            table = pa.ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select(columns)
+            return table.to_pandas()
+    return pd.read_csv(filename, usecols=columns)
+
+
+def write_recording(data, filename):
+    """Write a pandas.DataFrame to a Parquet, Arrow IPC or CSV file, given its suffix.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Data to write; the index is not written.
+    filename : str or Path
+        Output file (`.parquet`, `.arrow`, `.feather`, `.ipc` or CSV).
+    """
+    filename = Path(filename)
+    suffix = filename.suffix.lower()
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    if suffix == ".parquet":
+        pq.write_table(pa.Table.from_pandas(data, preserve_index=False), filename)
+    elif suffix in ARROW_SUFFIXES:
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        with pa.ipc.new_file(str(filename), table.schema) as writer:
+            writer.write_table(table)
+    else:
+        data.to_csv(filename, index=False)
+
+
+class StreamingRecorder(ColumnarRecorder):
+    """Record data into a Parquet or Arrow IPC file, in chunks written during the run.
+
+    Rows are buffered in typed columns (see `ColumnarRecorder`) and written to the file
+    each time `chunk_size` rows are collected, so memory stays bounded whatever the run
+    length. The file format is given by its suffix: `.parquet`, or `.arrow`, `.feather`
+    and `.ipc` for Arrow IPC. Numbers are written as float64 to keep the chunk schema
+    stable. The file is finalized at the end of the run or, if `hold` is `True`, by
+    `close`, also called when reading data back. Rows recorded after a read are appended
+    by rewriting the file with the rows already written, so reads during a long run should
+    stay occasional; a file this recorder did not write cannot be appended.
+
+    Parameters
+    ----------
+    filename : str or Path
+        Output file.
+    includes : str or list of str, optional
+        Variables matching these patterns will be included; default `'*'` (i.e. all
+        variables).
+    excludes : str or list of str or None, optional
+        Variables matching these patterns will be excluded; default `None` (i.e. nothing is
+        excluded).
+    numerical_only : bool, optional
+        Keep only numerical variables (i.e. number or numerical vector); default False.
+    section : str, optional
+        Current section name; default `''`.
+    precision : int, optional
+        Precision digits when writing floating point number; default 9.
+    hold : bool, optional
+        Append the new data or not; default `False`.
+    raw_output : bool, optional
+        Raw output; default `True`.
+    chunk_size : int, optional
+        Number of rows written at once; default 65536.
+    """
+
+    def __init__(
+        self,
+        filename,
+        includes="*",
+        excludes=None,
+        numerical_only=False,
+        section="",
+        precision=9,
+        hold=False,
+        raw_output=True,
+        chunk_size=65536,
+    ):
+        super().__init__(
+            includes, excludes, numerical_only, section, precision, hold, raw_output, chunk_size
+        )
+        self.filename = Path(filename)
+        self._writer = None
+        self._schema = None
+        self._written = False
+
+    @classmethod
+    def extend(cls, recorder, includes=None, excludes=None):
+        """Return a new recorder similar to `recorder`, with extended `includes` and `excludes`."""
+        new = cls(
+            recorder.filename,
+            recorder.includes + make_wishlist(includes, "includes"),
+            recorder.excludes + make_wishlist(excludes, "excludes"),
+            recorder._numerical_only,
+            recorder.section,
+            recorder.precision,
+            recorder.hold,
+            recorder._raw_output,
+            recorder.chunk_size,
+        )
+        new.watched_object = recorder.watched_object
+        return new
+
+    def _append(self, line):
+        super()._append(line)
+        if self._size == self.chunk_size:
+            self.flush()
+
+    def _table(self):
+        n = self._size
+        arrays = {}
+        for name, buffer in zip(self._headers(), self._specials + self._columns):
+            view = buffer[:n]
+            if buffer.dtype.kind in "iuf":
+                view = view.astype(np.float64, copy=False)
+            if view.ndim > 1 or buffer.dtype == object:
+                view = list(view)
+            arrays[name] = pa.array(view)
+        return pa.table(arrays)
+
+    def flush(self):
+        """Write buffered rows to the file."""
+        if self._size == 0:
+            return
+        table = self._table()
+        if self._writer is None:
+            if not self.filename.exists():
+                self.filename.parent.mkdir(parents=True, exist_ok=True)
+                self._schema = table.schema
+                self._open()
+            elif self._written:
+                self._reopen()
+            else:
+                raise RuntimeError(f"Cannot append to finalized recording {self.filename}")
+        self._writer.write_table(table.cast(self._schema))
+        self._written = True
+        self._size = 0
+
+    def _open(self):
+        if self.filename.suffix.lower() in ARROW_SUFFIXES:
+            self._writer = pa.ipc.new_file(str(self.filename), self._schema)
+        else:
+            self._writer = pq.ParquetWriter(str(self.filename), self._schema)
+
+    def _reopen(self):
+        """Open a new writer on the finalized file, copying its rows batch by batch."""
+        previous = self.filename.with_name(f"{self.filename.name}.part")
+        self.filename.replace(previous)
+        self._open()
+        if self.filename.suffix.lower() in ARROW_SUFFIXES:
+            with pa.memory_map(str(previous)) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    self._writer.write_batch(reader.get_batch(i))
+        else:
+            for batch in pq.ParquetFile(previous).iter_batches():
+                self._writer.write_table(pa.Table.from_batches([batch], self._schema))
+        previous.unlink()
+
+    def close(self):
+        """Write buffered rows and finalize the file."""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def start(self):
+        """Initialize recording support."""
+        super().start()
+        if not self.hold:
+            self.close()
+            self.filename.unlink(missing_ok=True)
+            self._written = False
+
+    def exit(self):
+        """Close recording session."""
+        if self.hold:
+            self.flush()
+        else:
+            self.close()
+
+    def read(self, columns=None):
+        """Read recorded data, keeping only `columns` if given."""
+        self.close()
+        if not self.filename.exists():
+            return pd.DataFrame(columns=self._headers())
+        return read_recording(self.filename, columns)
+
+    @property
+    def data(self):
+        """pandas.DataFrame: Recorded data, read back from the file."""
+        return self.read()
+
+    def export_data(self):
+        """Export recorded results into a pandas.DataFrame object."""
+        return self.read()
+
+    @property
+    def _raw_data(self):
+        """Return a raw/unformatted version of records."""
+        return self.read().values.tolist()
+
+    def clear(self):
+        """Clear all previously stored data."""
+        self.close()
+        self.filename.unlink(missing_ok=True)
+        self._written = False
+        super().clear()
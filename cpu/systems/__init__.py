@@ -5,6 +5,7 @@ from .parametric_blade_geometry import ParametricBladeGeometry  # isort:skip
 
 from .casing_geometry import CasingGeometry
 from .cpu import CPU
+from .cpu_surrogate import CPUSurrogate
 from .fan import Fan
 from .fancontroller import FanController
 from .heatexchanger import HeatExchanger
@@ -17,6 +18,7 @@ __all__ = [
     "ParametricBladeGeometry",
     "CPU",
     "CPUSystem",
+    "CPUSurrogate",
     "Fan",
     "FanController",
     "HeatExchanger",
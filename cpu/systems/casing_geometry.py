@@ -5,11 +5,7 @@ from math import cos, pi
 
 import numpy as np
 from cosapp.systems import System
-from OCC.Core.BRepBuilderAPI import (
-    BRepBuilderAPI_MakeEdge,
-    BRepBuilderAPI_MakeFace,
-    BRepBuilderAPI_Transform,
-)
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeEdge, BRepBuilderAPI_MakeFace
 from OCC.Core.BRepLib import breplib
 from OCC.Core.Geom import Geom_CylindricalSurface
 from pyoccad.create import (
@@ -20,7 +16,6 @@ from pyoccad.create import (
     CreateLine,
     CreatePlane,
     CreatePoint,
-    CreateRotation,
     CreateTopology,
     CreateUnsignedCoordSystem,
     CreateVector,
@@ -28,6 +23,9 @@ from pyoccad.create import (
 )
 from pyoccad.transform import Sweep
 
+from cpu.utils.geometry_cache import cached_compute
+from cpu.utils.instancing import rotated_instances
+
 
 class CasingGeometry(System):
     """Casing geometry system."""
@@ -52,14 +50,21 @@ class CasingGeometry(System):
         self.add_inward("clearance_ratio", 0.01, unit="")
         self.add_inward("min_clearance", 0.002, unit="m")
 
+        self.add_inward("instanced", True, desc="Struts and holes share a single B-rep")
+        self.add_inward("metrics_only", False, desc="Only compute sizes, without building shapes")
+
         self.add_outward("width", 0.1, unit="m")
         self.add_outward("height", 0.1, unit="m")
         self.add_outward("geometry", None)
 
+    @cached_compute
     def compute(self):
         clearance = max(self.clearance_ratio * self.blade_tip_radius, self.min_clearance)
         thickness = max(self.thickness_ratio * self.blade_tip_radius, self.min_thickness)
         size = self.width = self.height = self.blade_tip_radius + thickness + clearance
+        if self.metrics_only:
+            self.geometry = None
+            return
 
         struts_width = max(self.struts_width_ratio * self.blade_tip_radius, self.struts_min_width)
         struts_thickness = max(
@@ -103,10 +108,7 @@ class CasingGeometry(System):
             0.004, (x0 + e * 3.0 / 8, sw - 0.015, st - 0.015), CreateVector.ox()
         )
         wh = CreateWire.from_element(hole)
-        holes = []
-        for i in range(4):
-            trsf = BRepBuilderAPI_Transform(wh, CreateRotation.rotation_x(pi / 2.0 * i))
-            holes.append(trsf.Shape().Reversed())
+        holes = [w.Reversed() for w in rotated_instances(wh, 4, pi / 2.0, instanced=self.instanced)]
 
         f2 = face_from_wires(
             CreatePlane.ypz((x0 + e * 3.0 / 8.0, 0.0, 0.0)), w1, w4.Reversed(), *holes
@@ -154,10 +156,7 @@ class CasingGeometry(System):
         strut = CreateLine.between_2_points((x0, istart, istart), (x0, iend, iend))
         strut = Sweep.profiles_along_path((w1, w2), strut)
 
-        struts = []
-        for i in range(4):
-            trsf = BRepBuilderAPI_Transform(strut, CreateRotation.rotation_x(pi / 2.0 * i))
-            struts.append(trsf.Shape())
+        struts = rotated_instances(strut, 4, pi / 2.0, instanced=self.instanced)
 
         circ = CreateCircle.from_radius_and_axis(
             hub_radius, CreateAxis.as_axis(((x0, 0.0, 0.0), (1.0, 0.0, 0.0)))
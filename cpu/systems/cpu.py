@@ -26,7 +26,12 @@ class CPU(System):
         self.add_outward("next_T")
 
     def compute(self):
-        self.power = self.tdp * self.usage / 100.0
+        self.power = thermal_power(self.usage, self.tdp)
         self.heat_flow_balance = self.power - self.heat_flow
 
         self.next_T = (self.heat_flow_balance / self.heat_capacity) + self.T
+
+
+def thermal_power(usage, tdp):
+    """Return the thermal power generated at `usage` percent, elementwise on arrays."""
+    return tdp * usage / 100.0
@@ -0,0 +1,41 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+from cosapp.systems import System
+
+
+def surrogate_variable(name):
+    """Return the `CPUSurrogate` variable name standing for `CPUSystem` variable `name`."""
+    return name.replace(".", "_")
+
+
+class CPUSurrogate(System):
+    """Approximate `CPUSystem` outputs with a fitted `PolynomialSurrogate`.
+
+    Inputs and outputs of the surrogate are exposed as inwards and outwards named after
+    the `CPUSystem` variables, dots replaced by underscores (e.g. `fan_T_air`), so the
+    system can stand for `CPUSystem` as a child or as a driver target.
+    """
+
+    def setup(self, model):
+        self.add_property("model", model)
+
+        # inputs
+        lower, upper = model.domain
+        for name, value in zip(model.inputs, 0.5 * (lower + upper)):
+            self.add_inward(surrogate_variable(name), float(value), desc=f"Surrogate of {name}")
+
+        # outputs
+        for name in model.outputs:
+            self.add_outward(surrogate_variable(name), 0.0, desc=f"Surrogate of {name}")
+        self.add_outward("in_domain", True, desc="All inputs lie in the validity domain")
+
+    def compute(self):
+        values = {name: self[surrogate_variable(name)] for name in self.model.inputs}
+        shape = np.broadcast(*values.values()).shape
+
+        predicted = self.model.predict_array(values)
+        for name, column in zip(self.model.outputs, predicted.T):
+            self[surrogate_variable(name)] = column.reshape(shape)[()]
+        self.in_domain = bool(np.all(self.model.in_domain(values)))
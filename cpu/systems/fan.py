@@ -21,7 +21,12 @@ class Fan(System):
         self.add_output(FluidPort, "fl_out")
 
     def compute(self):
-        self.fl_out.mass_flow = (
-            self.mass_flow_scalar * self.mass_flow_max * self.tension / self.design_tension
+        self.fl_out.mass_flow = fan_mass_flow(
+            self.tension, self.design_tension, self.mass_flow_max, self.mass_flow_scalar
         )
         self.fl_out.T = self.T_air
+
+
+def fan_mass_flow(tension, design_tension, mass_flow_max, mass_flow_scalar):
+    """Return the air mass flow delivered by the fan, elementwise on arrays."""
+    return mass_flow_scalar * mass_flow_max * tension / design_tension
@@ -5,6 +5,8 @@ from cosapp.systems import System
 from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Transform
 from pyoccad.create import CreateScaling, CreateTopology
 
+from cpu.utils.geometry_cache import cached_compute
+
 from ..ports import GeomPort
 from ..systems import CasingGeometry, RotorGeometry
 
@@ -13,13 +15,19 @@ class FanGeometry(System):
     """Fan geometry system."""
 
     def setup(self):
-        rotor = self.add_child(RotorGeometry("rotor"), pulling=["tip_radius", "hub_to_tip_ratio"])
+        rotor = self.add_child(
+            RotorGeometry("rotor"), pulling=["tip_radius", "hub_to_tip_ratio", "metrics_only"]
+        )
         casing = self.add_child(CasingGeometry("casing"))
 
         self.connect(
             rotor.inwards,
             casing.inwards,
-            {"tip_radius": "blade_tip_radius", "hub_to_tip_ratio": "blade_hub_to_tip_ratio"},
+            {
+                "tip_radius": "blade_tip_radius",
+                "hub_to_tip_ratio": "blade_hub_to_tip_ratio",
+                "metrics_only": "metrics_only",
+            },
         )
         self.connect(rotor.outwards, casing.inwards, ["blade_position", "blade_dimension"])
 
@@ -27,7 +35,12 @@ class FanGeometry(System):
 
         self.add_output(GeomPort, "geometry")
 
+    @cached_compute
     def compute(self):
+        if self.metrics_only:
+            self.geometry.shape = None
+            return
+
         geom = CreateTopology.make_compound(self.rotor.geometry, self.casing.geometry)
         self.geometry.shape = BRepBuilderAPI_Transform(
             geom, CreateScaling.from_factor(self.factor)
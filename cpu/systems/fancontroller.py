@@ -1,6 +1,7 @@
 # Copyright (C) 2024, twiinIT
 # SPDX-License-Identifier: Apache-2.0
 
+import numpy as np
 from cosapp.systems import System
 
 
@@ -24,9 +25,26 @@ class FanController(System):
         self.add_outward("tension", 0.0, unit="V", desc="Output tension")
 
     def compute(self):
-        if self.T_cpu <= self.low_threshold:
-            self.tension = self.low_tension
-        elif self.T_cpu <= self.high_threshold:
-            self.tension = self.medium_tension
-        else:
-            self.tension = self.max_tension
+        self.tension = tension_schedule(
+            self.T_cpu,
+            self.low_threshold,
+            self.high_threshold,
+            self.low_tension,
+            self.medium_tension,
+            self.max_tension,
+        )
+
+
+def tension_schedule(
+    T_cpu, low_threshold, high_threshold, low_tension, medium_tension, max_tension
+):
+    """Return the fan tension for one or many CPU temperatures.
+
+    Thresholds are inclusive upper bounds of the low and medium levels; scalar inputs give
+    a scalar, array inputs are evaluated elementwise.
+    """
+    return np.where(
+        T_cpu <= low_threshold,
+        low_tension,
+        np.where(T_cpu <= high_threshold, medium_tension, max_tension),
+    )[()]
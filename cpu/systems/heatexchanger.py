@@ -1,6 +1,7 @@
 # Copyright (C) 2024, twiinIT
 # SPDX-License-Identifier: Apache-2.0
 
+import numpy as np
 from cosapp.systems import System
 
 from cpu.ports import FluidPort
@@ -28,12 +29,18 @@ class HeatExchanger(System):
         self.add_outward("h", 110.0, unit="W/(K*m**2)", desc="Heat conductivity")
 
     def compute(self):
-        self.h = (
-            self.h_natural
-            + self.h_forced * min(self.fl_in.mass_flow / self.max_mass_flow, 1.0)
-            + self.h_adder
+        self.h = heat_conductivity(
+            self.fl_in.mass_flow, self.max_mass_flow, self.h_natural, self.h_forced, self.h_adder
         )
         self.heat_flow = self.h * (self.T_cpu - self.fl_in.T) * self.surface
 
         self.fl_out.mass_flow = self.fl_in.mass_flow
         self.fl_out.T = self.fl_in.T + self.heat_flow / self.cp
+
+
+def heat_conductivity(mass_flow, max_mass_flow, h_natural, h_forced, h_adder):
+    """Return the exchanger heat conductivity, elementwise on arrays.
+
+    The forced convection contribution saturates once `mass_flow` reaches `max_mass_flow`.
+    """
+    return h_natural + h_forced * np.minimum(mass_flow / max_mass_flow, 1.0) + h_adder
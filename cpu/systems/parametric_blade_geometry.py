@@ -22,6 +22,9 @@ from pyoccad.measure import MeasureCurve
 from pyoccad.measure.shape import bounds
 from pyoccad.transform import Sweep, Translate
 
+from cpu.utils.blade_metrics import blade_metrics
+from cpu.utils.geometry_cache import cached_compute
+
 
 class ParametricBladeGeometry(System):
     """Parametric blade geometry system."""
@@ -44,6 +47,9 @@ class ParametricBladeGeometry(System):
 
         self.add_inward("stacking_parameter", 0.0, unit="")
         self.add_inward("stacking_angle", 0.0, unit="deg")
+        self.add_inward(
+            "metrics_only", False, desc="Only compute metrics, without building the blade solid"
+        )
 
         self.add_outward("stagger_angle", 0.0, unit="deg")
         self.add_outward("dimension", np.empty(3), unit="m")
@@ -51,7 +57,27 @@ class ParametricBladeGeometry(System):
         self.add_outward("backbone", None)
         self.add_outward("geometry", None)
 
+    @cached_compute
     def compute(self):
+        if self.metrics_only:
+            metrics = blade_metrics(
+                self.inlet_angle,
+                self.exit_angle,
+                self.max_thickness_ratio,
+                self.max_thickness_position,
+                self.height_over_chord,
+                self.tip_radius,
+                self.hub_to_tip_ratio,
+                self.leading_tension,
+                self.trailing_tension,
+                self.stacking_parameter,
+            )
+            self.stagger_angle = float(metrics["stagger_angle"])
+            self.position = metrics["position"]
+            self.dimension = metrics["dimension"]
+            self.backbone = None
+            self.geometry = None
+            return
 
         hub_radius = self.tip_radius * self.hub_to_tip_ratio
         mean_radius = self.tip_radius * (1.0 + self.hub_to_tip_ratio) / 2.0
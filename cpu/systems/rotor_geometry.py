@@ -1,23 +1,16 @@
 # Copyright (C) 2024, twiinIT
 # SPDX-License-Identifier: Apache-2.0
 
-from math import pi
-
 from cosapp.systems import System
 from OCC.Core.BRep import BRep_Tool
-from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Transform
 from OCC.Core.BRepOffsetAPI import BRepOffsetAPI_MakeThickSolid
 from OCC.Core.Geom import Geom_Plane
-from pyoccad.create import (
-    CreateAxis,
-    CreateCircle,
-    CreateCylinder,
-    CreateOCCList,
-    CreateRotation,
-    CreateTopology,
-)
+from pyoccad.create import CreateAxis, CreateCircle, CreateCylinder, CreateOCCList, CreateTopology
 from pyoccad.explore import ExploreSubshapes
 
+from cpu.utils.geometry_cache import cached_compute, cached_function
+from cpu.utils.instancing import rotated_instances
+
 from ..systems import ParametricBladeGeometry
 
 
@@ -32,45 +25,59 @@ class RotorGeometry(System):
                 "hub_to_tip_ratio": "hub_to_tip_ratio",
                 "position": "blade_position",
                 "dimension": "blade_dimension",
+                "metrics_only": "metrics_only",
             },
         )
 
         self.add_inward("count", 2)
         self.add_inward("thickness", 1e-3, unit="m")
+        self.add_inward("instanced", True, desc="Blades share the B-rep of the first one")
         self.add_outward("geometry", None)
 
+    @cached_compute
     def compute(self):
-        blades = []
-        for i in range(self.count):
-            trsf = BRepBuilderAPI_Transform(
-                self.blade.geometry, CreateRotation.rotation_x(2 * pi / self.count * i)
-            )
-            blades.append(trsf.Shape())
-
-        x0 = self.blade_position[0]
-        e = self.blade_dimension[0]
-        th = self.thickness
-        circ = CreateCircle.from_radius_and_axis(
-            self.hub_to_tip_ratio * self.tip_radius - th,
-            CreateAxis.as_axis(((x0, 0.0, 0.0), (1.0, 0.0, 0.0))),
+        if self.metrics_only:
+            self.geometry = None
+            return
+
+        blades = blade_row(self.blade.geometry, self.count, self.instanced)
+        hollowed_moyeu = hub_geometry(
+            self.hub_to_tip_ratio * self.tip_radius,
+            self.blade_position[0],
+            self.blade_dimension[0],
+            self.thickness,
         )
-        moyeu = CreateCylinder.solid_from_base_and_height(circ, e)
 
-        faces = ExploreSubshapes.get_faces(moyeu)
+        self.geometry = CreateTopology.make_compound(*blades, hollowed_moyeu)
 
-        to_remove = []
-        for f in faces:
-            try:
-                g = Geom_Plane.DownCast(BRep_Tool.Surface(f))
-            except SystemError:
-                g = None
-            if g and g.Location().X() > x0:
-                to_remove.append(f)
 
-        to_remove = CreateOCCList.of_shapes(to_remove)
+@cached_function
+def blade_row(blade, count, instanced=True):
+    """Rotate `count` copies of `blade`, reused while the cached blade shape is unchanged."""
+    return tuple(rotated_instances(blade, count, instanced=instanced))
 
-        builder = BRepOffsetAPI_MakeThickSolid()
-        builder.MakeThickSolidByJoin(moyeu, to_remove, th, 1e-6)
-        hollowed_moyeu = builder.Shape()
 
-        self.geometry = CreateTopology.make_compound(*blades, hollowed_moyeu)
+@cached_function
+def hub_geometry(radius, x0, length, thickness):
+    """Create the hollowed hub, reused through the geometry cache for unchanged parameters."""
+    circ = CreateCircle.from_radius_and_axis(
+        radius - thickness, CreateAxis.as_axis(((x0, 0.0, 0.0), (1.0, 0.0, 0.0)))
+    )
+    moyeu = CreateCylinder.solid_from_base_and_height(circ, length)
+
+    faces = ExploreSubshapes.get_faces(moyeu)
+
+    to_remove = []
+    for f in faces:
+        try:
+            g = Geom_Plane.DownCast(BRep_Tool.Surface(f))
+        except SystemError:
+            g = None
+        if g and g.Location().X() > x0:
+            to_remove.append(f)
+
+    to_remove = CreateOCCList.of_shapes(to_remove)
+
+    builder = BRepOffsetAPI_MakeThickSolid()
+    builder.MakeThickSolidByJoin(moyeu, to_remove, thickness, 1e-6)
+    return builder.Shape()
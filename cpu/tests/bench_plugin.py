@@ -0,0 +1,92 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import pytest
+
+from ..utils.benchmark import compare_results, load_results, measure, save_results
+
+# Benchmark options, marker and `bench` fixture; registered by the root conftest.py so that
+# the options are known whatever directory pytest is run from
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "CPU demos benchmarks")
+    group.addoption("--bench", action="store_true", help="Run the benchmarks.")
+    group.addoption("--bench-rounds", type=int, default=5, help="Timed rounds per benchmark.")
+    group.addoption("--bench-save", metavar="PATH", help="Write the results to a JSON file.")
+    group.addoption(
+        "--bench-compare", metavar="PATH", help="Fail on regressions against a JSON baseline."
+    )
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown counted as a regression (default 0.2).",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "bench: benchmark, run with --bench")
+    config._bench_results = {}
+
+
+def _enabled(config):
+    options = ("bench", "bench_save", "bench_compare")
+    return any(config.getoption(option) for option in options)
+
+
+def pytest_collection_modifyitems(config, items):
+    if _enabled(config):
+        return
+    skip = pytest.mark.skip(reason="benchmark, run with --bench")
+    for item in items:
+        if "bench" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def bench(request):
+    """Time a function, pytest-benchmark style: `bench(func, setup=None, rounds=None)`.
+
+    Results are keyed by test name; see `utils.benchmark.measure`.
+    """
+    config = request.config
+
+    def run(func, setup=None, rounds=None, warmup=1):
+        rounds = config.getoption("bench_rounds") if rounds is None else rounds
+        stats, result = measure(func, setup, rounds, warmup)
+        config._bench_results[request.node.name] = stats
+        return result
+
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    results = getattr(config, "_bench_results", None)
+    if not results:
+        return
+    if config.getoption("bench_save"):
+        save_results(results, config.getoption("bench_save"))
+
+    baseline = config.getoption("bench_compare")
+    baseline = load_results(baseline) if baseline else {}
+    config._bench_comparison = compare_results(
+        results, baseline, config.getoption("bench_threshold")
+    )
+    if config._bench_comparison["regression"].any() and exitstatus == 0:
+        session.exitstatus = 1
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    data = getattr(config, "_bench_comparison", None)
+    if data is None:
+        return
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(data.to_string(float_format=lambda x: f"{x:.4g}"))
+    regressions = data.index[data["regression"]].tolist()
+    if regressions:
+        baseline = config.getoption("bench_compare")
+        terminalreporter.write_line(
+            f"Regressions against {baseline}: {', '.join(regressions)}", red=True
+        )
@@ -0,0 +1,37 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+
+from ..systems import CPUSystem
+from ..utils.batch import BATCH_OUTPUTS, evaluate_batch
+
+
+def test_evaluate_batch():
+    sys = CPUSystem("sys")
+    inputs = {
+        "T_cpu": np.linspace(20.0, 90.0, 15),
+        "fan.T_air": 35.0,
+        "cpu.usage": np.linspace(0.0, 100.0, 15),
+        "fan.mass_flow_scalar": 0.5,
+    }
+    data = evaluate_batch(sys, inputs)
+    assert len(data) == 15
+
+    for i, row in data.iterrows():
+        for name in inputs:
+            sys[name] = row[name]
+        sys.run_once()
+        for name in BATCH_OUTPUTS:
+            assert row[name] == pytest.approx(sys[name], rel=1e-12)
+
+
+def test_evaluate_batch_restores_inputs():
+    sys = CPUSystem("sys")
+    sys.run_once()
+    heat_flow = sys.exchanger.heat_flow
+
+    evaluate_batch(sys, {"fan.T_air": np.arange(10.0)})
+    assert sys.fan.T_air == 40.0
+    assert sys.exchanger.heat_flow == heat_flow
@@ -0,0 +1,179 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+from cosapp.drivers import (
+    EulerExplicit,
+    LinearDoE,
+    MonteCarlo,
+    NonLinearSolver,
+    RungeKutta,
+    RunSingleCase,
+)
+from cosapp.utils.distributions import Normal
+from cosapp.utils.json import EncodingMetadata
+
+from ..systems import CPUSystem, FanGeometry, ParametricBladeGeometry, RotorGeometry
+from ..utils.benchmark import compare_results, load_results, measure, save_results
+
+
+def test_measure():
+    calls = []
+    stats, result = measure(calls.append, setup=lambda: (len(calls),), rounds=3, warmup=2)
+    assert calls == [0, 1, 2, 3, 4] and result is None
+    assert stats["rounds"] == 3
+    assert stats["min"] <= stats["median"] <= stats["max"]
+
+
+def test_compare_results(tmp_path):
+    def stats(duration):
+        return {"min": duration, "max": duration, "mean": duration, "median": duration}
+
+    save_results({"a": stats(1.0), "b": stats(1.0)}, tmp_path / "baseline.json")
+    baseline = load_results(tmp_path / "baseline.json")
+    data = compare_results({"a": stats(1.5), "b": stats(1.1), "c": stats(1.0)}, baseline)
+
+    assert data.index.tolist() == ["a", "b", "c"]
+    np.testing.assert_allclose(data["change"][:2], [0.5, 0.1])
+    assert data["regression"].tolist() == [True, False, False]
+    assert not compare_results({"a": stats(1.5)}, baseline, threshold=0.6)["regression"].any()
+
+
+# Model and drivers
+
+
+def design_system():
+    system = CPUSystem("cpu")
+    design = system.add_driver(NonLinearSolver("solver"))
+    runner = design.add_driver(RunSingleCase("runner"))
+    design.extend(system.design_methods["exchanger_surface"])
+    runner.set_values({"fan.T_air": 40.0, "T_cpu": 80.0, "cpu.usage": 100.0})
+    return system, design, runner
+
+
+@pytest.mark.bench
+def test_bench_construction(bench):
+    bench(lambda: CPUSystem("cpu"))
+
+
+@pytest.mark.bench
+def test_bench_load(bench, tmp_path):
+    system, _, _ = design_system()
+    system.run_drivers()
+    system.save(tmp_path / "cpu_ref.json", encoding_metadata=EncodingMetadata(with_drivers=False))
+
+    loaded = bench(lambda: CPUSystem.load(tmp_path / "cpu_ref.json"))
+    assert loaded.exchanger.surface == pytest.approx(system.exchanger.surface)
+
+
+@pytest.mark.bench
+def test_bench_run_once(bench):
+    system = CPUSystem("cpu")
+    bench(system.run_once)
+
+
+@pytest.mark.bench
+def test_bench_design(bench):
+    system = bench(lambda system: system.run_drivers() or system, lambda: design_system()[:1])
+    assert system.exchanger.surface > 0.0
+
+
+@pytest.mark.parametrize("scheme", ["euler", "rk3"])
+@pytest.mark.bench
+def test_bench_transient(bench, scheme):
+    def setup():
+        # 30 s scenario of notebook 6
+        system = CPUSystem("cpu")
+        time_driver = system.add_driver(RungeKutta(order=3) if scheme == "rk3" else EulerExplicit())
+        time_driver.add_child(NonLinearSolver("solver", max_iter=10, factor=1.0))
+        time_driver.time_interval = (0, 30)
+        time_driver.dt = 0.5
+        time_driver.set_scenario(
+            init={"T_cpu": 30.0}, values={"cpu.usage": "100 if time < 20 else 0."}
+        )
+        return (system,)
+
+    system = bench(lambda system: system.run_drivers() or system, setup)
+    assert np.isfinite(system["T_cpu"])
+
+
+@pytest.mark.bench
+def test_bench_doe(bench):
+    def setup():
+        # Notebook 12
+        system = CPUSystem("cpu")
+        doe = system.add_driver(LinearDoE("doe"))
+        design = doe.add_child(NonLinearSolver("solver"))
+        runner = design.add_driver(RunSingleCase("runner"))
+        design.extend(system.design_methods["exchanger_surface"])
+        runner.set_values({"T_cpu": 80.0, "cpu.usage": 100.0})
+        doe.add_input_var({"fan.T_air": {"lower": 30.0, "upper": 60.0, "count": 31}})
+        return (system,)
+
+    bench(lambda system: system.run_drivers(), setup)
+
+
+@pytest.mark.bench
+def test_bench_montecarlo(bench):
+    def setup():
+        # Notebook 13
+        system = CPUSystem("cpu")
+        mc = system.add_driver(MonteCarlo("mc"))
+        design = mc.add_child(NonLinearSolver("design"))
+        runner = design.add_driver(RunSingleCase("runner"))
+        design.extend(system.design_methods["exchanger_surface"])
+        runner.set_values({"T_cpu": 80.0, "cpu.usage": 100.0})
+        mc.draws = 100
+        system.fan.inwards.get_details("T_air").distribution = Normal(best=1, worst=-0.5)
+        mc.add_random_variable("fan.T_air")
+        mc.add_response(["fan.tension", "cpu.usage", "T_cpu"])
+        return (system,)
+
+    bench(lambda system: system.run_drivers(), setup)
+
+
+# Geometry
+
+
+@pytest.fixture
+def no_geometry_cache():
+    """Time full rebuilds: no cached system outputs, blade rows, hubs nor meshes.
+
+    They all go through the current `ShapeCache`, disabled here; the previous cache is
+    cleared so that no entry of an earlier build is reused once it is restored.
+    """
+    from ..utils.geometry_cache import set_geometry_cache
+
+    previous = set_geometry_cache(None)
+    if previous is not None:
+        previous.clear()
+    yield
+    set_geometry_cache(previous)
+
+
+def build(cls, **inputs):
+    def setup():
+        system = cls("geometry")
+        for name, value in inputs.items():
+            system[name] = value
+        return (system,)
+
+    return setup
+
+
+@pytest.mark.bench
+def test_bench_blade(bench, no_geometry_cache):
+    bench(lambda system: system.run_once(), build(ParametricBladeGeometry))
+
+
+@pytest.mark.parametrize("count", [2, 7, 16])
+@pytest.mark.bench
+def test_bench_rotor(bench, no_geometry_cache, count):
+    bench(lambda system: system.run_once(), build(RotorGeometry, count=count))
+
+
+@pytest.mark.parametrize("metrics_only", [False, True])
+@pytest.mark.bench
+def test_bench_fan(bench, no_geometry_cache, metrics_only):
+    bench(lambda system: system.run_once(), build(FanGeometry, metrics_only=metrics_only))
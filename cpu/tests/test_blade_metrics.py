@@ -0,0 +1,125 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+from OCC.Core.Bnd import Bnd_Box
+from OCC.Core.BRep import BRep_Tool
+from OCC.Core.BRepAdaptor import BRepAdaptor_Curve
+from OCC.Core.BRepBndLib import brepbndlib
+from OCC.Core.BRepGProp import brepgprop
+from OCC.Core.GProp import GProp_GProps
+from OCC.Core.TopAbs import TopAbs_EDGE
+from OCC.Core.TopExp import TopExp_Explorer
+from OCC.Core.TopoDS import topods
+
+from ..systems import FanGeometry, ParametricBladeGeometry
+from ..utils.blade_metrics import blade_metrics, clamped_spline, cubic_range, evaluate_cubic
+
+
+def test_clamped_spline():
+    points = np.array([[1.0, 0.0], [0.3, 0.1], [0.0, 0.0], [0.4, -0.05], [1.0, 0.0]])
+    start, end = np.array([-2.0, 1.0]), np.array([2.0, 1.0])
+    coefficients, h = clamped_spline(points, start, end)
+
+    # Interpolation, derivative and curvature continuity
+    np.testing.assert_allclose(evaluate_cubic(coefficients, np.zeros(4)), points[:-1], atol=1e-12)
+    np.testing.assert_allclose(evaluate_cubic(coefficients, h), points[1:], atol=1e-12)
+    derivative = coefficients[..., 1:, :] * np.arange(1, 4)[:, None]
+    second = derivative[..., 1:, :] * np.arange(1, 3)[:, None]
+    end_slopes = evaluate_cubic(np.concatenate([derivative, 0 * derivative[..., :1, :]], -2), h)
+    end_second = evaluate_cubic(np.concatenate([second, 0 * second[..., :2, :]], -2), h)
+    np.testing.assert_allclose(coefficients[0, 1], start)
+    np.testing.assert_allclose(end_slopes[-1], end)
+    np.testing.assert_allclose(end_slopes[:-1], coefficients[1:, 1], atol=1e-12)
+    np.testing.assert_allclose(end_second[:-1], 2.0 * coefficients[1:, 2], atol=1e-10)
+
+
+def test_cubic_range():
+    coefficients, h = clamped_spline(
+        np.array([[0.0, 0.0], [1.0, 2.0], [2.0, -1.0]]), np.array([1.0, 3.0]), np.array([1.0, 0.0])
+    )
+    lower, upper = cubic_range(coefficients, h)
+
+    s = np.linspace(0.0, 1.0, 10001)[:, None] * h
+    values = evaluate_cubic(coefficients, s).reshape(-1, 2)
+    np.testing.assert_allclose(lower, values.min(axis=0), atol=1e-7)
+    np.testing.assert_allclose(upper, values.max(axis=0), atol=1e-7)
+
+
+def test_blade_metrics_broadcast():
+    angles = np.array([0.0, 20.0, 45.0])
+    metrics = blade_metrics(inlet_angle=angles, exit_angle=[[10.0], [30.0]])
+    assert metrics["dimension"].shape == (2, 3, 3)
+    assert metrics["position"].shape == (2, 3, 3)
+
+    single = blade_metrics(inlet_angle=20.0, exit_angle=30.0)
+    np.testing.assert_allclose(metrics["dimension"][1, 1], single["dimension"])
+    np.testing.assert_allclose(metrics["stagger_angle"][1, 1], np.radians(25.0))
+    assert np.all(metrics["dimension"] > 0.0)
+
+
+def hub_section_bounds(solid, hub_radius):
+    """Return the tight OCC bounding box of the edges of `solid` lying on the hub cylinder."""
+    box = Bnd_Box()
+    explorer = TopExp_Explorer(solid, TopAbs_EDGE)
+    while explorer.More():
+        edge = topods.Edge(explorer.Current())
+        explorer.Next()
+        if BRep_Tool.Degenerated(edge):
+            continue
+        curve = BRepAdaptor_Curve(edge)
+        points = np.array(
+            [
+                curve.Value(u).Coord()
+                for u in np.linspace(curve.FirstParameter(), curve.LastParameter(), 11)
+            ]
+        )
+        if np.allclose(np.hypot(points[:, 1], points[:, 2]), hub_radius, atol=1e-6):
+            brepbndlib.AddOptimal(edge, box, False, False)
+    return np.array(box.Get())
+
+
+@pytest.mark.parametrize("cls", [ParametricBladeGeometry, FanGeometry])
+@pytest.mark.parametrize(
+    "inputs",
+    [
+        {},
+        {"inlet_angle": 60.0, "exit_angle": -10.0, "max_thickness_ratio": 0.06},
+        {"inlet_angle": 40.0, "exit_angle": 20.0, "stacking_parameter": 0.5},
+    ],
+)
+def test_metrics_only(cls, inputs):
+    systems = {}
+    for metrics_only in (True, False):
+        system = cls("sys")
+        blade = system if cls is ParametricBladeGeometry else system.rotor.blade
+        for name, value in inputs.items():
+            blade[name] = value
+        system.metrics_only = metrics_only
+        system.run_once()
+        systems[metrics_only] = blade
+
+    blade, built = systems[True], systems[False]
+    assert blade.geometry is None
+    assert blade.stagger_angle == pytest.approx(built.stagger_angle, rel=1e-12)
+
+    # Metrics are exact bounds of the hub section; the tight OCC box of the built solid
+    # only differs by the edge tolerance (1e-7 m) and the approximation of the edges
+    # wrapped on the hub cylinder (measured below 6e-6 m)
+    hub_radius = built.tip_radius * built.hub_to_tip_ratio
+    bounds = hub_section_bounds(built.geometry, hub_radius)
+    np.testing.assert_allclose(blade.dimension, bounds[3:] - bounds[:3], atol=1e-5)
+    np.testing.assert_allclose(blade.position[0], bounds[0], atol=1e-5)
+
+    # All sections share the axial extent of the hub section, which bounds the solid and
+    # holds its center of mass
+    volume, surface = GProp_GProps(), GProp_GProps()
+    brepgprop.VolumeProperties(built.geometry, volume)
+    brepgprop.SurfaceProperties(built.geometry, surface)
+    solid = Bnd_Box()
+    brepbndlib.AddOptimal(built.geometry, solid, False, False)
+    x_min, x_max = blade.position[0], blade.position[0] + blade.dimension[0]
+    np.testing.assert_allclose(np.array(solid.Get())[[0, 3]], [x_min, x_max], atol=1e-5)
+    assert x_min < volume.CentreOfMass().X() < x_max
+    assert volume.Mass() > 0.0 and surface.Mass() > 0.0
@@ -0,0 +1,84 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..systems import CPUSystem
+from ..utils.calibration import OnlineCalibrator, calibrate_fleet
+from ..utils.transient import integrate_transient
+
+
+@pytest.fixture
+def trace():
+    sys = CPUSystem("sys")
+    sys.exchanger.surface = 0.024
+    time = np.arange(31.0)
+    return integrate_transient(
+        sys,
+        (0, 30),
+        1.0,
+        init={"T_cpu": 10.0, "exchanger.h_adder": -30.0},
+        values={
+            "fan.T_air": np.c_[time, np.linspace(39.5, 40.5, 31)],
+            "cpu.usage": np.c_[time, np.r_[np.linspace(80.0, 100.0, 20), np.zeros(11)]],
+        },
+    )
+
+
+@pytest.mark.parametrize("alpha", [None, 0.2])
+def test_online_calibrator(trace, alpha):
+    sys = CPUSystem("sys")
+    sys.exchanger.surface = 0.024
+    calibrator = OnlineCalibrator(sys, window=10, alpha=alpha)
+    assert np.isnan(calibrator.h_adder)
+
+    for _, row in trace.iterrows():
+        calibrator.update(row["fan.T_air"], row["cpu.usage"], row["T_cpu"])
+    assert calibrator.h_adder == pytest.approx(-30.0)
+
+
+def test_online_calibrator_fleet(trace):
+    sys = CPUSystem("sys")
+    sys.exchanger.surface = 0.024
+    calibrator = OnlineCalibrator(sys, window=10)
+
+    for _, row in trace.iterrows():
+        T_air = np.full(2, row["fan.T_air"])
+        # The second machine is at air temperature: no heat flow to calibrate from
+        calibrator.update(T_air, row["cpu.usage"], np.r_[row["T_cpu"], row["fan.T_air"]])
+    assert calibrator.h_adder[0] == pytest.approx(-30.0)
+    assert np.isnan(calibrator.h_adder[1])
+
+
+def test_calibrate_fleet():
+    sys = CPUSystem("sys")
+    sys.exchanger.surface = 0.024
+    time = np.arange(61.0)
+    values = {
+        "fan.T_air": np.c_[time, np.linspace(30.0, 40.5, 61)],
+        "cpu.usage": np.c_[time, 50.0 + 50.0 * np.sin(time / 7.0)],
+    }
+    names = ["exchanger.h_adder", "cpu.heat_capacity", "fan.mass_flow_scalar"]
+    expected = pd.DataFrame(
+        [[-30.0, 20.0, 1.0], [5.0, 35.0, 0.5], [-10.0, 15.0, 0.8]],
+        columns=names,
+        index=pd.Index(["m0", "m1", "m2"], name="machine"),
+    )
+    traces = []
+    for machine, row in expected.iterrows():
+        init = {"T_cpu": 10.0, **row.to_dict()}
+        trace = integrate_transient(sys, (0, 60), 1.0, init=init, values=values)
+        traces.append(trace.assign(machine=machine))
+    data = pd.concat(traces).sample(frac=1.0, random_state=0)
+
+    result = calibrate_fleet(sys, data)
+    assert result[names].to_numpy() == pytest.approx(expected.to_numpy(), rel=1e-6)
+    assert (result["steps"] == 60).all()
+    assert (result["rmse"] < 1e-6).all()
+
+    # Parameters left out of the calibration keep their system values
+    result = calibrate_fleet(sys, data, unknowns=["exchanger.h_adder"])
+    assert (result["cpu.heat_capacity"] == sys.cpu.heat_capacity).all()
+    assert result.loc["m0", "exchanger.h_adder"] == pytest.approx(-30.0)
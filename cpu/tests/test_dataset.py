@@ -0,0 +1,60 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..recorders import read_recording
+from ..utils.dataset import DATASET_COLUMNS, build_datasets, write_datasets
+
+
+def cases(n, offset):
+    # Unique case identifier in T_cpu
+    return pd.DataFrame(
+        {
+            "T_cpu": offset + np.arange(n, dtype=float),
+            "fan.T_air": np.linspace(0.0, 30.0, n),
+            "fan.tension": np.ones(n),
+            "cpu.usage": np.zeros(n),
+        }
+    )
+
+
+def test_build_datasets():
+    healthy, broken = cases(1001, 0.0), cases(1001, 1e4)
+    train, test = build_datasets(healthy, broken, size=1000, broken_percent=20, seed=9)
+
+    assert list(train.columns) == DATASET_COLUMNS
+    assert (len(train), (~train["working"]).sum()) == (1000, 200)
+    assert (len(test), (~test["working"]).sum()) == (200, 100)
+    assert (train["T_cpu"] >= 1e4).eq(~train["working"]).all()
+    # No case in both sets, nor twice in a set
+    assert not set(train["T_cpu"]) & set(test["T_cpu"])
+    assert train["T_cpu"].is_unique and test["T_cpu"].is_unique
+
+    again, _ = build_datasets(healthy, broken, size=1000, broken_percent=20, seed=9)
+    pd.testing.assert_frame_equal(train, again)
+
+    with pytest.raises(ValueError, match="only 1001 available"):
+        build_datasets(healthy, broken, size=1000, test_size=900, test_broken_percent=100)
+
+
+def test_large(tmp_path):
+    healthy, broken = cases(10**6, 0.0), cases(10**6, 1e7)
+    train, test = build_datasets(healthy, broken, size=10**6, test_size=10**5, seed=0)
+    filenames = write_datasets(train, test, tmp_path, suffix=".parquet")
+
+    assert filenames[0].name == "dataset_1000000_cases_20_percent_broken.parquet"
+    pd.testing.assert_frame_equal(read_recording(filenames[1]), test)
+
+
+def test_write_datasets(tmp_path):
+    train, test = build_datasets(cases(500, 0.0), cases(500, 1e4), size=400, broken_percent=5)
+    filenames = write_datasets(train, test, tmp_path)
+
+    # The broken percentage of the names is that of the training set
+    assert [f.name for f in filenames] == [
+        "dataset_400_cases_5_percent_broken.csv",
+        "test_set_400_cases_5_percent_broken.csv",
+    ]
@@ -0,0 +1,31 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+from cosapp.drivers import NonLinearSolver, RunSingleCase
+
+from ..systems import CPUSystem
+from ..utils.design import solve_exchanger_surface
+
+
+def test_solve_exchanger_surface():
+    sys = CPUSystem("sys")
+    T_air = np.linspace(30.0, 60.0, 7)
+    data = solve_exchanger_surface(sys, {"fan.T_air": T_air, "T_cpu": 80.0, "cpu.usage": 100.0})
+
+    design = sys.add_driver(NonLinearSolver("solver"))
+    runner = design.add_driver(RunSingleCase("runner"))
+    design.extend(sys.design_methods["exchanger_surface"])
+    for T, surface in zip(T_air, data["exchanger.surface"]):
+        runner.set_values({"fan.T_air": T, "T_cpu": 80.0, "cpu.usage": 100.0})
+        sys.run_drivers()
+        assert surface == pytest.approx(sys.exchanger.surface, rel=1e-6)
+
+
+def test_solve_exchanger_surface_singular():
+    sys = CPUSystem("sys")
+    with pytest.warns(RuntimeWarning):
+        data = solve_exchanger_surface(sys, {"fan.T_air": [80.0, 40.0], "T_cpu": 80.0})
+    assert np.isnan(data["exchanger.surface"][0])
+    assert np.isfinite(data["exchanger.surface"][1])
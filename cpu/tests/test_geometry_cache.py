@@ -0,0 +1,249 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+from cosapp.systems import System
+
+from ..systems import rotor_geometry
+from ..utils import geometry_cache
+from ..utils.geometry_cache import ShapeCache, cached_compute, cached_function, inward_key
+
+
+class Profile(System):
+    """Count computations of a cheap stand-in for a geometry system."""
+
+    def setup(self):
+        self.add_inward("chord", 1.0)
+        self.add_inward("angles", np.zeros(2))
+        self.add_outward("area", 0.0)
+        self.add_outward("bounds", np.zeros(2))
+        self.add_outward("calls", 0)
+
+    @cached_compute
+    def compute(self):
+        self.area = self.chord**2
+        self.bounds = self.angles * self.chord
+        self.calls += 1
+
+
+class Assembly(System):
+    """Scale the area of a `Profile` child."""
+
+    def setup(self):
+        self.add_child(Profile("profile"), pulling=["chord"])
+        self.add_inward("factor", 1.0)
+        self.add_outward("area", 0.0)
+
+    @cached_compute
+    def compute(self):
+        self.area = self.factor * self.profile.area
+
+
+@pytest.fixture
+def cache(request):
+    cache = ShapeCache(**getattr(request, "param", {}))
+    previous = geometry_cache.set_geometry_cache(cache)
+    yield cache
+    geometry_cache.set_geometry_cache(previous)
+
+
+def test_inward_key():
+    s = Profile("s")
+    key = inward_key(s)
+    assert inward_key(Profile("s")) == key
+
+    s.angles = np.r_[0.0, 1.0]
+    assert inward_key(s) != key
+    s.angles = np.zeros(2)
+    assert inward_key(s) == key
+
+
+def test_cached_compute(cache):
+    s = Profile("s")
+    s.chord = 2.0
+    s.run_once()
+    assert s.area == 4.0
+    assert s.calls == 1
+
+    s.chord = 3.0
+    s.run_once()
+    assert s.calls == 2
+
+    # Back to an already seen value: outputs come from the cache
+    s.chord = 2.0
+    s.angles = np.r_[1.0, 2.0]
+    s.run_once()
+    s.angles = np.zeros(2)
+    s.run_once()
+    assert s.area == 4.0
+    assert s.calls == 1
+    assert cache.hits == 1
+
+
+def test_partial_recompute():
+    previous = geometry_cache.set_geometry_cache(None)
+    try:
+        s = Assembly("s")
+        s.chord = 2.0
+        s.run_once()
+        assert s.profile.calls == 1
+
+        # Only the assembly depends on its own inwards
+        s.factor = 3.0
+        s.run_once()
+        assert s.area == 12.0
+        assert s.profile.calls == 1
+
+        s.chord = 1.0
+        s.run_once()
+        assert s.area == 3.0
+        assert s.profile.calls == 2
+    finally:
+        geometry_cache.set_geometry_cache(previous)
+
+
+@pytest.mark.parametrize("cache", [{"maxsize": 2}], indirect=True)
+def test_cache_eviction(cache):
+    s = Profile("s")
+    for chord in (1.0, 2.0, 3.0, 1.0):
+        s.chord = chord
+        s.run_once()
+    assert len(cache) == 2
+    assert cache.hits == 0
+
+
+def test_disk_store(tmp_path):
+    previous = geometry_cache.set_geometry_cache(ShapeCache(directory=tmp_path))
+    try:
+        s = Profile("s")
+        s.angles = np.r_[1.0, 2.0]
+        s.run_once()
+
+        # A new session reads outputs back from the disk store
+        cache = ShapeCache(directory=tmp_path)
+        geometry_cache.set_geometry_cache(cache)
+        s = Profile("s")
+        s.angles = np.r_[1.0, 2.0]
+        s.run_once()
+        assert cache.hits == 1
+        assert s.calls == 1
+        np.testing.assert_array_equal(s.bounds, [1.0, 2.0])
+    finally:
+        geometry_cache.set_geometry_cache(previous)
+
+
+def test_disabled_cache():
+    previous = geometry_cache.set_geometry_cache(None)
+    try:
+        s = Profile("s")
+        for chord in (1.0, 2.0, 1.0):
+            s.chord = chord
+            s.run_once()
+        assert s.calls == 3
+    finally:
+        geometry_cache.set_geometry_cache(previous)
+
+
+def test_disk_store_arrays(tmp_path):
+    ShapeCache(directory=tmp_path).put("key", {"a": None, "b": np.arange(3), "c": 2.0})
+
+    # Plain arrays only, read back without unpickling
+    entry = ShapeCache(directory=tmp_path).get("key")
+    assert entry["a"] is None and entry["c"] == 2.0
+    np.testing.assert_array_equal(entry["b"], np.arange(3))
+
+    ShapeCache(directory=tmp_path).put("other", {"a": np.array([None, 1.0])})
+    assert "other" not in ShapeCache(directory=tmp_path)
+
+
+def test_mesh(monkeypatch):
+    calls = []
+
+    def triangulate(shape, linear_deflection, angular_deflection):
+        calls.append(shape)
+        return np.zeros((3, 3)), np.array([[0, 1, 2]])
+
+    monkeypatch.setattr(geometry_cache, "triangulate", triangulate)
+
+    class Shape(geometry_cache.TopoDS_Shape):
+        __eq__, __hash__ = object.__eq__, object.__hash__
+
+    cache = ShapeCache()
+    shape, other = Shape(), Shape()
+    cache.put("key", {"geometry": shape})
+
+    # Shapes of cache entries are triangulated once per deflection
+    for _ in range(2):
+        vertices, triangles = cache.mesh(shape, 1e-3)
+        cache.mesh(other, 1e-3)
+    assert calls == [shape, other, other]
+    assert triangles.tolist() == [[0, 1, 2]]
+    cache.mesh(shape, 1e-4)
+    assert calls[-1] is shape and len(cache) == 3
+
+
+def test_cached_function(cache):
+    calls = []
+
+    @cached_function
+    def scaled(values, factor):
+        calls.append(factor)
+        return values * factor
+
+    for factor in (2.0, 3.0, 2.0):
+        result = scaled(np.ones(2), factor)
+    np.testing.assert_array_equal(result, [2.0, 2.0])
+    assert calls == [2.0, 3.0]
+
+    cache.clear()
+    scaled(np.ones(2), 2.0)
+    geometry_cache.set_geometry_cache(None)
+    scaled(np.ones(2), 2.0)
+    assert calls == [2.0, 3.0, 2.0, 2.0]
+
+
+def test_rotor_geometry(cache, monkeypatch):
+    calls = {"blade_row": 0, "hub_geometry": 0}
+
+    def counted(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    # Count the builds behind the cached functions
+    for name, attr in [
+        ("blade_row", "rotated_instances"),
+        ("hub_geometry", "BRepOffsetAPI_MakeThickSolid"),
+    ]:
+        monkeypatch.setattr(rotor_geometry, attr, counted(name, getattr(rotor_geometry, attr)))
+
+    rotor = rotor_geometry.RotorGeometry("rotor")
+    rotor.run_once()
+    geometry = rotor.geometry
+    assert calls == {"blade_row": 1, "hub_geometry": 1}
+
+    # Unchanged inputs: no recompute
+    rotor.run_once()
+    assert rotor.geometry is geometry
+    assert calls == {"blade_row": 1, "hub_geometry": 1}
+
+    # The hub and the blade are reused when only the blade count changes
+    rotor.count = 3
+    rotor.run_once()
+    assert calls == {"blade_row": 2, "hub_geometry": 1}
+    assert rotor.blade.geometry is not None
+
+    # Back to a seen count: the whole rotor comes from the cache
+    rotor.count = 2
+    rotor.run_once()
+    assert rotor.geometry is geometry
+    assert calls == {"blade_row": 2, "hub_geometry": 1}
+
+    # A cleared cache rebuilds the shapes of new inputs
+    cache.clear()
+    rotor.thickness = 2e-3
+    rotor.run_once()
+    assert calls == {"blade_row": 3, "hub_geometry": 2}
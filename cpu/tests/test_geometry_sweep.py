@@ -0,0 +1,75 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..systems import FanGeometry
+from ..utils.geometry_sweep import _flatten, run_geometry_sweep, shape_measures
+
+
+def test_flatten():
+    data = pd.DataFrame(
+        {
+            "volume": [1.0, np.nan, 3.0],
+            "center": [np.r_[0.0, 1.0, 2.0], np.nan, np.r_[3.0, 4.0, 5.0]],
+            "bounds": [np.r_[1.0], np.r_[2.0, 3.0], None],
+            "error": ["", "RuntimeError: failed", ""],
+        },
+        index=[2, 0, 1],
+    )
+    flat = _flatten(data)
+
+    assert list(flat.columns) == [
+        "volume",
+        "center[0]",
+        "center[1]",
+        "center[2]",
+        "bounds[0]",
+        "bounds[1]",
+        "error",
+    ]
+    assert list(flat.index) == [2, 0, 1]
+    np.testing.assert_array_equal(flat["center[2]"], [2.0, np.nan, 5.0])
+    np.testing.assert_array_equal(flat["bounds[1]"], [np.nan, 3.0, np.nan])
+    assert flat["error"].tolist() == data["error"].tolist()
+
+
+def test_geometry_sweep(tmp_path):
+    cases = pd.DataFrame(
+        {"rotor.blade.inlet_angle": [50.0, 60.0, 70.0, 60.0], "rotor.count": [3, 0, 5, 7]}
+    )
+    results = run_geometry_sweep(cases, tmp_path / "sweep.parquet", max_workers=2, chunksize=1)
+
+    # One row per case, in case order; the failing design does not stop the sweep
+    pd.testing.assert_frame_equal(results[cases.columns], cases)
+    assert results["error"].str.startswith("ZeroDivisionError").tolist() == [
+        False,
+        True,
+        False,
+        False,
+    ]
+    assert np.isnan(results.loc[1, "volume"])
+    assert (tmp_path / "sweep.parquet").exists()
+
+    for i in (0, 2, 3):
+        fan = FanGeometry("fan")
+        for name in cases:
+            fan[name] = cases[name][i]
+        fan.run_once()
+        measures = shape_measures(fan.geometry.shape)
+        assert results.loc[i, "volume"] == pytest.approx(measures["volume"], rel=1e-9)
+        assert results.loc[i, "area"] == pytest.approx(measures["area"], rel=1e-9)
+        assert results.loc[i, "rotor.blade.stagger_angle"] == fan.rotor.blade.stagger_angle
+
+
+def test_metrics_only_sweep(tmp_path):
+    cases = {"rotor.count": [3, 3], "metrics_only": [False, True]}
+    results = run_geometry_sweep(cases, brep_dir=tmp_path, max_workers=1)
+
+    # Metrics only designs have outputs, but no measures nor files
+    assert results["error"].tolist() == ["", ""]
+    assert results["rotor.blade.stagger_angle"].notna().all()
+    assert results["volume"].notna().tolist() == [True, False]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["0.brep"]
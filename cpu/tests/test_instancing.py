@@ -0,0 +1,112 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+from OCC.Core.BRepCheck import BRepCheck_Analyzer
+from OCC.Core.BRepGProp import brepgprop
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox
+from OCC.Core.gp import gp_Pnt
+from OCC.Core.GProp import GProp_GProps
+from OCC.Core.TopAbs import TopAbs_FACE
+from OCC.Core.TopExp import TopExp_Explorer
+from pyoccad.create import CreateTopology
+
+from ..systems import CasingGeometry
+from ..utils import geometry_cache
+from ..utils.instancing import instanced_mesh, rotated_instances
+from ..utils.mesh_export import merge_instances
+
+
+@pytest.fixture
+def box():
+    return BRepPrimAPI_MakeBox(gp_Pnt(0.0, 1.0, 1.0), 1.0, 0.5, 0.25).Shape()
+
+
+@pytest.fixture(autouse=True)
+def no_geometry_cache():
+    previous = geometry_cache.set_geometry_cache(None)
+    yield
+    geometry_cache.set_geometry_cache(previous)
+
+
+def center(shape):
+    props = GProp_GProps()
+    brepgprop.VolumeProperties(shape, props)
+    return np.array(props.CentreOfMass().Coord())
+
+
+def area(shape):
+    props = GProp_GProps()
+    brepgprop.SurfaceProperties(shape, props)
+    return props.Mass()
+
+
+def rotated(point, angle):
+    x, y, z = point
+    cos, sin = np.cos(angle), np.sin(angle)
+    return np.array([x, y * cos - z * sin, y * sin + z * cos])
+
+
+@pytest.mark.parametrize("instanced", [True, False])
+def test_rotated_instances(box, instanced):
+    instances = rotated_instances(box, 4, instanced=instanced)
+    assert len(instances) == 4
+
+    # Same placements whether the B-rep is shared or copied
+    for i, instance in enumerate(instances):
+        np.testing.assert_allclose(
+            center(instance), rotated(center(box), i * np.pi / 2.0), atol=1e-12
+        )
+        assert instance.IsPartner(box) is instanced
+
+    instances = rotated_instances(box, 3, angle=0.1)
+    np.testing.assert_allclose(center(instances[2]), rotated(center(box), 0.2), atol=1e-12)
+
+
+def test_instanced_mesh(box):
+    other = BRepPrimAPI_MakeBox(gp_Pnt(0.0, -0.5, -0.5), 2.0, 1.0, 1.0).Shape()
+    shared = CreateTopology.make_compound(*rotated_instances(box, 4), other)
+    copied = CreateTopology.make_compound(*rotated_instances(box, 4, instanced=False), other)
+
+    # Instances share a single mesh, placed by their transforms
+    meshes = instanced_mesh(shared, 1e-3)
+    assert [len(matrices) for _, _, matrices in meshes] == [4, 1]
+    np.testing.assert_allclose(meshes[0][2][0], np.eye(4), atol=1e-12)
+    np.testing.assert_allclose(meshes[0][2][1][:3, 3], 0.0, atol=1e-12)
+    np.testing.assert_allclose(meshes[0][2][1][1:3, 1:3], [[0.0, -1.0], [1.0, 0.0]], atol=1e-12)
+
+    copies = instanced_mesh(copied, 1e-3)
+    assert [len(matrices) for _, _, matrices in copies] == [1] * 5
+
+    vertices, triangles = merge_instances(meshes)
+    reference, reference_triangles = merge_instances(copies)
+    assert len(triangles) == len(reference_triangles)
+    np.testing.assert_allclose(vertices.min(axis=0), reference.min(axis=0), atol=1e-6)
+    np.testing.assert_allclose(vertices.max(axis=0), reference.max(axis=0), atol=1e-6)
+
+
+def test_casing_holes():
+    shapes = {}
+    for instanced in (True, False):
+        casing = CasingGeometry("casing")
+        casing.blade_position = np.zeros(3)
+        casing.blade_dimension = np.array([0.02, 0.05, 0.01])
+        casing.instanced = instanced
+        casing.run_once()
+        shapes[instanced] = casing.geometry
+
+    # Faces bounded by moved hole wires are valid, and match the non-instanced build
+    faces = {}
+    for instanced, shape in shapes.items():
+        assert BRepCheck_Analyzer(shape).IsValid()
+        explorer = TopExp_Explorer(shape, TopAbs_FACE)
+        faces[instanced] = []
+        while explorer.More():
+            face = explorer.Current()
+            assert BRepCheck_Analyzer(face).IsValid()
+            faces[instanced].append(area(face))
+            explorer.Next()
+    assert len(faces[True]) == len(faces[False])
+    np.testing.assert_allclose(faces[True], faces[False], rtol=1e-6)
+    assert area(shapes[True]) == pytest.approx(area(shapes[False]), rel=1e-6)
@@ -0,0 +1,57 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import base64
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from ..utils.mesh_export import merge_instances, write_gltf
+
+
+@pytest.fixture
+def meshes():
+    vertices = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32)
+    triangles = np.array([[0, 1, 2]], dtype=np.uint32)
+    rotation = np.eye(4)
+    rotation[1:3, 1:3] = [[0.0, -1.0], [1.0, 0.0]]
+    return [(vertices, triangles, np.array([np.eye(4), rotation], dtype=np.float32))]
+
+
+def test_merge_instances(meshes):
+    vertices, triangles = merge_instances(meshes)
+
+    assert vertices.dtype == np.float32 and triangles.dtype == np.uint32
+    np.testing.assert_array_equal(triangles, [[0, 1, 2], [3, 4, 5]])
+    np.testing.assert_allclose(vertices[5], [0.0, 0.0, 1.0])
+
+
+@pytest.mark.parametrize("suffix", [".glb", ".gltf"])
+def test_write_gltf(meshes, tmp_path, suffix):
+    path = tmp_path / f"fan{suffix}"
+    write_gltf(meshes, path)
+
+    if suffix == ".glb":
+        content = path.read_bytes()
+        magic, version, length = struct.unpack_from("<4sII", content)
+        assert (magic, version, length) == (b"glTF", 2, len(content))
+        size, _ = struct.unpack_from("<I4s", content, 12)
+        document = json.loads(content[20 : 20 + size])
+        buffer = content[28 + size :]
+    else:
+        document = json.loads(path.read_text())
+        buffer = base64.b64decode(document["buffers"][0]["uri"].split(",")[1])
+
+    # One mesh shared by two instance nodes
+    assert len(document["meshes"]) == 1
+    assert [node["mesh"] for node in document["nodes"]] == [0, 0]
+    assert "matrix" not in document["nodes"][0]
+    np.testing.assert_allclose(
+        np.reshape(document["nodes"][1]["matrix"], (4, 4)).T, meshes[0][2][1]
+    )
+
+    view = document["bufferViews"][document["accessors"][0]["bufferView"]]
+    positions = np.frombuffer(buffer, dtype="<f4", count=9, offset=view["byteOffset"])
+    np.testing.assert_array_equal(positions.reshape(3, 3), meshes[0][0])
@@ -0,0 +1,49 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..utils.mlp import MLPKernel, export_classifier
+
+neural_network = pytest.importorskip("sklearn.neural_network")
+pytestmark = pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+
+
+@pytest.mark.parametrize("activation", ["identity", "logistic", "tanh", "relu"])
+@pytest.mark.parametrize("classes", [2, 3])
+def test_export(tmp_path, activation, classes):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(300, 3))
+    y = np.digitize(x[:, 1] + 0.5 * x[:, 0], np.linspace(-1, 1, classes + 1)[1:-1])
+    if classes == 2:
+        y = y.astype(bool)
+    classifier = neural_network.MLPClassifier(
+        (10, 10, 10, 10), activation=activation, max_iter=50, random_state=1
+    )
+    classifier.fit(x, y)
+
+    mean = pd.Series([1.0, 2.0, 3.0], index=["a", "b", "c"])
+    export_classifier(classifier, tmp_path / "classifier.npz", mean, mean * 2.0)
+    kernel = MLPKernel.load(tmp_path / "classifier.npz")
+
+    np.testing.assert_allclose(kernel.predict_proba(x), classifier.predict_proba(x), atol=1e-12)
+    np.testing.assert_array_equal(kernel.predict(x), classifier.predict(x))
+    np.testing.assert_array_equal(kernel.std, [2.0, 4.0, 6.0])
+    assert kernel.features == ["a", "b", "c"]
+
+
+def test_no_sklearn(tmp_path):
+    classifier = neural_network.MLPClassifier((4,), max_iter=5).fit([[0.0], [1.0]], [False, True])
+    export_classifier(classifier, tmp_path / "classifier.npz")
+    code = (
+        "import sys; from cpu.utils.mlp import MLPKernel; "
+        f"MLPKernel.load({str(tmp_path / 'classifier.npz')!r}).predict_proba([[0.5]]); "
+        "assert 'sklearn' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parents[2])
@@ -0,0 +1,56 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pandas as pd
+import pytest
+from cosapp.drivers import EulerExplicit, LinearDoE, NonLinearSolver, RunSingleCase
+from cosapp.recorders import DataFrameRecorder
+
+from ..systems import CPUSystem
+from ..utils.parallel import run_sweep
+
+
+def add_design(system, parent=None):
+    solver = NonLinearSolver("solver")
+    design = system.add_driver(solver) if parent is None else parent.add_child(solver)
+    runner = design.add_driver(RunSingleCase("runner"))
+    design.extend(system.design_methods["exchanger_surface"])
+    runner.set_values({"T_cpu": 80.0, "cpu.usage": 100.0})
+
+
+def add_transient(system):
+    time_driver = system.add_driver(EulerExplicit())
+    time_driver.add_child(NonLinearSolver("solver", max_iter=10, factor=1.0))
+    time_driver.time_interval = (0, 5)
+    time_driver.dt = 1.0
+
+
+def test_run_sweep_design():
+    T_air = np.linspace(30.0, 60.0, 7)
+    data = run_sweep({"fan.T_air": T_air}, setup=add_design, max_workers=2, chunksize=2)
+
+    system = CPUSystem("cpu")
+    doe = system.add_driver(LinearDoE("doe"))
+    add_design(system, doe)
+    doe.add_input_var({"fan.T_air": {"lower": 30.0, "upper": 60.0, "count": 7}})
+    recorder = doe.add_recorder(DataFrameRecorder(includes=["*"]))
+    system.run_drivers()
+    expected = recorder.export_data()
+
+    assert data["Reference"].tolist() == [str(i) for i in range(7)]
+    np.testing.assert_allclose(data["fan.T_air"], T_air)
+    np.testing.assert_allclose(data["exchanger.surface"], expected["exchanger.surface"], rtol=1e-6)
+
+
+def test_run_sweep_isolated_cases():
+    # Each transient starts from the initial temperature, whichever cases the worker ran
+    cases = pd.DataFrame({"cpu.usage": [100.0, 0.0, 50.0, 100.0, 20.0]})
+    data = run_sweep(cases, setup=add_transient, includes=["T_cpu"], max_workers=2)
+
+    for usage, T_cpu in zip(cases["cpu.usage"], data["T_cpu"]):
+        system = CPUSystem("cpu")
+        add_transient(system)
+        system["cpu.usage"] = usage
+        system.run_drivers()
+        assert T_cpu == pytest.approx(system["T_cpu"], rel=1e-12)
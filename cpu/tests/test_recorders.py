@@ -0,0 +1,100 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from cosapp.core.execution import ExecutionType
+from cosapp.drivers import EulerExplicit, NonLinearSolver
+from cosapp.recorders import DataFrameRecorder
+
+from ..recorders import ColumnarRecorder, StreamingRecorder, read_recording, write_recording
+from ..systems import CPUSystem
+
+
+def run_transient(recorder):
+    sys = CPUSystem("sys")
+    time_driver = sys.add_driver(EulerExplicit())
+    time_driver.add_child(NonLinearSolver("solver", max_iter=10, factor=1.0))
+    time_driver.time_interval = (0, 30)
+    time_driver.dt = 0.5
+    time_driver.set_scenario(
+        init={"T_cpu": 10.0}, values={"fan.T_air": 40.0, "cpu.usage": "100 if time < 20 else 0."}
+    )
+    rec = time_driver.add_recorder(recorder, period=1.0)
+    sys.run_drivers()
+    return rec
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_columnar_recorder(chunk_size):
+    ref = run_transient(DataFrameRecorder(includes=["*"], hold=False)).export_data()
+    rec = run_transient(ColumnarRecorder(includes=["*"], hold=False, chunk_size=chunk_size))
+
+    assert rec.export_data().equals(ref)
+    data = rec.data[["fan.T_air", "cpu.usage", "T_cpu", "fan.tension", "time"]]
+    assert len(data) == 31
+    assert np.shares_memory(rec.data["T_cpu"].to_numpy(), rec._columns[0])
+
+
+def test_columnar_recorder_threads():
+    rec = ColumnarRecorder(chunk_size=1)
+    rec._enable_parallel_execution(ExecutionType.MULTI_THREADING, 0)
+    lines = [["", "", "0", str(i), float(i)] for i in range(2000)]
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(rec._record, lines))
+    rec._disable_parallel_execution(ExecutionType.MULTI_THREADING, 0)
+
+    assert rec._size == 2000 and rec._lock is None
+    assert sorted(rec._columns[0][:2000]) == list(range(2000))
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_streaming_recorder(tmp_path, suffix):
+    ref = run_transient(DataFrameRecorder(includes=["*"], hold=False)).export_data()
+    filename = tmp_path / f"rec{suffix}"
+    rec = run_transient(StreamingRecorder(filename, includes=["*"], hold=False, chunk_size=7))
+
+    assert filename.exists()
+    data = rec.data
+    assert list(data.columns) == list(ref.columns)
+    for name in ref.columns[4:]:
+        assert np.allclose(data[name], ref[name].astype(float))
+    assert (data["Reference"] == ref["Reference"]).all()
+
+    names = ["fan.T_air", "cpu.usage", "T_cpu", "fan.tension", "time"]
+    assert list(read_recording(filename, names).columns) == names
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_streaming_recorder_read(tmp_path, suffix):
+    filename = tmp_path / f"rec{suffix}"
+    rec = run_transient(StreamingRecorder(filename, includes=["*"], hold=False, chunk_size=7))
+    rows = rec.data.values.tolist()
+
+    # Reading between two flushes keeps the rows already written
+    rec.start()
+    for i, row in enumerate(rows):
+        rec._record(row)
+        if i == 10:
+            assert rec.data.values.tolist() == rows[:11]
+    rec.exit()
+    assert rec.data.values.tolist() == rows
+
+    # Runs appended with `hold` after a read
+    filename = tmp_path / f"hold{suffix}"
+    rec = run_transient(StreamingRecorder(filename, includes=["*"], hold=True, chunk_size=7))
+    assert len(rec.data) == 31
+    rec = run_transient(rec)
+    assert rec.data.values.tolist() == rows + rows
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow", ".csv"])
+def test_write_recording(tmp_path, suffix):
+    data = run_transient(DataFrameRecorder(includes=["*"], hold=False)).export_data()
+    data = data[["fan.T_air", "T_cpu", "time"]]
+    filename = tmp_path / f"data{suffix}"
+    write_recording(data, filename)
+
+    assert np.allclose(read_recording(filename).to_numpy(float), data.to_numpy(float))
@@ -0,0 +1,60 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+
+from ..systems import CPUSurrogate, CPUSystem
+from ..utils.surrogate import PolynomialSurrogate, doe_samples
+
+
+@pytest.fixture
+def samples():
+    return doe_samples(
+        CPUSystem("sys"),
+        {
+            "T_cpu": {"lower": 20.0, "upper": 90.0, "count": 15},
+            "cpu.usage": {"lower": 0.0, "upper": 100.0, "count": 6},
+            "fan.T_air": {"lower": 20.0, "upper": 50.0, "count": 7},
+        },
+    )
+
+
+def test_polynomial_surrogate(samples):
+    sys = CPUSystem("sys")
+    model = PolynomialSurrogate.for_system(sys).fit(samples)
+
+    # Outputs are polynomial within each tension regime
+    report = model.error_report(sys, size=200, seed=0)
+    assert (report["relative"] < 1e-9).all()
+
+    assert model.in_domain(samples).all()
+    inside = model.in_domain({"T_cpu": [50.0, 95.0], "cpu.usage": 50.0, "fan.T_air": 30.0})
+    assert list(inside) == [True, False]
+
+
+def test_polynomial_surrogate_unfitted_regime(samples):
+    model = PolynomialSurrogate.for_system(CPUSystem("sys"))
+    model.fit(samples[samples["T_cpu"] > 60.0])
+    assert not model.in_domain({"T_cpu": 40.0, "cpu.usage": 50.0, "fan.T_air": 30.0}).any()
+
+
+def test_cpu_surrogate(samples):
+    sys = CPUSystem("sys")
+    surrogate = CPUSurrogate("surrogate", model=PolynomialSurrogate.for_system(sys).fit(samples))
+
+    sys.T_cpu = surrogate.T_cpu = 70.0
+    sys.cpu.usage = surrogate.cpu_usage = 80.0
+    sys.fan.T_air = surrogate.fan_T_air = 35.0
+    sys.run_once()
+    surrogate.run_once()
+
+    assert surrogate.cpu_next_T == pytest.approx(sys.cpu.next_T)
+    assert surrogate.exchanger_heat_flow == pytest.approx(sys.exchanger.heat_flow)
+    assert surrogate.fan_tension == pytest.approx(sys.fan.tension)
+    assert surrogate.in_domain
+
+    surrogate.fan_T_air = np.r_[30.0, 60.0]
+    surrogate.run_once()
+    assert surrogate.cpu_next_T.shape == (2,)
+    assert not surrogate.in_domain
@@ -0,0 +1,82 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import functools
+import queue
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..utils.telemetry import HwmonSensors, LiveSource, ReplaySource, sample_telemetry
+
+
+@pytest.fixture
+def hwmon(tmp_path):
+    for name, files in {
+        "hwmon0": {"name": "acpitz", "temp1_input": "30000"},
+        "hwmon1": {"name": "coretemp", "temp2_input": "51000", "temp1_input": "55000"},
+        "hwmon2": {"name": "thinkpad", "fan1_input": "2400", "fan2_input": "0"},
+    }.items():
+        chip = tmp_path / name
+        chip.mkdir()
+        for file, content in files.items():
+            (chip / file).write_text(content + "\n")
+    return tmp_path
+
+
+@pytest.fixture
+def trace():
+    return pd.DataFrame(
+        {
+            "time": np.arange(0.0, 10.0, 0.5),
+            "cpu.usage": np.linspace(10.0, 100.0, 20),
+            "T_cpu_measured": np.linspace(40.0, 80.0, 20),
+            "cores[0]": np.zeros(20),
+            "cores[1]": np.ones(20),
+        }
+    )
+
+
+def test_hwmon_sensors(hwmon):
+    sensors = HwmonSensors(hwmon)
+    assert sensors.temperature() == 55.0
+    assert sensors.fan_speeds() == [2400, 0]
+
+    # Files are kept open and read again
+    (hwmon / "hwmon1" / "temp1_input").write_text("56500\n")
+    assert sensors.temperature() == 56.5
+    sensors.close()
+
+
+def test_live_source():
+    source = LiveSource(hwmon_root="/nonexistent")
+    sample = source.read(0.1)
+    source.close()
+
+    assert 0.0 <= sample.usage <= 100.0
+    assert sample.cores.ndim == 1 and len(sample.cores) > 0
+
+
+def test_replay_source(trace):
+    source = ReplaySource(trace, speed=4.0)
+
+    sample = source.read(0.6)
+    assert sample.time == 2.0
+    assert sample.usage == trace["cpu.usage"][4]
+    assert sample.fan_rpm is None
+    np.testing.assert_array_equal(sample.cores, [0.0, 1.0])
+    assert source.read(2.5) is None
+
+
+def test_sample_telemetry(trace):
+    samples = queue.Queue()
+    sample_telemetry(samples, functools.partial(ReplaySource, trace, speed=20.0), rate=50.0)
+
+    received = []
+    while (sample := samples.get()) != "DONE":
+        received.append(sample)
+
+    times = [sample.time for sample in received]
+    assert times[0] == 0.0 and times[-1] >= 9.0
+    assert np.all(np.diff(times) >= 0.0)
@@ -0,0 +1,105 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+from cosapp.drivers import EulerExplicit, NonLinearSolver, RungeKutta
+from cosapp.recorders import DataFrameRecorder
+
+from ..systems import CPUSystem
+from ..utils.transient import integrate_ensemble, integrate_transient, sample_scenario
+
+SCENARIOS = [
+    {"fan.T_air": 30.0, "cpu.usage": "100 if time < 20 else 0."},
+    {"fan.T_air": "30 + 10 * sin(time / 5)", "cpu.usage": "100 * exp(-time / 10)"},
+]
+
+
+@pytest.mark.parametrize("values", SCENARIOS)
+@pytest.mark.parametrize("order", [1, 2, 3, 4])
+def test_integrate_transient(order, values):
+    init = {"T_cpu": 10.0, "exchanger.h_adder": -30.0}
+
+    sys = CPUSystem("sys")
+    sys.exchanger.surface = 0.024
+    data = integrate_transient(sys, (0, 30), 0.5, init=init, values=values, order=order)
+
+    ref = simulate(sys, (0, 30), 0.5, init, values, order)
+
+    assert list(data.columns) == list(ref.columns)
+    for name in ref.columns[4:]:
+        assert np.allclose(data[name].astype(float), ref[name].astype(float), rtol=1e-10)
+
+
+def simulate(sys, time_interval, dt, init, values, order=1, period=None):
+    time_driver = sys.add_driver(EulerExplicit() if order == 1 else RungeKutta(order=order))
+    time_driver.add_child(NonLinearSolver("solver", max_iter=10, factor=1.0))
+    time_driver.time_interval = time_interval
+    time_driver.dt = dt
+    time_driver.set_scenario(init=init, values=values)
+    rec = time_driver.add_recorder(DataFrameRecorder(includes=["*"], hold=False), period=period)
+    sys.run_drivers()
+    return rec.export_data()
+
+
+@pytest.mark.parametrize("period", [None, 3.0])
+def test_shortened_steps(period):
+    init = {"T_cpu": 10.0, "exchanger.h_adder": -30.0}
+    sys = CPUSystem("sys")
+    sys.exchanger.surface = 0.024
+
+    # Neither the end time nor the period are multiples of the time step
+    data = integrate_transient(sys, (0, 29), 2.0, init=init, values=SCENARIOS[1], period=period)
+    ref = simulate(sys, (0, 29), 2.0, init, SCENARIOS[1], period=period)
+
+    assert data["time"].iloc[-1] == 29.0
+    np.testing.assert_allclose(data["time"], ref["time"])
+    np.testing.assert_allclose(data["T_cpu"], ref["T_cpu"].astype(float), rtol=1e-10)
+
+    members = integrate_ensemble(sys, (0, 29), 2.0, init, SCENARIOS[1], period=period)
+    assert members["T_cpu"].iloc[-1] == pytest.approx(ref["T_cpu"].iloc[-1], rel=1e-10)
+
+
+def test_sample_scenario():
+    times = np.linspace(0.0, 3.0, 4)
+    values = {"a": "sin(time) + pi", "b": "np.exp(-time)", "c": "1 if time < 1.5 else 2"}
+    samples = sample_scenario(values, times)
+
+    np.testing.assert_allclose(samples["a"], np.sin(times) + np.pi)
+    np.testing.assert_allclose(samples["b"], np.exp(-times))
+    np.testing.assert_array_equal(samples["c"], [1, 1, 2, 2])
+
+
+@pytest.mark.parametrize("order", [1, 3])
+def test_integrate_ensemble(order):
+    sys = CPUSystem("sys")
+    sys.exchanger.surface = 0.024
+    T_air = np.linspace(0.0, 60.0, 5)
+    mass_flow_scalar = np.r_[1.0, 0.0, 1.0, 0.0, 1.0]
+    usage = ["100 if time < 20 else 0."] * 3 + [50.0, "3 * time"]
+
+    data = integrate_ensemble(
+        sys,
+        (0, 30),
+        0.5,
+        init={"T_cpu": 30.0},
+        values={"fan.T_air": T_air, "fan.mass_flow_scalar": mass_flow_scalar, "cpu.usage": usage},
+        order=order,
+    )
+    assert len(data) == 5
+
+    for m in range(5):
+        ref = integrate_transient(
+            sys,
+            (0, 30),
+            0.5,
+            init={"T_cpu": 30.0},
+            values={
+                "fan.T_air": T_air[m],
+                "fan.mass_flow_scalar": mass_flow_scalar[m],
+                "cpu.usage": usage[m],
+            },
+            order=order,
+        ).iloc[-1]
+        for name in ref.index[4:]:
+            assert float(data[name][m]) == pytest.approx(float(ref[name]), rel=1e-12)
@@ -0,0 +1,85 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import queue
+from multiprocessing import Process
+
+import numpy as np
+import pytest
+
+from ..utils.monitor_simulation import run_simulation
+from ..utils.telemetry import Sample
+from ..utils.transport import SAMPLE_FIELDS, QueueTransport, SharedMemoryTransport
+from ..utils.twin import RESULT_FIELDS
+
+
+def produce(transport, count):
+    for i in range(count):
+        transport.put(Sample(0.01 * i, float(i % 100), 50.0, None, np.array([i, -i])))
+    transport.put("DONE")
+
+
+@pytest.fixture(params=[QueueTransport, SharedMemoryTransport])
+def transport_cls(request):
+    return request.param
+
+
+def make(cls, **kwargs):
+    if cls is QueueTransport:
+        kwargs.pop("capacity", None)
+    return cls(SAMPLE_FIELDS, **kwargs)
+
+
+def test_processes(transport_cls):
+    transport = make(transport_cls, cores=2, block=True, capacity=64)
+    process = Process(target=produce, args=(transport, 1000))
+    process.start()
+    data = transport.read_frame(timeout=10.0)
+    process.join()
+
+    assert len(data) == 1000
+    np.testing.assert_allclose(data["time"], 0.01 * np.arange(1000))
+    np.testing.assert_array_equal(data["cores[1]"], -np.arange(1000))
+    assert data["fan_rpm"].isna().all()
+    assert transport.stats() == {"written": 1000, "read": 1000, "dropped": 0, "lag": 0}
+    if transport_cls is SharedMemoryTransport:
+        transport.unlink()
+
+
+def test_dropped():
+    transport = SharedMemoryTransport(SAMPLE_FIELDS, capacity=4)
+    for i in range(10):
+        transport.put((float(i), 0.0, None, None))
+    assert transport.stats() == {"written": 4, "read": 0, "dropped": 6, "lag": 4}
+
+    assert transport.get()[0] == 0.0
+    transport.put("DONE")
+    assert len(transport.read_frame()) == 3
+    transport.unlink()
+
+    transport = QueueTransport(SAMPLE_FIELDS, batch_size=2, maxsize=1)
+    for i in range(6):
+        transport.put((float(i), 0.0, None, None))
+    assert transport.stats()["dropped"] == 4
+
+
+def test_run_simulation():
+    samples = QueueTransport(SAMPLE_FIELDS)
+    results = QueueTransport(RESULT_FIELDS, block=True)
+    for i in range(3):
+        samples.put(Sample(float(i), 50.0, 60.0, 1000.0, np.zeros(0)))
+    samples.put("DONE")
+
+    run_simulation(samples, results)
+    data = results.read_frame(timeout=1.0)
+
+    # The samples already received are merged into a single tick
+    assert list(data.columns) == RESULT_FIELDS
+    np.testing.assert_array_equal(data["time"], [2.0])
+    assert data["T_cpu_simulated"].notna().all()
+
+    samples = queue.Queue()
+    samples.put(Sample(0.0, 50.0, 60.0, 1000.0, np.zeros(0)))
+    samples.put("DONE")
+    run_simulation(samples)
+    assert [result["time"] for result in samples.get()] == [0.0]
@@ -0,0 +1,88 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import queue
+
+import numpy as np
+import pytest
+
+from ..systems import CPUSystem
+from ..utils.telemetry import Sample
+from ..utils.transport import SAMPLE_FIELDS, QueueTransport
+from ..utils.twin import TWIN_FIELDS, RateLimitedSink, TwinRunner
+
+
+def test_step():
+    system = CPUSystem("cpu")
+    system["T_cpu"] = 60.0
+    system["cpu.usage"] = 70.0
+    system.run_once()
+
+    runner = TwinRunner(system)
+    runner.step(0.0, 70.0, 60.0)
+    result = runner.step(1.0, 70.0, 61.0)
+
+    assert result["T_cpu_simulated"] == pytest.approx(system["cpu.next_T"], rel=1e-12)
+    assert result["residual"] == pytest.approx(system["cpu.next_T"] - 61.0, rel=1e-12)
+    assert TwinRunner(system, {"cpu.tdp": 65.0}).parameters["cpu.tdp"] == 65.0
+
+
+@pytest.mark.parametrize("policy, usage", [("aggregate", 49.5), ("drop", 99.0)])
+def test_backlog(policy, usage):
+    samples = queue.Queue()
+    for i in range(100):
+        samples.put(Sample(0.1 * i, float(i), 50.0, None, np.zeros(0)))
+    samples.put("DONE")
+
+    results = []
+    runner = TwinRunner(policy=policy, sink=lambda result, lag: results.append((result, lag)))
+    metrics = runner.run(samples)
+
+    # Everything was pending at the first tick
+    assert (metrics["samples"], metrics["ticks"], metrics["merged"]) == (100, 1, 99)
+    assert results[0][1] == 99
+    assert results[0][0]["cpu.usage"] == usage
+    assert metrics["latency_p50"] > 0.0
+
+
+def test_aggregate():
+    samples = queue.Queue()
+    for i in range(4):
+        samples.put(Sample(float(i), 10.0 * i, 50.0 + i, None if i else 1000.0, np.zeros(0)))
+    samples.put("DONE")
+
+    results = []
+    TwinRunner(sink=lambda result, lag: results.append(result)).run(samples)
+
+    # Intermediate temperatures are averaged with the usage, missing values skipped
+    assert results[0]["time"] == 3.0
+    assert results[0]["cpu.usage"] == 15.0
+    assert results[0]["T_cpu_measured"] == 51.5
+    assert results[0]["Fan_rpm_1"] == 1000.0
+
+
+def test_run_transport():
+    samples = QueueTransport(SAMPLE_FIELDS)
+    results = QueueTransport(TWIN_FIELDS, block=True)
+    for i in range(5):
+        samples.put((float(i), 50.0, 50.0 + i, 1000.0))
+    samples.put("DONE")
+
+    metrics = TwinRunner().run(samples, results, timeout=1.0)
+    data = results.read_frame(timeout=1.0)
+
+    assert metrics["samples"] == 5 and metrics["transport_dropped"] == 0
+    assert list(data.columns) == TWIN_FIELDS
+    np.testing.assert_allclose(data["residual"], data["T_cpu_simulated"] - data["T_cpu_measured"])
+    assert metrics["residual_rms"] == pytest.approx(np.sqrt(np.mean(data["residual"] ** 2)))
+
+
+def test_rate_limited_sink():
+    lines = []
+    sink = RateLimitedSink(interval=60.0, write=lines.append)
+    result = dict(zip(TWIN_FIELDS, (0.0, 50.0, 60.0, None, None, np.nan)))
+    for _ in range(10):
+        sink(result)
+
+    assert len(lines) == 1 and sink.skipped == 9
+    assert lines[0].startswith("[SIM] t=0.0s")
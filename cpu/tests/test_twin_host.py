@@ -0,0 +1,81 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..utils.twin import TwinRunner
+from ..utils.twin_host import TwinHost, replay_traces
+
+
+def test_tick():
+    parameters = pd.DataFrame(
+        {"exchanger.h_adder": [100.0, 150.0], "cpu.heat_capacity": [80.0, 120.0]},
+        index=["b", "a"],
+    )
+    host = TwinHost(["a", "b", "c"], parameters=parameters)
+    host.tick({"machine": ["a", "b"], "time": [0.0, 0.0], "usage": [20, 80], "T_cpu": [50, 60]})
+    # Two samples of "a" in one batch are merged, "c" starts from the default temperature
+    host.tick(
+        {
+            "machine": ["a", "b", "a", "c"],
+            "time": [2.0, 2.5, 1.0, 2.5],
+            "usage": [60.0, 80.0, 40.0, 10.0],
+            "T_cpu": [52.0, 61.0, 51.0, np.nan],
+        }
+    )
+
+    runners = {
+        "a": TwinRunner(parameters=parameters.loc["a"].to_dict()),
+        "b": TwinRunner(parameters=parameters.loc["b"].to_dict()),
+    }
+    runners["a"].step(0.0, 20.0, 50.0)
+    runners["a"].step(2.0, 50.0, 52.0)
+    runners["b"].step(0.0, 80.0, 60.0)
+    runners["b"].step(2.5, 80.0, 61.0)
+
+    data = host.snapshot()
+    for machine, runner in runners.items():
+        assert data.loc[machine, "T_cpu_simulated"] == pytest.approx(runner.T, rel=1e-12)
+    assert data.loc["a", "cpu.usage"] == 50.0
+    assert data.loc["c", "T_cpu_simulated"] == host.initial_T
+    assert np.isnan(data.loc["c", "residual"])
+    assert list(data["samples"]) == [3, 2, 1]
+    assert host.metrics()["ticks"] == 2
+
+    with pytest.raises(KeyError):
+        host.tick({"machine": ["d"], "time": [0.0], "usage": [0.0], "T_cpu": [0.0]})
+
+
+def test_serve():
+    traces = {
+        f"node{i}": pd.DataFrame(
+            {
+                "time": np.arange(20.0),
+                "cpu.usage": np.full(20, 10.0 * i),
+                "T_cpu_measured": 50.0 + 0.1 * np.arange(20.0),
+            }
+        )
+        for i in range(5)
+    }
+    host = TwinHost(traces)
+    updates = []
+
+    async def main():
+        queue = asyncio.Queue()
+        producer = asyncio.create_task(replay_traces(queue, traces, speed=100.0, rate=200.0))
+        metrics = await host.serve(queue, on_tick=lambda host, updated: updates.append(updated))
+        await producer
+        return metrics
+
+    metrics = asyncio.run(main())
+    data = host.snapshot()
+
+    assert metrics["ticks"] == len(updates) > 0
+    np.testing.assert_array_equal(data["time"], 19.0)
+    np.testing.assert_array_equal(data["T_cpu_measured"], 51.9)
+    # Higher usage, higher temperature
+    assert data["T_cpu_simulated"].is_monotonic_increasing
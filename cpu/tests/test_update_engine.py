@@ -0,0 +1,116 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: BSD-3-Clause
+
+import asyncio
+import threading
+
+import pytest
+from cosapp.systems import System
+
+from ..utils.update_engine import UpdateEngine
+
+
+class Gated(System):
+    """Rebuild from a single input once `gate` is open; `started` is set on each rebuild."""
+
+    def setup(self, started=None, gate=None):
+        self.add_property("started", started)
+        self.add_property("gate", gate)
+        self.add_inward("count", 1)
+        self.add_outward("shape", 0)
+
+    def compute(self):
+        self.started.set()
+        self.gate.wait()
+        if self.count < 0:
+            raise ValueError("negative count")
+        self.shape = self.count
+
+
+@pytest.fixture
+def system():
+    return Gated("s", started=threading.Event(), gate=threading.Event())
+
+
+@pytest.fixture
+def engine(system):
+    published = []
+    refined = threading.Event()
+
+    def publish(final):
+        published.append((system.shape, final))
+        if final:
+            refined.set()
+
+    with UpdateEngine(system, publish, delay=0.0, refine_delay=0.05) as engine:
+        engine.published = published
+        engine.refined = refined
+        yield engine
+
+
+def test_coalesce(engine, system):
+    # Changes submitted during a rebuild are applied in a single following one
+    engine.submit(count=2)
+    system.started.wait()
+    for count in range(3, 50):
+        engine.submit(count=count)
+    system.gate.set()
+    engine.refined.wait()
+    engine.wait()
+
+    # The intermediate preview is not refined, the latest value is refined once
+    assert engine.rebuilds == 2
+    assert system.shape == 49
+    assert engine.published == [(2, False), (49, False), (49, True)]
+
+
+def test_error(engine, system):
+    system.gate.set()
+    engine.submit(count=-1)
+    engine.wait()
+    assert isinstance(engine.error, ValueError)
+    assert engine.published == []
+
+    engine.submit(count=3)
+    engine.refined.wait()
+    engine.wait()
+    assert engine.error is None
+    assert engine.published == [(3, False), (3, True)]
+
+
+def test_close(system):
+    engine = UpdateEngine(system, lambda final: None)
+    engine.close()
+    assert not engine._thread.is_alive()
+    engine.close()
+
+    with UpdateEngine(system, lambda final: None) as engine:
+        assert engine._thread.is_alive()
+    assert not engine._thread.is_alive()
+
+
+def test_event_loop(system):
+    published = []
+
+    async def drag():
+        refined = asyncio.Event()
+
+        def publish(final):
+            published.append((threading.current_thread(), system.shape, final))
+            if final:
+                refined.set()
+
+        loop = asyncio.get_running_loop()
+        with UpdateEngine(system, publish, 0.0, 0.05, loop=loop) as engine:
+            engine.submit(count=2)
+            await asyncio.to_thread(system.started.wait)
+            for count in range(3, 10):
+                engine.submit(count=count)
+            system.gate.set()
+            await refined.wait()
+
+    asyncio.run(drag())
+
+    # Published on the event loop thread; the outdated preview is skipped
+    main = threading.main_thread()
+    assert published == [(main, 9, False), (main, 9, True)]
@@ -0,0 +1,68 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pandas as pd
+
+BATCH_INPUTS = [
+    "T_cpu",
+    "cpu.usage",
+    "fan.T_air",
+    "fan.mass_flow_scalar",
+    "exchanger.h_adder",
+    "exchanger.surface",
+]
+
+BATCH_OUTPUTS = [
+    "fan.tension",
+    "fan.fl_out.mass_flow",
+    "exchanger.h",
+    "exchanger.heat_flow",
+    "cpu.power",
+    "cpu.heat_flow_balance",
+    "cpu.next_T",
+]
+
+
+def evaluate_batch(system, inputs, outputs=None):
+    """Evaluate a `CPUSystem` over many operating points in a single `run_once` pass.
+
+    The children compute methods are elementwise, so free inputs of the system (see
+    `BATCH_INPUTS`) may be set to arrays; they are broadcast against each other. The
+    system is restored to its previous inputs afterwards.
+
+    Parameters
+    ----------
+    system : CPUSystem
+        System to evaluate.
+    inputs : dict[str, float or array-like]
+        Input values, keyed by variable name (e.g. `"fan.T_air"`).
+    outputs : list of str, optional
+        Output variable names; default `BATCH_OUTPUTS`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per operating point, with input and output columns.
+    """
+    if outputs is None:
+        outputs = BATCH_OUTPUTS
+
+    names = list(inputs)
+    values = np.broadcast_arrays(*(np.asarray(inputs[name], dtype=float) for name in names))
+    results = {name: np.ravel(value) for name, value in zip(names, values)}
+    size = values[0].size if values else 1
+
+    saved = {name: system[name] for name in names}
+    try:
+        for name in names:
+            system[name] = results[name]
+        system.run_once()
+        for name in outputs:
+            results[name] = np.broadcast_to(system[name], (size,)).copy()
+    finally:
+        for name, value in saved.items():
+            system[name] = value
+        system.run_once()
+
+    return pd.DataFrame(results, index=pd.RangeIndex(size))
@@ -0,0 +1,120 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STATS = ["min", "max", "mean", "median", "stddev"]
+
+
+def measure(func, setup=None, rounds=5, warmup=1):
+    """Time `func` over several rounds.
+
+    Parameters
+    ----------
+    func : callable
+        Function to time.
+    setup : callable, optional
+        Called before each round, untimed; returns the tuple of `func` arguments.
+    rounds : int, optional
+        Number of timed rounds; default 5.
+    warmup : int, optional
+        Number of untimed rounds run first; default 1.
+
+    Returns
+    -------
+    stats : dict[str, float]
+        `STATS` of the round durations (s), and the number of `rounds`.
+    result : object
+        Result of the last call of `func`.
+    """
+    durations = []
+    for i in range(warmup + rounds):
+        args = () if setup is None else setup()
+        start = time.perf_counter()
+        result = func(*args)
+        duration = time.perf_counter() - start
+        if i >= warmup:
+            durations.append(duration)
+
+    stats = {
+        "min": min(durations),
+        "max": max(durations),
+        "mean": statistics.fmean(durations),
+        "median": statistics.median(durations),
+        "stddev": statistics.stdev(durations) if rounds > 1 else 0.0,
+        "rounds": rounds,
+    }
+    return stats, result
+
+
+def save_results(benchmarks, filename):
+    """Write benchmark statistics to a JSON file, with the machine and date of the run.
+
+    Parameters
+    ----------
+    benchmarks : dict[str, dict]
+        Statistics of each benchmark, as returned by `measure`.
+    filename : str or Path
+        Output JSON file.
+    """
+    filename = Path(filename)
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    results = {
+        "machine_info": {
+            "node": platform.node(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+        },
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "benchmarks": benchmarks,
+    }
+    filename.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+
+def load_results(filename):
+    """Return the benchmark statistics of a JSON file written by `save_results`."""
+    return json.loads(Path(filename).read_text())["benchmarks"]
+
+
+def compare_results(benchmarks, baseline, threshold=0.2, stat="min"):
+    """Compare benchmark statistics with a baseline.
+
+    Parameters
+    ----------
+    benchmarks, baseline : dict[str, dict]
+        Current and baseline statistics of each benchmark, e.g. from `load_results`.
+    threshold : float, optional
+        Relative slowdown counted as a regression; default 0.2 (20%).
+    stat : str, optional
+        Compared statistic, one of `STATS`; default "min", the least noisy.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Baseline and current durations (s), relative `change` and `regression` flag of
+        each current benchmark, slowest changes first; benchmarks not in the baseline
+        have NaN change and are not regressions.
+    """
+    if stat not in STATS:
+        raise ValueError(f"Unknown statistic {stat!r}; expected one of {STATS}")
+    names = sorted(benchmarks)
+    data = pd.DataFrame(
+        {
+            "baseline": [baseline.get(name, {}).get(stat, np.nan) for name in names],
+            "current": [benchmarks[name][stat] for name in names],
+        },
+        index=pd.Index(names, name="benchmark"),
+    )
+    data["change"] = data["current"] / data["baseline"] - 1.0
+    data["regression"] = data["change"] > threshold
+    return data.sort_values("change", ascending=False)
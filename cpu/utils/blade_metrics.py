@@ -0,0 +1,237 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+
+def hermite_coefficients(p0, p1, m0, m1, h):
+    """Return the power basis coefficients of cubic Hermite segments.
+
+    Parameters
+    ----------
+    p0, p1 : numpy.ndarray
+        Start and end points, of shape `(..., dim)`.
+    m0, m1 : numpy.ndarray
+        Start and end derivatives, of shape `(..., dim)`.
+    h : numpy.ndarray
+        Parameter length of the segments, of shape `(...)`.
+
+    Returns
+    -------
+    numpy.ndarray
+        Coefficients of `1, s, s**2, s**3` for `s` in `[0, h]`, of shape `(..., 4, dim)`.
+    """
+    h = np.asarray(h, dtype=float)[..., None]
+    slope = (p1 - p0) / h
+    return np.stack(
+        [p0, m0, (3.0 * slope - 2.0 * m0 - m1) / h, (m0 + m1 - 2.0 * slope) / h**2], axis=-2
+    )
+
+
+def clamped_spline(points, start_tangent, end_tangent):
+    """Interpolate points by a C2 cubic spline with imposed end derivatives.
+
+    Parameters are the cumulated distances between points, as used by
+    `Geom2dAPI_Interpolate` for the profiles of `ParametricBladeGeometry`.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        Interpolated points, of shape `(..., n, dim)`.
+    start_tangent, end_tangent : numpy.ndarray
+        End derivatives, of shape `(..., dim)`.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        Segment coefficients of shape `(..., n - 1, 4, dim)` (see `hermite_coefficients`)
+        and segment parameter lengths of shape `(..., n - 1)`.
+    """
+    points = np.asarray(points, dtype=float)
+    h = np.linalg.norm(np.diff(points, axis=-2), axis=-1)
+    n = points.shape[-2]
+    slopes = np.empty(points.shape)
+    slopes[..., 0, :] = start_tangent
+    slopes[..., -1, :] = end_tangent
+
+    if n > 2:
+        # Second derivative continuity at interior points, for the unknown derivatives
+        inv = 1.0 / h
+        chords = np.diff(points, axis=-2) * (inv**2)[..., None]
+        matrix = np.zeros(points.shape[:-2] + (n - 2, n - 2))
+        rhs = 3.0 * (chords[..., :-1, :] + chords[..., 1:, :])
+        for i in range(n - 2):
+            matrix[..., i, i] = 2.0 * (inv[..., i] + inv[..., i + 1])
+            if i > 0:
+                matrix[..., i, i - 1] = inv[..., i]
+            if i < n - 3:
+                matrix[..., i, i + 1] = inv[..., i + 1]
+        rhs[..., 0, :] -= inv[..., :1] * slopes[..., 0, :]
+        rhs[..., -1, :] -= inv[..., -1:] * slopes[..., -1, :]
+        slopes[..., 1:-1, :] = np.linalg.solve(matrix, rhs)
+
+    coefficients = hermite_coefficients(
+        points[..., :-1, :], points[..., 1:, :], slopes[..., :-1, :], slopes[..., 1:, :], h
+    )
+    return coefficients, h
+
+
+def evaluate_cubic(coefficients, s):
+    """Evaluate power basis cubic coefficients `(..., 4, dim)` at parameter(s) `s`."""
+    s = np.asarray(s, dtype=float)[..., None]
+    c0, c1, c2, c3 = np.moveaxis(coefficients, -2, 0)
+    return c0 + s * (c1 + s * (c2 + s * c3))
+
+
+def cubic_range(coefficients, h):
+    """Return the exact lower and upper bounds of cubic segments, per coordinate.
+
+    Parameters
+    ----------
+    coefficients : numpy.ndarray
+        Segment coefficients of shape `(..., segments, 4, dim)`.
+    h : numpy.ndarray
+        Segment parameter lengths of shape `(..., segments)`.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        Lower and upper bounds, of shape `(..., dim)`.
+    """
+    h = np.asarray(h, dtype=float)[..., None]
+    c0, c1, c2, c3 = np.moveaxis(coefficients, -2, 0)
+
+    # Extrema are reached at segment ends or at roots of the derivative within segments
+    a, b, c = 3.0 * c3, 2.0 * c2, c1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = np.sqrt(b**2 - 4.0 * a * c)
+        quadratic = np.abs(a) > 1e-12 * (np.abs(b) + np.abs(c))
+        s1 = np.where(quadratic, (-b - root) / (2.0 * a), -c / b)
+        s2 = np.where(quadratic, (-b + root) / (2.0 * a), np.nan)
+
+    values = []
+    for s in (np.zeros_like(s1), np.broadcast_to(h, s1.shape), s1, s2):
+        s = np.where((s >= 0.0) & (s <= h), s, 0.0)
+        values.append(c0 + s * (c1 + s * (c2 + s * c3)))
+    values = np.stack(values)
+    return values.min(axis=(0, -2)), values.max(axis=(0, -2))
+
+
+def blade_metrics(
+    inlet_angle=0.0,
+    exit_angle=0.0,
+    max_thickness_ratio=0.03,
+    max_thickness_position=0.3,
+    height_over_chord=2.0,
+    tip_radius=0.1,
+    hub_to_tip_ratio=0.1,
+    leading_tension=10.0,
+    trailing_tension=10.0,
+    stacking_parameter=0.0,
+):
+    """Compute `ParametricBladeGeometry` outputs without building the blade solid.
+
+    The backbone is the cubic Hermite curve joining the leading and trailing edges, and
+    the profile the clamped cubic spline through its five points, as interpolated by
+    `ParametricBladeGeometry`. The hub section is wrapped on the hub cylinder analytically:
+    profile `x` maps to the angle (scaled by `chord / mean_radius`) and `y` to the axial
+    position (scaled by `chord`). Bounds of the wrapped section are exact, whereas OCC
+    bounding boxes are slightly enlarged by tolerances. All arguments are broadcast, so
+    a whole design space is evaluated at once.
+
+    Parameters
+    ----------
+    inlet_angle, exit_angle : float or array-like
+        Blade angles (deg).
+    max_thickness_ratio, max_thickness_position : float or array-like
+        Maximum thickness to chord ratio, and its relative position along the backbone.
+    height_over_chord : float or array-like
+        Blade height to chord ratio.
+    tip_radius, hub_to_tip_ratio : float or array-like
+        Tip radius (m) and hub to tip radius ratio.
+    leading_tension, trailing_tension : float or array-like
+        Backbone tangent magnitudes at leading and trailing edges.
+    stacking_parameter : float or array-like
+        Relative position along the backbone of the stacking point.
+
+    Returns
+    -------
+    dict[str, numpy.ndarray]
+        `stagger_angle` (rad, as computed by `ParametricBladeGeometry`), and `dimension`
+        and `position` of the hub section bounding box, of shape `(..., 3)`.
+    """
+    args = np.broadcast_arrays(
+        *(
+            np.asarray(value, dtype=float)
+            for value in (
+                inlet_angle,
+                exit_angle,
+                max_thickness_ratio,
+                max_thickness_position,
+                height_over_chord,
+                tip_radius,
+                hub_to_tip_ratio,
+                leading_tension,
+                trailing_tension,
+                stacking_parameter,
+            )
+        )
+    )
+    inlet, outlet, ratio, position, hoc, tip_radius, htt, lt, tt, stacking = args
+    inlet, outlet = np.radians(inlet), np.radians(outlet)
+
+    hub_radius = tip_radius * htt
+    mean_radius = tip_radius * (1.0 + htt) / 2.0
+    chord = (tip_radius - hub_radius) / hoc
+    stagger = (inlet + outlet) / 2.0
+
+    def vector(x, y):
+        return np.stack([x, y], axis=-1)
+
+    leading = vector(np.zeros_like(stagger), np.zeros_like(stagger))
+    trailing = vector(np.sin(stagger), np.cos(stagger))
+    t_start = lt[..., None] * vector(np.sin(inlet), np.cos(inlet))
+    t_end = tt[..., None] * vector(np.sin(outlet), np.cos(outlet))
+
+    # The backbone joins points one unit apart, so its parameter range is [0, 1]
+    backbone = hermite_coefficients(leading, trailing, t_start, t_end, 1.0)
+    center = evaluate_cubic(backbone, position)
+    stacking_point = evaluate_cubic(backbone, stacking)
+
+    cos_s, sin_s = np.cos(stagger)[..., None], np.sin(stagger)[..., None]
+    offset = ratio[..., None] * vector(cos_s[..., 0], -sin_s[..., 0])
+    points = np.stack(
+        [trailing, center - offset * 2.0 / 3.0, leading, center + offset / 3.0, trailing],
+        axis=-2,
+    )
+    coefficients, h = clamped_spline(points - stacking_point[..., None, :], -t_end, t_end)
+
+    # Wrap on the hub cylinder: angle from x, axial position from y
+    scale = np.stack([chord / mean_radius, chord], axis=-1)
+    coefficients = coefficients * scale[..., None, None, :]
+    lower, upper = cubic_range(coefficients, h)
+    (u_min, x_min), (u_max, x_max) = np.moveaxis(lower, -1, 0), np.moveaxis(upper, -1, 0)
+
+    y_min, y_max = _cos_range(u_min, u_max)
+    z_min, z_max = _cos_range(u_min - np.pi / 2.0, u_max - np.pi / 2.0)
+    lower = np.stack([x_min, hub_radius * y_min, hub_radius * z_min], axis=-1)
+    upper = np.stack([x_max, hub_radius * y_max, hub_radius * z_max], axis=-1)
+
+    zeros = np.zeros_like(x_min)
+    return {
+        "stagger_angle": stagger,
+        "dimension": upper - lower,
+        "position": np.stack([x_min, zeros, zeros], axis=-1),
+    }
+
+
+def _cos_range(u_min, u_max):
+    """Return the range of `cos(u)` for `u` in `[u_min, u_max]`."""
+    values = np.stack([np.cos(u_min), np.cos(u_max)])
+    lower, upper = values.min(axis=0), values.max(axis=0)
+    # Extrema of cos are reached at multiples of pi within the interval
+    k_max = np.floor(u_max / (2.0 * np.pi))
+    upper = np.where(2.0 * np.pi * k_max >= u_min, 1.0, upper)
+    k_min = np.floor((u_max - np.pi) / (2.0 * np.pi))
+    lower = np.where(2.0 * np.pi * k_min + np.pi >= u_min, -1.0, lower)
+    return lower, upper
@@ -0,0 +1,279 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from cpu.systems.cpu import thermal_power
+from cpu.systems.fan import fan_mass_flow
+from cpu.systems.fancontroller import tension_schedule
+from cpu.systems.heatexchanger import heat_conductivity
+
+from .transient import system_parameters
+
+# Default unknowns of `calibrate_fleet`, calibrated per machine
+FLEET_UNKNOWNS = ["exchanger.h_adder", "cpu.heat_capacity", "fan.mass_flow_scalar"]
+
+
+def step_h_adder(p, T_air, usage, T_cpu, next_T_cpu, dt=1.0):
+    """Solve `cpu.next_T == cpu.expected_next_T` for `exchanger.h_adder` in closed form.
+
+    Parameters
+    ----------
+    p : dict[str, float or numpy.ndarray]
+        `CPUSystem` parameters (see `transient.system_parameters`).
+    T_air, usage, T_cpu : float or numpy.ndarray
+        Air temperature, CPU usage and CPU temperature at the current sample.
+    next_T_cpu : float or numpy.ndarray
+        CPU temperature at the next sample.
+    dt : float, optional
+        Time between samples; default 1.0, as `cpu.next_T` is a one-second prediction.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        Heat conductivity adder; NaN where `T_cpu == T_air`.
+    """
+    tension = tension_schedule(
+        T_cpu,
+        p["controler.low_threshold"],
+        p["controler.high_threshold"],
+        p["controler.low_tension"],
+        p["controler.medium_tension"],
+        p["controler.max_tension"],
+    )
+    mass_flow = fan_mass_flow(
+        tension, p["fan.design_tension"], p["fan.mass_flow_max"], p["fan.mass_flow_scalar"]
+    )
+    h = heat_conductivity(
+        mass_flow,
+        p["exchanger.max_mass_flow"],
+        p["exchanger.h_natural"],
+        p["exchanger.h_forced"],
+        0.0,
+    )
+    power = thermal_power(usage, p["cpu.tdp"])
+    heat_flow = power - p["cpu.heat_capacity"] * (next_T_cpu - T_cpu) / dt
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h_total = heat_flow / ((T_cpu - T_air) * p["exchanger.surface"])
+    return np.where(np.isfinite(h_total), h_total - h, np.nan)[()]
+
+
+class OnlineCalibrator:
+    """Calibrate `exchanger.h_adder` online from streamed `(T_air, usage, T_cpu)` samples.
+
+    Each new sample closes a step with the previous one, solved in closed form by
+    `step_h_adder`; the estimate is then either the median of the last `window` step
+    values or their exponentially weighted mean. An update costs a fixed amount of work
+    (proportional to `window` for the median) and never replays history. Inputs may be
+    arrays with one entry per machine, to calibrate a fleet at once.
+
+    Parameters
+    ----------
+    system : CPUSystem
+        System providing the model parameters.
+    window : int, optional
+        Number of step values kept for the running median; default 30.
+    alpha : float, optional
+        Smoothing factor of the exponentially weighted mean; default `None` uses the
+        running median.
+    dt : float, optional
+        Time between samples; default 1.0.
+    **parameters
+        Parameter overrides keyed by `transient.PARAMETERS` names (may be per machine).
+    """
+
+    def __init__(self, system, window=30, alpha=None, dt=1.0, **parameters):
+        self.parameters = {**system_parameters(system), **parameters}
+        self.window = window
+        self.alpha = alpha
+        self.dt = dt
+        self.reset()
+
+    def reset(self):
+        """Forget all samples."""
+        self._previous = None
+        self._values = None
+        self._count = 0
+        self._estimate = np.nan
+
+    @property
+    def h_adder(self):
+        """Current `exchanger.h_adder` estimate, float or numpy.ndarray (NaN before any step)."""
+        return self._estimate
+
+    def update(self, T_air, usage, T_cpu, mass_flow_scalar=None):
+        """Consume a new sample and return the updated `exchanger.h_adder` estimate."""
+        sample = (T_air, usage, np.asarray(T_cpu, dtype=float), mass_flow_scalar)
+        previous, self._previous = self._previous, sample
+        if previous is None:
+            return self._estimate
+
+        T_air, usage, T_cpu, mass_flow_scalar = previous
+        p = self.parameters
+        if mass_flow_scalar is not None:
+            p = {**p, "fan.mass_flow_scalar": mass_flow_scalar}
+        value = np.asarray(step_h_adder(p, T_air, usage, T_cpu, sample[2], self.dt))
+
+        if self.alpha is not None:
+            estimate = np.broadcast_to(self._estimate, value.shape)
+            smoothed = estimate + self.alpha * (value - estimate)
+            smoothed = np.where(np.isnan(estimate), value, smoothed)
+            self._estimate = np.where(np.isnan(value), estimate, smoothed)[()]
+        else:
+            if self._values is None:
+                self._values = np.full((self.window, *value.shape), np.nan)
+            self._values[self._count % self.window] = value
+            with warnings.catch_warnings():
+                # Machines without any valid step yet keep a NaN estimate
+                warnings.simplefilter("ignore", RuntimeWarning)
+                self._estimate = np.nanmedian(self._values, axis=0)[()]
+        self._count += 1
+
+        return self._estimate
+
+
+def _segment_sum(values, index, size):
+    """Sum `values` rows per group `index`, returning an array of `size` groups."""
+    flat = values.reshape(len(values), -1) if len(values) else np.empty((0, 1))
+    sums = [np.bincount(index, weights=column, minlength=size) for column in flat.T]
+    return np.stack(sums, axis=-1).reshape(size, *values.shape[1:])
+
+
+def calibrate_fleet(
+    system,
+    data,
+    unknowns=None,
+    machine="machine",
+    time="time",
+    regularization=1e-9,
+    max_iter=10,
+    **parameters,
+):
+    """Calibrate many recorded CPU traces at once, in a batched least-squares solve.
+
+    Each pair of consecutive samples of a machine gives one equation of the discrete
+    relation of `CPU.compute`, `heat_capacity * (next_T - T) / dt == power - heat_flow`,
+    the exchanger heat flow following `heat_conductivity`. As long as forced convection
+    does not saturate, this relation is linear in `exchanger.h_adder`,
+    `cpu.heat_capacity` and `fan.mass_flow_scalar`: the normal equations of all machines
+    are accumulated with grouped sums and solved by a single stacked `numpy.linalg.solve`
+    call. Saturated steps are found from the current estimates, and the solve is repeated
+    until they no longer change.
+
+    Unknowns are scaled and a small ridge term pulls them towards their system values, so
+    that parameters a trace cannot identify (e.g. `fan.mass_flow_scalar` when the fan never
+    runs) keep these values instead of making the solve singular.
+
+    Parameters
+    ----------
+    system : CPUSystem
+        System providing the model parameters and the initial values of the unknowns.
+    data : pandas.DataFrame
+        Traces of all machines, with `fan.T_air`, `cpu.usage` and `T_cpu` columns as
+        recorded by `DataFrameRecorder`.
+    unknowns : list of str, optional
+        Calibrated parameters, among `FLEET_UNKNOWNS`; default all of them.
+    machine : str, optional
+        Column identifying the machine of each sample; default `"machine"`. Without such
+        a column, all samples belong to a single machine `0`.
+    time : str, optional
+        Time column; default `"time"`. Without such a column, samples are one second apart.
+    regularization : float, optional
+        Relative weight of the ridge term; default 1e-9.
+    max_iter : int, optional
+        Maximum number of solves; default 10.
+    **parameters
+        Parameter overrides keyed by `transient.PARAMETERS` names.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per machine, indexed by machine id, with all `FLEET_UNKNOWNS`, the number
+        of `steps` used and the `rmse` of the predicted `cpu.next_T` (degC).
+    """
+    unknowns = FLEET_UNKNOWNS if unknowns is None else list(unknowns)
+    unknown = [name for name in unknowns if name not in FLEET_UNKNOWNS]
+    if unknown:
+        raise ValueError(f"Cannot calibrate {unknown}; unknowns must be among {FLEET_UNKNOWNS}")
+    free = np.array([name in unknowns for name in FLEET_UNKNOWNS])
+    p = {**system_parameters(system), **parameters}
+
+    n = len(data)
+    ids = data[machine].to_numpy() if machine in data else np.zeros(n, dtype=int)
+    times = data[time].to_numpy(dtype=float) if time in data else np.arange(n, dtype=float)
+    order = np.lexsort((times, ids))
+    ids, times = ids[order], times[order]
+    T_air, usage, T_cpu = (
+        data[name].to_numpy(dtype=float)[order] for name in ("fan.T_air", "cpu.usage", "T_cpu")
+    )
+    machines, index = np.unique(ids, return_inverse=True)
+
+    # One equation per pair of consecutive samples of the same machine
+    dt = np.diff(times)
+    rate = np.diff(T_cpu) / np.where(dt > 0.0, dt, np.nan)
+    steps = np.flatnonzero(
+        (ids[1:] == ids[:-1])
+        & np.isfinite(rate)
+        & np.isfinite(T_air[:-1])
+        & np.isfinite(usage[:-1])
+        & np.isfinite(T_cpu[:-1])
+    )
+    index, dt, rate = index[steps], dt[steps], rate[steps]
+    T_air, usage, T_cpu = T_air[steps], usage[steps], T_cpu[steps]
+
+    tension = tension_schedule(
+        T_cpu,
+        p["controler.low_threshold"],
+        p["controler.high_threshold"],
+        p["controler.low_tension"],
+        p["controler.medium_tension"],
+        p["controler.max_tension"],
+    )
+    # Forced convection fraction per unit of `fan.mass_flow_scalar`
+    mass_flow = fan_mass_flow(tension, p["fan.design_tension"], p["fan.mass_flow_max"], 1.0)
+    fraction = mass_flow / p["exchanger.max_mass_flow"]
+    delta = p["exchanger.surface"] * (T_cpu - T_air)
+    power = thermal_power(usage, p["cpu.tdp"])
+
+    size = machines.size
+    x0 = np.tile([float(p[name]) for name in FLEET_UNKNOWNS], (size, 1))
+    x = x0.copy()
+    saturated = np.zeros(index.size, dtype=bool)
+    h_forced = p["exchanger.h_forced"]
+    for _ in range(max_iter):
+        # A @ [h_adder, heat_capacity, mass_flow_scalar] == b, h_natural (and h_forced once
+        # saturated) moved to the right-hand side
+        A = np.stack([delta, rate, np.where(saturated, 0.0, h_forced * fraction * delta)], axis=1)
+        h_known = p["exchanger.h_natural"] + np.where(saturated, h_forced, 0.0)
+        b = power - h_known * delta
+
+        # Solve for the corrections of the free unknowns, the others stay at x0
+        r = b - np.einsum("ij,ij->i", A, x0[index])
+        A_free = A[:, free]
+        normal = _segment_sum(A_free[:, :, None] * A_free[:, None, :], index, size)
+        rhs = _segment_sum(A_free * r[:, None], index, size)
+        scale = np.sqrt(np.diagonal(normal, axis1=1, axis2=2))
+        scale = np.where(scale > 0.0, scale, 1.0)
+        normal = normal / (scale[:, :, None] * scale[:, None, :])
+        normal += regularization * np.eye(free.sum())
+        correction = np.linalg.solve(normal, (rhs / scale)[:, :, None])[:, :, 0] / scale
+        x = x0.copy()
+        x[:, free] += correction
+
+        current = x[index, 2] * fraction > 1.0
+        if np.array_equal(current, saturated):
+            break
+        saturated = current
+
+    error = (np.einsum("ij,ij->i", A, x[index]) - b) * dt / x[index, 1]
+    count = np.bincount(index, minlength=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rmse = np.sqrt(np.bincount(index, weights=error**2, minlength=size) / count)
+
+    result = pd.DataFrame(x, columns=FLEET_UNKNOWNS, index=pd.Index(machines, name=machine))
+    result["steps"] = count
+    result["rmse"] = rmse
+    return result
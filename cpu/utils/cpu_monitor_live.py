@@ -1,9 +1,7 @@
-import platform
-import subprocess
 import time
 from multiprocessing import Process, Queue
 
-import psutil
+from .telemetry import LiveSource, sample_telemetry
 
 
 def spin(duration: float):
@@ -22,59 +20,18 @@ def run_spinners(cpu_count: int, duration: float):
         process.join()
 
 
-def get_cpu_info(queue: Queue):
-    """Assess the platform and collect parameters from running CPU processors."""
-    is_mac = platform.system() == "Darwin"
-    is_linux = platform.system() == "Linux"
+def get_cpu_info(queue: Queue, rate: float = 1.0, duration: float = 90.0, source=LiveSource):
+    """Collect CPU usage, temperature and fan speed samples in `queue`, then "DONE".
 
-    t0 = time.time()
-    while time.time() - t0 < 90:
-        usage = psutil.cpu_percent(interval=1)
-
-        if is_mac:
-            # Temperature via istats
-            try:
-                result = subprocess.run(
-                    ["istats", "cpu", "--value-only"], capture_output=True, text=True
-                )
-                output = result.stdout.strip().replace("°C", "").strip()
-                temp_val = float(output)
-            except ValueError:
-                temp_val = None
-
-            # Get fan RPMs via istats
-            try:
-                result_fan = subprocess.run(
-                    ["istats", "fan", "--value-only"], capture_output=True, text=True
-                )
-                fan_output_lines = result_fan.stdout.strip().splitlines()
-                fan_rpms = int(fan_output_lines[1].replace("RPM", "").strip())
-            except ValueError:
-                fan_rpms = None
-
-        elif is_linux:
-            # Temperature via ps_utils
-            try:
-                temps = psutil.sensors_temperatures()
-                temp_val = temps["coretemp"][0].current
-            except Exception:
-                temp_val = None
-
-            # Fan RPMs via ps_utils
-            try:
-                fan_rpms = psutil.sensors_fans().popitem()[1][0].current
-            except Exception:
-                fan_rpms = None
-
-        elapsed = round(time.time() - t0, 3)
-        queue.put((elapsed, usage, temp_val, fan_rpms))
-
-    queue.put("DONE")
+    See `telemetry.sample_telemetry`; `source` may be a `ReplaySource` factory to run
+    without hardware sensors.
+    """
+    sample_telemetry(queue, source, rate, duration)
 
 
-def run_cpu_monitor(queue: Queue):
+def run_cpu_monitor(queue: Queue, rate: float = 1.0, duration: float = 90.0, source=LiveSource):
     """Run CPU info collection process."""
-    process = Process(target=get_cpu_info, args=(queue,))
+    process = Process(target=get_cpu_info, args=(queue, rate, duration, source))
     process.start()
     return process
 
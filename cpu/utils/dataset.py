@@ -0,0 +1,114 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..recorders import write_recording
+
+# Columns of the event detection datasets, the class label last (see notebook 6)
+DATASET_COLUMNS = ["T_cpu", "fan.T_air", "fan.tension", "working"]
+
+
+def _sample(cases, rng, counts):
+    """Split a random subset of `cases` into disjoint samples of `counts` rows."""
+    if sum(counts) > len(cases):
+        raise ValueError(f"{sum(counts)} cases requested, only {len(cases)} available")
+    order = rng.permutation(len(cases))
+    bounds = np.cumsum([0, *counts])
+    return [cases[order[start:stop]] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def build_datasets(
+    healthy,
+    broken,
+    size=1000,
+    broken_percent=20.0,
+    test_size=None,
+    test_broken_percent=50.0,
+    seed=None,
+):
+    """Build training and test sets of broken fan cases by stratified sampling.
+
+    Cases of each class are drawn without replacement from a single permutation, so that
+    the training and test sets never share a case.
+
+    Parameters
+    ----------
+    healthy, broken : pandas.DataFrame
+        Cases with working and broken fan, e.g. the recorder data of the DoE of notebook 6;
+        only the `DATASET_COLUMNS` features are kept.
+    size : int, optional
+        Number of training cases; default 1000.
+    broken_percent : float, optional
+        Percentage of broken fan cases in the training set; default 20.
+    test_size : int, optional
+        Number of test cases; default a fifth of `size`.
+    test_broken_percent : float, optional
+        Percentage of broken fan cases in the test set; default 50.
+    seed : int or numpy.random.Generator, optional
+        Random seed.
+
+    Returns
+    -------
+    train, test : pandas.DataFrame
+        Shuffled `DATASET_COLUMNS` cases.
+
+    Raises
+    ------
+    ValueError
+        If a class has fewer cases than requested.
+    """
+    rng = np.random.default_rng(seed)
+    test_size = size // 5 if test_size is None else test_size
+    n_broken = round(size * broken_percent / 100)
+    n_test_broken = round(test_size * test_broken_percent / 100)
+    features = DATASET_COLUMNS[:-1]
+
+    counts = {True: (size - n_broken, test_size - n_test_broken), False: (n_broken, n_test_broken)}
+    splits = ([], [])
+    for working, cases in ((True, healthy), (False, broken)):
+        values = cases[features].to_numpy(dtype=float)
+        for split, sample in zip(splits, _sample(values, rng, counts[working])):
+            split.append((sample, np.full(len(sample), working)))
+
+    datasets = []
+    for split in splits:
+        values = np.concatenate([values for values, _ in split])
+        working = np.concatenate([working for _, working in split])
+        order = rng.permutation(len(values))
+        data = pd.DataFrame(values[order], columns=features)
+        data["working"] = working[order]
+        datasets.append(data)
+    return tuple(datasets)
+
+
+def write_datasets(train, test, directory="data", suffix=".csv"):
+    """Write training and test sets with the file names of notebook 6.
+
+    File names give the size and the percentage of broken fan cases of the training set,
+    computed from its `working` column.
+
+    Parameters
+    ----------
+    train, test : pandas.DataFrame
+        Datasets, e.g. from `build_datasets`.
+    directory : str or Path, optional
+        Output directory; default "data".
+    suffix : str, optional
+        File format, see `recorders.write_recording`; default ".csv".
+
+    Returns
+    -------
+    train, test : Path
+        Written files.
+    """
+    directory = Path(directory)
+    broken_percent = 100.0 * (~train["working"].astype(bool)).mean()
+    name = f"{len(train)}_cases_{broken_percent:.3g}_percent_broken{suffix}"
+    filenames = directory / f"dataset_{name}", directory / f"test_set_{name}"
+    for data, filename in zip((train, test), filenames):
+        write_recording(data, filename)
+    return filenames
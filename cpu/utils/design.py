@@ -0,0 +1,88 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import warnings
+
+import numpy as np
+
+from .batch import BATCH_OUTPUTS, evaluate_batch
+
+
+def _residues(system, inputs, surface):
+    names = ["cpu.heat_flow", "cpu.power", "fan.tension"]
+    data = evaluate_batch(system, {**inputs, "exchanger.surface": surface}, names)
+    return (data["cpu.heat_flow"] - data["cpu.power"]).to_numpy(), data["fan.tension"].to_numpy()
+
+
+def solve_exchanger_surface(system, inputs, tol=1e-9, max_iter=20, outputs=None):
+    """Solve the `exchanger_surface` design method over many operating points at once.
+
+    The residue `cpu.heat_flow - cpu.power` is affine in `exchanger.surface` whenever the
+    controller tension is constant over the probed surfaces. This is checked with three
+    vectorized evaluations; affine points are solved in closed form, the others (if any)
+    are refined by a vectorized finite-difference Newton loop.
+
+    Parameters
+    ----------
+    system : CPUSystem
+        System providing the design parameters; left unchanged.
+    inputs : dict[str, float or array-like]
+        Operating points, e.g. `{"fan.T_air": [30.0, 40.0], "T_cpu": 80.0, "cpu.usage": 100.0}`.
+    tol : float, optional
+        Relative tolerance on the residue; default 1e-9.
+    max_iter : int, optional
+        Maximum number of Newton iterations for non-affine points; default 20.
+    outputs : list of str, optional
+        Output variable names evaluated at the solution; default `BATCH_OUTPUTS`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per operating point, including the solved `exchanger.surface`.
+    """
+    names = list(inputs)
+    values = np.broadcast_arrays(*(np.asarray(inputs[name], dtype=float) for name in names))
+    inputs = {name: np.ravel(value) for name, value in zip(names, values)}
+    size = values[0].size if values else 1
+
+    s0 = float(system.exchanger.surface) or 1.0
+    probes = np.repeat(np.r_[s0, 2.0 * s0, 0.5 * s0], size)
+    r, tension = _residues(system, {n: np.tile(v, 3) for n, v in inputs.items()}, probes)
+    (r0, r1, r2), (t0, t1, t2) = r.reshape(3, size), tension.reshape(3, size)
+
+    slope = (r1 - r0) / s0
+    scale = np.maximum(np.abs(r0), np.abs(r1)) + 1.0
+    affine = (
+        (slope != 0.0)
+        & (t0 == t1)
+        & (t1 == t2)
+        & (np.abs(r2 - (r0 - 0.5 * s0 * slope)) <= tol * scale)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        surface = np.where(affine, s0 - r0 / slope, s0)
+
+    todo = np.flatnonzero(~affine)
+    for _ in range(max_iter):
+        if todo.size == 0:
+            break
+        x = surface[todo]
+        h = 1e-6 * np.maximum(np.abs(x), 1e-6)
+        sub = {name: np.tile(v[todo], 2) for name, v in inputs.items()}
+        r, _ = _residues(system, sub, np.r_[x, x + h])
+        rx, rh = r[: todo.size], r[todo.size :]
+        pending = ~(np.abs(rx) <= tol * scale[todo])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            surface[todo] = np.where(pending, x - rx * h / (rh - rx), x)
+        todo = todo[pending]
+
+    if todo.size:
+        warnings.warn(
+            f"exchanger surface design did not converge for {todo.size} point(s)",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        surface[todo] = np.nan
+
+    return evaluate_batch(
+        system, {**inputs, "exchanger.surface": surface}, outputs or BATCH_OUTPUTS
+    )
@@ -1,11 +1,103 @@
 # Copyright (C) 2024, twiinIT
 # SPDX-License-Identifier: Apache-2.0
 
-import ipywidgets as widgets
-
+import asyncio
+import threading
 
-def compare_with_image(s, render2d, render):
-    """Compare with image."""
+import ipywidgets as widgets
+from pythreejs import BufferAttribute, BufferGeometry, Mesh, MeshPhongMaterial
+
+from .mesh_export import MeshLevels
+from .update_engine import UpdateEngine
+
+
+class MeshView:
+    """Display the levels of detail of a shape in a pyoccad renderer with typed-array meshes.
+
+    Instanced sub-shapes share a single buffer geometry, so only one blade is sent to the
+    browser whatever the blade count. The meshes are the faces of a shape group added to
+    the renderer under `uid`; `preview` displays the coarsest level and `update` the level
+    of `quality`.
+
+    Parameters
+    ----------
+    render : JupyterThreeJSRenderer
+        Renderer; a shape already displayed under `uid` is replaced.
+    uid : str
+        Unique id of the displayed mesh.
+    color : str, optional
+        Face color; default "#156289".
+    quality : float, optional
+        Displayed quality between 0 and 1, see `MeshLevels.select`; default 1.0 is the
+        finest level.
+    **kwargs
+        `MeshLevels` keyword arguments.
+    """
+
+    def __init__(self, render, uid, color="#156289", quality=1.0, **kwargs):
+        self.render = render
+        self.uid = uid
+        self.quality = quality
+        self.options = kwargs
+        self.levels = None
+        self._material = MeshPhongMaterial(color=color, side="DoubleSide")
+        self._group = render.add_shape(None, uid, force=True).faces_group
+        self._lock = threading.Lock()
+
+    def _show(self, index):
+        children = []
+        for vertices, triangles, matrices in self.levels.level(index):
+            geometry = BufferGeometry(
+                attributes=dict(
+                    position=BufferAttribute(vertices, normalized=False),
+                    index=BufferAttribute(triangles.ravel(), normalized=False),
+                )
+            )
+            geometry.exec_three_obj_method("computeVertexNormals")
+            for matrix in matrices.astype(float):
+                # three.js matrices are stored in column-major order
+                children.append(
+                    Mesh(
+                        geometry=geometry,
+                        material=self._material,
+                        matrix=tuple(matrix.T.ravel()),
+                        matrixAutoUpdate=False,
+                    )
+                )
+        self._group.children = tuple(children)
+
+    def update(self, shape, index=None):
+        """Display `shape` at level `index`; default selects it from `quality`."""
+        with self._lock:
+            if self.levels is None or self.levels.shape is not shape:
+                self.levels = MeshLevels(shape, **self.options)
+            if index is None:
+                index = self.levels.select(quality=self.quality)
+            self._show(index)
+
+    def preview(self, shape):
+        """Display the coarsest level of `shape`."""
+        self.update(shape, 0)
+
+
+def _close_with(widget, engine):
+    """Close `engine` once `widget` is closed, which resets its comm."""
+
+    def on_comm_change(change):
+        if change["new"] is None:
+            engine.close()
+
+    widget.observe(on_comm_change, names="comm")
+
+
+def compare_with_image(s, render2d, render, lod=True):
+    """Compare with image.
+
+    Slider changes are coalesced and applied to `s` by an `UpdateEngine` in a background
+    thread, and displayed on the kernel event loop. With `lod`, a coarse mesh is displayed
+    while dragging, refined once the slider is released. The engine is closed with the
+    returned widget.
+    """
     file = open("../images/fan.png", "rb")
     image = file.read()
     img = widgets.Image(
@@ -39,28 +131,48 @@ def compare_with_image(s, render2d, render):
         readout=True,
     )
 
+    views = []
+    if lod:
+        views = [MeshView(render, "blade"), MeshView(render2d, "blade")]
+        for view in views:
+            view.update(s.geometry.shape)
+
+    def publish(final):
+        for view in views:
+            if final:
+                view.update(s.geometry.shape)
+            else:
+                view.preview(s.geometry.shape)
+        if not (views or final):
+            render.update_shape(s.geometry.shape, uid="blade")
+            render2d.update_shape(s.geometry.shape, uid="blade")
+
+    engine = UpdateEngine(s, publish, loop=asyncio.get_event_loop())
+
     def on_count_value_change(change):
-        s.rotor.count = change["new"]
-        s.run_drivers()
-        render.update_shape(s.geometry.shape, uid="blade")
-        render2d.update_shape(s.geometry.shape, uid="blade")
+        engine.submit(**{"rotor.count": change["new"]})
 
     def on_inlet_angle_value_change(change):
-        s.rotor.blade.inlet_angle = change["new"]
-        s.run_drivers()
-        render.update_shape(s.geometry.shape, uid="blade")
-        render2d.update_shape(s.geometry.shape, uid="blade")
+        engine.submit(**{"rotor.blade.inlet_angle": change["new"]})
 
     blade_slider.observe(on_count_value_change, names="value")
     inlet_angle_slider.observe(on_inlet_angle_value_change, names="value")
 
-    return widgets.HBox(
+    box = widgets.HBox(
         [render2d.show(), img, render.show(), widgets.VBox([blade_slider, inlet_angle_slider])]
     )
+    _close_with(box, engine)
+    return box
+
 
+def grid_display(s, render, lod=True):
+    """Display grid.
 
-def grid_display(s, render):
-    """Display grid."""
+    Slider changes are coalesced and applied to `s` by an `UpdateEngine` in a background
+    thread, and displayed on the kernel event loop. With `lod`, a coarse mesh is displayed
+    while dragging, refined once the slider is released. The engine is closed with the
+    returned widget.
+    """
     blade_slider = widgets.IntSlider(
         value=60,
         min=50,
@@ -85,17 +197,31 @@ def grid_display(s, render):
         readout=True,
     )
 
+    view = None
+    if lod:
+        view = MeshView(render, "row")
+        view.update(s.geometry)
+
+    def publish(final):
+        if view is not None:
+            if final:
+                view.update(s.geometry)
+            else:
+                view.preview(s.geometry)
+        elif not final:
+            render.update_shape(s.geometry, uid="row")
+
+    engine = UpdateEngine(s, publish, loop=asyncio.get_event_loop())
+
     def on_count_value_change(change):
-        s.count = change["new"]
-        s.run_drivers()
-        render.update_shape(s.geometry, uid="row")
+        engine.submit(count=change["new"])
 
     def on_inlet_angle_value_change(change):
-        s.blade.inlet_angle = change["new"]
-        s.run_drivers()
-        render.update_shape(s.geometry, uid="row")
+        engine.submit(**{"blade.inlet_angle": change["new"]})
 
     blade_slider.observe(on_count_value_change, names="value")
     inlet_angle_slider.observe(on_inlet_angle_value_change, names="value")
 
-    return widgets.HBox([render.show(), widgets.VBox([blade_slider, inlet_angle_slider])])
+    box = widgets.HBox([render.show(), widgets.VBox([blade_slider, inlet_angle_slider])])
+    _close_with(box, engine)
+    return box
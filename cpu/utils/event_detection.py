@@ -0,0 +1,190 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import pickle
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .mlp import MLPKernel
+
+# Inputs of the broken fan classifier, in the order of the detector samples; they are
+# permuted into the training order of the classifier (`DATASET_COLUMNS`, see notebook 7)
+FEATURES = ["fan.T_air", "T_cpu", "fan.tension"]
+
+# Fields of the records streamed to a `FanEventDetector`
+DETECTOR_FIELDS = ["time"] + FEATURES
+
+FanEvent = namedtuple("FanEvent", ["time", "fan_working_diagnostic", "working_proba", "onset"])
+FanEvent.__doc__ = """Fan diagnostic switch.
+
+Time of the sample confirming the switch, new diagnostic, working probability of that
+sample, and time of the first sample beyond the threshold, i.e. the start of the event.
+"""
+
+
+class FanEventDetector:
+    """Detect broken fan events on a stream of samples with the broken fan classifier.
+
+    Samples are normalized with the training mean and standard deviation, kept as NumPy
+    vectors, and scored by micro-batches. The working/non-working decision is debounced with
+    hysteresis: the fan is diagnosed broken once the working probability stays below `low`
+    for `count` consecutive samples, and working again once it stays above `high` as long.
+
+    Parameters
+    ----------
+    classifier : object
+        Classifier with a `predict_proba` method and `classes_` attribute, e.g. the
+        `MLPClassifier` trained in notebook 7 or its `mlp.MLPKernel` export.
+    mean, std : array-like
+        Mean and standard deviation of the classifier inputs on the training set, in
+        `inputs` order.
+    low, high : float, optional
+        Working probability thresholds of the hysteresis; default 0.1 and 0.9.
+    count : int, optional
+        Number of consecutive samples beyond a threshold to switch; default 3.
+    on_event : callable, optional
+        Called with each `FanEvent`, e.g. `lambda event: apply_diagnostic(runner, event)`.
+    inputs : list of str, optional
+        `FEATURES` names in the training order of the classifier; default `FEATURES`.
+    """
+
+    def __init__(
+        self, classifier, mean, std, low=0.1, high=0.9, count=3, on_event=None, inputs=None
+    ):
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError(f"Expected 0 <= low <= high <= 1, got {low} and {high}")
+        inputs = FEATURES if inputs is None else list(inputs)
+        if sorted(inputs) != sorted(FEATURES):
+            raise ValueError(f"Expected classifier inputs {FEATURES}, got {inputs}")
+        self.classifier = classifier
+        self.inputs = inputs
+        self._order = [FEATURES.index(name) for name in inputs]
+        self.mean = np.ravel(np.asarray(mean, dtype=float))
+        self.scale = 1.0 / np.ravel(np.asarray(std, dtype=float))
+        self._column = list(classifier.classes_).index(True)
+        self.low = low
+        self.high = high
+        self.count = count
+        self.on_event = on_event
+
+        self.working = True
+        self.samples = 0
+        self._streak = 0
+        self._onset = None
+
+    @classmethod
+    def load(cls, classifier, mean=None, std=None, **kwargs):
+        """Create a detector from the files written by notebook 7.
+
+        Parameters
+        ----------
+        classifier : str or Path
+            Classifier exported by `mlp.export_classifier`, e.g.
+            "data/broken_fan_classifier.npz", loaded without scikit-learn; or pickled
+            classifier, e.g. "data/broken_fan_classifier.pkl".
+        mean, std : str or Path, optional
+            CSV files of the training mean and standard deviation, e.g.
+            "data/broken_fan_classifier_mean.csv"; default those of an exported classifier.
+            The classifier inputs are in the order of the exported features or, for a
+            pickled classifier, of the `mean` index.
+        **kwargs
+            `FanEventDetector` keyword arguments.
+        """
+        if Path(classifier).suffix == ".npz":
+            classifier = MLPKernel.load(classifier)
+            inputs = classifier.features
+            default_mean = pd.Series(classifier.mean, index=inputs)
+            default_std = pd.Series(classifier.std, index=inputs)
+        else:
+            with open(classifier, "rb") as file:
+                classifier = pickle.load(file)
+            inputs = default_mean = default_std = None
+        mean = default_mean if mean is None else pd.read_csv(mean, index_col=0).iloc[:, 0]
+        std = default_std if std is None else pd.read_csv(std, index_col=0).iloc[:, 0]
+        inputs = list(mean.index) if inputs is None else inputs
+        return cls(classifier, mean.loc[inputs], std.loc[inputs], inputs=inputs, **kwargs)
+
+    def score(self, features):
+        """Return the working probabilities of samples of `FEATURES` values (one per row)."""
+        x = np.asarray(features, dtype=float).reshape(-1, len(FEATURES))[:, self._order]
+        x = (x - self.mean) * self.scale
+        # Missing values are set to the mean, as for training
+        x[np.isnan(x)] = 0.0
+        return self.classifier.predict_proba(x)[:, self._column]
+
+    def update(self, times, features):
+        """Score a micro-batch of samples and return the resulting `FanEvent` list.
+
+        Parameters
+        ----------
+        times : array-like
+            Sample times.
+        features : array-like
+            `FEATURES` values, one sample per row.
+        """
+        probas = self.score(features)
+        self.samples += len(probas)
+        # Samples beyond the threshold switching the current decision
+        beyond = probas < self.low if self.working else probas > self.high
+        if not beyond.any() and self._streak == 0:
+            return []
+
+        events = []
+        for t, proba in zip(np.ravel(times).tolist(), probas.tolist()):
+            if (proba < self.low) if self.working else (proba > self.high):
+                if self._streak == 0:
+                    self._onset = t
+                self._streak += 1
+            else:
+                self._streak = 0
+            if self._streak >= self.count:
+                self.working = not self.working
+                self._streak = 0
+                event = FanEvent(t, self.working, proba, self._onset)
+                events.append(event)
+                if self.on_event is not None:
+                    self.on_event(event)
+        return events
+
+    def run(self, samples, timeout=None):
+        """Process the records of a transport until the end of the stream.
+
+        Parameters
+        ----------
+        samples : transport
+            `transport.QueueTransport` or `SharedMemoryTransport` of `DETECTOR_FIELDS`
+            records; each batch of records is scored as a micro-batch.
+        timeout : float, optional
+            Maximum wait for a batch (s); default `None` waits forever.
+
+        Returns
+        -------
+        list of FanEvent
+        """
+        events = []
+        for batch in samples.batches(timeout):
+            features = np.stack([batch[name] for name in FEATURES], axis=1)
+            events += self.update(batch["time"], features)
+        return events
+
+
+def apply_diagnostic(twin, event, machine=None):
+    """Set `fan.mass_flow_scalar` of a live twin from a `FanEvent`, as in notebook 11.
+
+    Parameters
+    ----------
+    twin : twin.TwinRunner or twin_host.TwinHost
+        Twin to update; takes effect at its next tick.
+    event : FanEvent
+        Detected event; a broken fan gives no mass flow.
+    machine : optional
+        Machine of the event, for a `TwinHost`.
+    """
+    value = float(event.fan_working_diagnostic)
+    if machine is None:
+        twin.parameters["fan.mass_flow_scalar"] = value
+    else:
+        twin.parameters["fan.mass_flow_scalar"][twin.indices([machine])] = value
@@ -0,0 +1,380 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import functools
+import hashlib
+import weakref
+from collections import OrderedDict
+from numbers import Number
+from pathlib import Path
+
+import numpy as np
+from OCC.Core.BRep import BRep_Builder, BRep_Tool
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Copy, BRepBuilderAPI_MakeEdge
+from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+from OCC.Core.BRepTools import breptools
+from OCC.Core.Geom import Geom_Curve
+from OCC.Core.TopAbs import TopAbs_FACE, TopAbs_REVERSED
+from OCC.Core.TopExp import TopExp_Explorer
+from OCC.Core.TopLoc import TopLoc_Location
+from OCC.Core.TopoDS import TopoDS_Shape, topods
+
+
+def _update(digest, value):
+    if value is None or isinstance(value, (bool, str)):
+        digest.update(repr(value).encode())
+    elif isinstance(value, Number):
+        digest.update(repr(float(value)).encode())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype.str}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    else:
+        raise TypeError(f"Cannot hash value of type {type(value).__name__}")
+
+
+def inward_key(system):
+    """Return a digest of the input values of `system` and of all its children.
+
+    Parameters
+    ----------
+    system : cosapp.systems.System
+        Geometry system.
+
+    Returns
+    -------
+    str or None
+        Hexadecimal digest, or `None` if an input value cannot be hashed.
+    """
+    digest = hashlib.sha256()
+    try:
+        for sub in system.tree():
+            digest.update(f"{type(sub).__qualname__}:{sub.name}".encode())
+            for port in sub.inputs.values():
+                for name, value in port.items():
+                    digest.update(f"{port.name}.{name}=".encode())
+                    _update(digest, value)
+    except TypeError:
+        return None
+    return digest.hexdigest()
+
+
+def _copy(value):
+    return value.copy() if isinstance(value, np.ndarray) else value
+
+
+class ShapeCache:
+    """Least recently used cache of geometry outputs and meshes, optionally stored on disk.
+
+    Entries are dictionaries of output values keyed by `inward_key`. With a `directory`,
+    entries are also written there (shapes as BREP files, curves as BREP edges, other
+    values as plain arrays in a `.npz` file) and read back after eviction or in another
+    session. Triangulations of cached shapes are cached as well, see `mesh`.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of entries kept in memory; default 128.
+    directory : str or Path, optional
+        Directory of the on-disk store; default `None` keeps entries in memory only.
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = None if directory is None else Path(directory)
+        self._entries = OrderedDict()
+        self._keys = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Return the number of entries in memory."""
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Return whether `key` is cached, in memory or on disk."""
+        return key in self._entries or self._path(key, "npz") is not None
+
+    def _path(self, key, suffix):
+        if self.directory is None:
+            return None
+        path = self.directory / f"{key}.{suffix}"
+        return path if path.exists() else None
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        for value in entry.values():
+            if isinstance(value, TopoDS_Shape):
+                self._keys[value] = key
+        while len(self._entries) > self.maxsize:
+            evicted, entry = self._entries.popitem(last=False)
+            for value in entry.values():
+                if isinstance(value, TopoDS_Shape) and self._keys.get(value) == evicted:
+                    del self._keys[value]
+
+    def get(self, key):
+        """Return the entry stored under `key`, or `None`."""
+        entry = self._entries.get(key)
+        if entry is None and self.directory is not None:
+            entry = self._read(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """Store `entry`, a dictionary of output values, under `key`."""
+        self._remember(key, dict(entry))
+        if self.directory is not None:
+            self._write(key, entry)
+
+    def key_of(self, shape):
+        """Return the key of the entry holding `shape`, or `None`."""
+        return self._keys.get(shape)
+
+    def clear(self):
+        """Clear in-memory entries; the on-disk store is kept."""
+        self._entries.clear()
+        self._keys.clear()
+        self.hits = self.misses = 0
+
+    def _write(self, key, entry):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        shapes, curves, nones, values = [], [], [], {}
+        for name, value in entry.items():
+            if isinstance(value, TopoDS_Shape):
+                breptools.Write(value, str(self.directory / f"{key}-{name}.brep"))
+                shapes.append(name)
+            elif isinstance(value, Geom_Curve):
+                edge = BRepBuilderAPI_MakeEdge(value).Edge()
+                breptools.Write(edge, str(self.directory / f"{key}-{name}.brep"))
+                curves.append(name)
+            elif value is None:
+                nones.append(name)
+            elif isinstance(value, (Number, np.ndarray)) and not np.asarray(value).dtype.hasobject:
+                values[name] = np.asarray(value)
+            else:
+                # Entries with values that cannot be stored as plain arrays stay in memory
+                return
+        np.savez(
+            self.directory / f"{key}.npz",
+            __shapes__=np.array(shapes, dtype=str),
+            __curves__=np.array(curves, dtype=str),
+            __nones__=np.array(nones, dtype=str),
+            **values,
+        )
+
+    def _read(self, key):
+        path = self._path(key, "npz")
+        if path is None:
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            entry = {
+                name: data[name][()] if data[name].ndim == 0 else data[name]
+                for name in data.files
+                if name not in ("__shapes__", "__curves__", "__nones__")
+            }
+            shapes, curves = list(data["__shapes__"]), list(data["__curves__"])
+            entry.update(dict.fromkeys(data["__nones__"].tolist()))
+        for name in shapes + curves:
+            shape = TopoDS_Shape()
+            breptools.Read(shape, str(self.directory / f"{key}-{name}.brep"), BRep_Builder())
+            entry[name] = BRep_Tool.Curve(topods.Edge(shape))[0] if name in curves else shape
+        return entry
+
+    def mesh(self, shape, linear_deflection=1e-4, angular_deflection=0.5):
+        """Return the triangulation of `shape`, cached if `shape` comes from an entry.
+
+        Parameters
+        ----------
+        shape : TopoDS_Shape
+            Shape to triangulate.
+        linear_deflection : float, optional
+            Maximum chordal deviation; default 1e-4.
+        angular_deflection : float, optional
+            Maximum angular deviation (rad); default 0.5.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            Vertex coordinates of shape `(n, 3)` and triangle vertex indices of shape `(m, 3)`.
+        """
+        key = self.key_of(shape)
+        if key is None:
+            return triangulate(shape, linear_deflection, angular_deflection)
+
+        mesh_key = f"{key}-mesh-{linear_deflection:g}-{angular_deflection:g}"
+        entry = self.get(mesh_key)
+        if entry is None:
+            vertices, triangles = triangulate(shape, linear_deflection, angular_deflection)
+            entry = {"vertices": vertices, "triangles": triangles}
+            self.put(mesh_key, entry)
+        return entry["vertices"], entry["triangles"]
+
+
+def triangulate(shape, linear_deflection=1e-4, angular_deflection=0.5):
+    """Mesh `shape` and return its triangulation as arrays.
+
+    A copy of `shape` without triangulation is meshed, so the deflection is the requested
+    one and the triangulations of `shape`, e.g. shared with cache entries or renderers,
+    are left untouched.
+
+    Parameters
+    ----------
+    shape : TopoDS_Shape
+        Shape to triangulate.
+    linear_deflection : float, optional
+        Maximum chordal deviation; default 1e-4.
+    angular_deflection : float, optional
+        Maximum angular deviation (rad); default 0.5.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        Vertex coordinates of shape `(n, 3)` and triangle vertex indices of shape `(m, 3)`.
+    """
+    shape = BRepBuilderAPI_Copy(shape, False, False).Shape()
+    BRepMesh_IncrementalMesh(shape, linear_deflection, False, angular_deflection, True)
+
+    vertices, triangles, offset = [], [], 0
+    explorer = TopExp_Explorer(shape, TopAbs_FACE)
+    while explorer.More():
+        face = topods.Face(explorer.Current())
+        location = TopLoc_Location()
+        triangulation = BRep_Tool.Triangulation(face, location)
+        explorer.Next()
+        if triangulation is None:
+            continue
+
+        trsf = location.Transformation()
+        nodes = [
+            triangulation.Node(i).Transformed(trsf).Coord()
+            for i in range(1, triangulation.NbNodes() + 1)
+        ]
+        faces = np.array(
+            [triangulation.Triangle(i).Get() for i in range(1, triangulation.NbTriangles() + 1)],
+            dtype=np.int64,
+        ).reshape(-1, 3)
+        if face.Orientation() == TopAbs_REVERSED:
+            faces = faces[:, ::-1]
+        vertices.append(np.array(nodes, dtype=float).reshape(-1, 3))
+        triangles.append(faces - 1 + offset)
+        offset += len(nodes)
+
+    if not vertices:
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+    return np.concatenate(vertices), np.concatenate(triangles)
+
+
+geometry_cache = ShapeCache()
+
+# Input digest of the last computation of each geometry system
+_computed_keys = weakref.WeakKeyDictionary()
+
+
+def get_geometry_cache():
+    """Return the cache used by geometry systems, or `None` if caching is disabled."""
+    return geometry_cache
+
+
+def set_geometry_cache(cache):
+    """Set the cache used by geometry systems; `None` disables caching.
+
+    Parameters
+    ----------
+    cache : ShapeCache or None
+        New cache.
+
+    Returns
+    -------
+    ShapeCache or None
+        Previous cache.
+    """
+    global geometry_cache
+    previous, geometry_cache = geometry_cache, cache
+    return previous
+
+
+def cached_compute(compute):
+    """Decorate a geometry system `compute` method to skip unchanged or already seen inputs.
+
+    If the `inward_key` of the system is the one of its last computation, outputs are
+    up to date and nothing is done. Otherwise, outputs are looked up in the current
+    geometry cache; on a miss, `compute` runs and all output values are stored.
+    """
+
+    @functools.wraps(compute)
+    def wrapper(self):
+        key = inward_key(self)
+        if key is None:
+            _computed_keys.pop(self, None)
+            return compute(self)
+        if _computed_keys.get(self) == key:
+            return
+
+        cache = geometry_cache
+        entry = None if cache is None else cache.get(key)
+        if entry is not None:
+            for port in self.outputs.values():
+                for name, _ in port.items():
+                    port[name] = _copy(entry[f"{port.name}.{name}"])
+        else:
+            compute(self)
+            if cache is not None:
+                cache.put(
+                    key,
+                    {
+                        f"{port.name}.{name}": _copy(value)
+                        for port in self.outputs.values()
+                        for name, value in port.items()
+                    },
+                )
+        _computed_keys[self] = key
+
+    return wrapper
+
+
+def cached_function(func):
+    """Decorate a shape building function to reuse its results through the geometry cache.
+
+    Results are stored in the current geometry cache, under a digest of the function name
+    and arguments; shape arguments are identified by the key of the cache entry holding
+    them. Calls are not cached if the cache is disabled, or if an argument cannot be
+    hashed or is a shape unknown to the cache.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        cache = geometry_cache
+        if cache is None:
+            return func(*args)
+        digest = hashlib.sha256(name.encode())
+        try:
+            for arg in args:
+                if isinstance(arg, TopoDS_Shape):
+                    key = cache.key_of(arg)
+                    if key is None:
+                        return func(*args)
+                    digest.update(key.encode())
+                else:
+                    _update(digest, arg)
+        except TypeError:
+            return func(*args)
+
+        key = digest.hexdigest()
+        entry = cache.get(key)
+        if entry is None:
+            entry = {"result": func(*args)}
+            cache.put(key, entry)
+        return entry["result"]
+
+    return wrapper
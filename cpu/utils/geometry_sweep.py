@@ -0,0 +1,195 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from OCC.Core.BRepGProp import brepgprop
+from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+from OCC.Core.BRepTools import breptools
+from OCC.Core.GProp import GProp_GProps
+from OCC.Core.StlAPI import StlAPI_Writer
+
+from ..recorders import write_recording
+
+GEOMETRY_OUTPUTS = [
+    "rotor.blade.stagger_angle",
+    "rotor.blade_dimension",
+    "rotor.blade_position",
+    "casing.width",
+    "casing.height",
+]
+
+# Errors of a failing design: OCC failures, raised as RuntimeError by pythonocc, invalid
+# parameter values and degenerate geometries
+DESIGN_ERRORS = (RuntimeError, ValueError, ArithmeticError, SystemError)
+
+_worker = {}
+
+
+def _init_worker(brep_dir, stl_dir, deflection):
+    """Build the worker fan geometry once; it is reused for every case of the worker."""
+    from cpu.systems import FanGeometry
+
+    _worker["system"] = FanGeometry("fan")
+    _worker["brep_dir"] = brep_dir
+    _worker["stl_dir"] = stl_dir
+    _worker["deflection"] = deflection
+
+
+def shape_measures(shape):
+    """Return the volume, area and center of mass of `shape`.
+
+    Parameters
+    ----------
+    shape : TopoDS_Shape
+        Shape to measure.
+
+    Returns
+    -------
+    dict[str, float or numpy.ndarray]
+        `volume`, `area` and `center` values.
+    """
+    volume, surface = GProp_GProps(), GProp_GProps()
+    brepgprop.VolumeProperties(shape, volume)
+    brepgprop.SurfaceProperties(shape, surface)
+    return {
+        "volume": volume.Mass(),
+        "area": surface.Mass(),
+        "center": np.array(volume.CentreOfMass().Coord()),
+    }
+
+
+def _write_files(shape, reference):
+    files = {}
+    if _worker["brep_dir"] is not None:
+        path = Path(_worker["brep_dir"]) / f"{reference}.brep"
+        breptools.Write(shape, str(path))
+        files["brep"] = str(path)
+    if _worker["stl_dir"] is not None:
+        path = Path(_worker["stl_dir"]) / f"{reference}.stl"
+        BRepMesh_IncrementalMesh(shape, _worker["deflection"], False, 0.5, True)
+        StlAPI_Writer().Write(shape, str(path))
+        files["stl"] = str(path)
+    return files
+
+
+def _run_chunk(names, values, references):
+    """Build a chunk of fan designs on the worker system and return one row per design."""
+    system = _worker["system"]
+
+    rows = []
+    for case, reference in zip(values, references):
+        row = {"reference": reference, "error": ""}
+        try:
+            for name, value in zip(names, case):
+                system[name] = value
+            system.run_once()
+
+            for name in GEOMETRY_OUTPUTS:
+                row[name] = copy.deepcopy(system[name])
+            shape = system.geometry.shape
+            if shape is not None:  # no shape with `metrics_only`
+                row.update(shape_measures(shape))
+                row.update(_write_files(shape, reference))
+        except DESIGN_ERRORS as error:  # a failing design must not stop the sweep
+            row["error"] = f"{type(error).__name__}: {error}"
+        rows.append(row)
+
+    return rows
+
+
+def _flatten(data):
+    """Split array columns into one scalar column per component, e.g. `center[0]`."""
+    columns = {}
+    for name, values in data.items():
+        arrays = [np.ravel(v) for v in values if isinstance(v, np.ndarray)]
+        if not arrays:
+            columns[name] = values
+            continue
+        size = max(a.size for a in arrays)
+        for i in range(size):
+            columns[f"{name}[{i}]"] = [
+                np.ravel(v)[i] if isinstance(v, np.ndarray) and np.size(v) > i else np.nan
+                for v in values
+            ]
+    return pd.DataFrame(columns, index=data.index)
+
+
+def run_geometry_sweep(
+    cases,
+    filename=None,
+    brep_dir=None,
+    stl_dir=None,
+    deflection=1e-4,
+    max_workers=None,
+    chunksize=None,
+):
+    """Build `FanGeometry` designs over a process pool and collect their measures.
+
+    Each worker builds its `FanGeometry` once, then sets the parameters of each case of
+    its chunks (e.g. `rotor.blade.inlet_angle`, `rotor.count`, `casing.clearance_ratio`)
+    and rebuilds the geometry, only regenerating the subsystems whose inputs changed.
+    A design whose construction fails with one of `DESIGN_ERRORS` gets an `error` message
+    and missing measures; other errors stop the sweep. Designs with `metrics_only` set only
+    get `GEOMETRY_OUTPUTS`, without shape measures nor files.
+
+    Parameters
+    ----------
+    cases : pandas.DataFrame or dict[str, array-like]
+        Parameter values, one column per `FanGeometry` variable name and one row per design.
+    filename : str or Path, optional
+        Parquet or Arrow IPC file the results are written to; default `None` only returns
+        them.
+    brep_dir, stl_dir : str or Path, optional
+        Directories the BREP and STL files of the designs are written to, named after the
+        case reference; default `None` writes no file.
+    deflection : float, optional
+        Linear deflection of the STL meshes; default 1e-4.
+    max_workers : int, optional
+        Number of worker processes; default `os.cpu_count()`.
+    chunksize : int, optional
+        Number of cases per task; default splits the cases in four tasks per worker.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per design, in case order, with parameters, `GEOMETRY_OUTPUTS`, `volume`,
+        `area` and `center` measures (array components split in `name[i]` columns), file
+        paths and `error`.
+    """
+    cases = pd.DataFrame(cases).reset_index(drop=True)
+    names = list(cases.columns)
+    values = cases.to_numpy(dtype=object).tolist()
+    references = [str(i) for i in range(len(values))]
+    for directory in (brep_dir, stl_dir):
+        if directory is not None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+
+    max_workers = max_workers or os.cpu_count()
+    if chunksize is None:
+        chunksize = max(1, int(np.ceil(len(values) / (4 * max_workers))))
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(brep_dir, stl_dir, deflection),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_chunk, names, values[i : i + chunksize], references[i : i + chunksize]
+            )
+            for i in range(0, len(values), chunksize)
+        ]
+        rows = [row for future in futures for row in future.result()]
+
+    results = _flatten(pd.DataFrame(rows, index=cases.index).drop(columns="reference"))
+    results = pd.concat([cases, results.drop(columns="error"), results["error"]], axis=1)
+
+    if filename is not None:
+        write_recording(results, filename)
+    return results
@@ -0,0 +1,110 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Transform
+from OCC.Core.TopAbs import TopAbs_COMPOUND
+from OCC.Core.TopLoc import TopLoc_Location
+from OCC.Core.TopoDS import TopoDS_Iterator
+from pyoccad.create import CreateRotation
+
+from .geometry_cache import get_geometry_cache, triangulate
+
+
+def rotated_instances(shape, count, angle=None, instanced=True):
+    """Return `count` copies of `shape` rotated around the x axis.
+
+    Instances share the B-rep of `shape` and only differ by their `TopLoc_Location`, so
+    memory and meshing cost do not grow with `count`.
+
+    Parameters
+    ----------
+    shape : TopoDS_Shape
+        Shape to repeat.
+    count : int
+        Number of instances.
+    angle : float, optional
+        Angle between consecutive instances (rad); default `2 * pi / count`.
+    instanced : bool, optional
+        Share the B-rep of `shape`; default `True`. If `False`, each instance is a deep
+        copy made by `BRepBuilderAPI_Transform`.
+
+    Returns
+    -------
+    list of TopoDS_Shape
+        Rotated instances, the first one at the position of `shape`.
+    """
+    if angle is None:
+        angle = 2.0 * np.pi / count
+
+    instances = []
+    for i in range(count):
+        trsf = CreateRotation.rotation_x(angle * i)
+        if instanced:
+            instances.append(shape.Moved(TopLoc_Location(trsf)))
+        else:
+            # Without copy, rigid transforms only set the location of a shared B-rep
+            instances.append(BRepBuilderAPI_Transform(shape, trsf, True).Shape())
+    return instances
+
+
+def _matrix(location):
+    trsf = location.Transformation()
+    matrix = np.eye(4)
+    for i in range(3):
+        for j in range(4):
+            matrix[i, j] = trsf.Value(i + 1, j + 1)
+    return matrix
+
+
+def instanced_mesh(shape, linear_deflection=1e-4, angular_deflection=0.5):
+    """Triangulate each distinct B-rep of a compound once, with the placements of its instances.
+
+    Sub-shapes of `shape` sharing the same B-rep (e.g. blades made by `rotated_instances`)
+    are meshed once, in their own frame, through `ShapeCache.mesh` of the geometry cache.
+
+    Parameters
+    ----------
+    shape : TopoDS_Shape
+        Compound of possibly instanced sub-shapes; nested compounds are explored.
+    linear_deflection : float, optional
+        Maximum chordal deviation; default 1e-4.
+    angular_deflection : float, optional
+        Maximum angular deviation (rad); default 0.5.
+
+    Returns
+    -------
+    list of tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        For each distinct B-rep, vertex coordinates `(n, 3)`, triangle vertex indices
+        `(m, 3)` and the `(k, 4, 4)` homogeneous transforms of its `k` instances.
+    """
+    prototypes, placements = [], []
+    # Sub-shapes returned by the iterator carry the locations of their parents
+    stack = [shape]
+    while stack:
+        iterator = TopoDS_Iterator(stack.pop())
+        while iterator.More():
+            sub = iterator.Value()
+            iterator.Next()
+            if sub.ShapeType() == TopAbs_COMPOUND:
+                stack.append(sub)
+                continue
+            matrix = _matrix(sub.Location())
+            for prototype, matrices in zip(prototypes, placements):
+                if sub.IsPartner(prototype):
+                    matrices.append(matrix)
+                    break
+            else:
+                prototypes.append(sub)
+                placements.append([matrix])
+
+    # Prototypes output by geometry systems have their triangulation cached
+    cache = get_geometry_cache()
+    mesh = triangulate if cache is None else cache.mesh
+    meshes = []
+    for prototype, matrices in zip(prototypes, placements):
+        vertices, triangles = mesh(
+            prototype.Located(TopLoc_Location()), linear_deflection, angular_deflection
+        )
+        meshes.append((vertices, triangles, np.array(matrices)))
+    return meshes
@@ -0,0 +1,235 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import base64
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+from pyoccad.measure.shape import bounds
+
+from .instancing import instanced_mesh
+
+# Linear deflections of the levels of detail, relative to the shape bounding box diagonal
+DEFAULT_DEFLECTIONS = (0.02, 0.005, 0.001)
+
+
+class MeshLevels:
+    """Typed-array meshes of a shape at several levels of detail, from coarse to fine.
+
+    Levels are triangulated on demand with `instanced_mesh`, so instanced sub-shapes (e.g.
+    rotor blades) are meshed and stored once, with the placements of their instances. The
+    triangulations of `shape` itself are left untouched.
+
+    Parameters
+    ----------
+    shape : TopoDS_Shape
+        Shape to mesh, e.g. `FanGeometry.geometry.shape`.
+    deflections : sequence of float, optional
+        Linear deflections of the levels relative to the bounding box diagonal of `shape`;
+        default `DEFAULT_DEFLECTIONS`. They are sorted from coarse to fine.
+    angular_deflection : float, optional
+        Maximum angular deviation (rad); default 0.5.
+    """
+
+    def __init__(self, shape, deflections=DEFAULT_DEFLECTIONS, angular_deflection=0.5):
+        box = np.array(bounds(shape))
+        self.shape = shape
+        self.size = float(np.linalg.norm(box[3:] - box[:3]))
+        self.center = (box[3:] + box[:3]) / 2.0
+        self.deflections = tuple(sorted((d * self.size for d in deflections), reverse=True))
+        self.angular_deflection = angular_deflection
+        self._levels = {}
+
+    def __len__(self):
+        """Return the number of levels of detail."""
+        return len(self.deflections)
+
+    def level(self, index=-1):
+        """Return the meshes of a level of detail.
+
+        Parameters
+        ----------
+        index : int, optional
+            Level index, 0 being the coarsest; default -1 is the finest.
+
+        Returns
+        -------
+        list of tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            For each distinct B-rep, `float32` vertex coordinates `(n, 3)`, `uint32` triangle
+            vertex indices `(m, 3)` and `float32` instance transforms `(k, 4, 4)`.
+        """
+        index = range(len(self))[index]
+        if index not in self._levels:
+            self._levels[index] = [
+                (
+                    vertices.astype(np.float32),
+                    triangles.astype(np.uint32),
+                    matrices.astype(np.float32),
+                )
+                for vertices, triangles, matrices in instanced_mesh(
+                    self.shape, self.deflections[index], self.angular_deflection
+                )
+            ]
+        return self._levels[index]
+
+    def merged(self, index=-1):
+        """Return a level of detail as a single mesh, instances being transformed and merged.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            `float32` vertex coordinates `(n, 3)` and `uint32` triangle indices `(m, 3)`.
+        """
+        return merge_instances(self.level(index))
+
+    def select(self, distance=None, quality=None, tolerance=1e-3):
+        """Return the index of the level of detail to display.
+
+        Parameters
+        ----------
+        distance : float, optional
+            Distance from the camera to the shape; the coarsest level whose deflection seen
+            from this distance is below `tolerance` is selected.
+        quality : float, optional
+            Explicit quality between 0 (coarsest level) and 1 (finest level); it overrides
+            `distance`.
+        tolerance : float, optional
+            Maximum angular size of the deflection seen from the camera (rad); default 1e-3.
+
+        Returns
+        -------
+        int
+            Level index; the finest level if neither `distance` nor `quality` is given.
+        """
+        if quality is not None:
+            return int(round(np.clip(quality, 0.0, 1.0) * (len(self) - 1)))
+        if distance is not None:
+            for index, deflection in enumerate(self.deflections):
+                if deflection <= tolerance * distance:
+                    return index
+        return len(self) - 1
+
+
+def merge_instances(meshes):
+    """Merge instanced meshes, as returned by `MeshLevels.level`, into a single mesh."""
+    vertices, triangles, offset = [], [], 0
+    for points, faces, matrices in meshes:
+        for matrix in matrices:
+            vertices.append(points @ matrix[:3, :3].T + matrix[:3, 3])
+            triangles.append(faces + np.uint32(offset))
+            offset += len(points)
+    if not vertices:
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.uint32)
+    return (
+        np.concatenate(vertices).astype(np.float32),
+        np.concatenate(triangles).astype(np.uint32),
+    )
+
+
+def _padded(data, fill=b"\x00"):
+    return data + fill * (-len(data) % 4)
+
+
+def gltf_document(meshes):
+    """Build a glTF 2.0 document of instanced meshes.
+
+    Each distinct mesh is stored once in the binary buffer and referenced by one node per
+    instance, with its transform as node matrix.
+
+    Parameters
+    ----------
+    meshes : list of tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        Vertex coordinates `(n, 3)`, triangle indices `(m, 3)` and instance transforms
+        `(k, 4, 4)` of each mesh, as returned by `MeshLevels.level`.
+
+    Returns
+    -------
+    tuple[dict, bytes]
+        JSON document, without buffer `uri`, and binary buffer.
+    """
+    document = {
+        "asset": {"version": "2.0", "generator": "twiinIT demos"},
+        "scene": 0,
+        "scenes": [{"nodes": []}],
+        "nodes": [],
+        "meshes": [],
+        "accessors": [],
+        "bufferViews": [],
+        "buffers": [],
+    }
+    buffer = bytearray()
+
+    def add_view(data, target):
+        document["bufferViews"].append(
+            {"buffer": 0, "byteOffset": len(buffer), "byteLength": len(data), "target": target}
+        )
+        buffer.extend(_padded(data))
+        return len(document["bufferViews"]) - 1
+
+    for vertices, triangles, matrices in meshes:
+        vertices = np.ascontiguousarray(vertices, dtype="<f4")
+        triangles = np.ascontiguousarray(triangles, dtype="<u4")
+        if len(vertices) == 0 or len(triangles) == 0:
+            continue
+
+        document["accessors"].append(
+            {
+                "bufferView": add_view(vertices.tobytes(), 34962),
+                "componentType": 5126,
+                "count": len(vertices),
+                "type": "VEC3",
+                "min": vertices.min(axis=0).tolist(),
+                "max": vertices.max(axis=0).tolist(),
+            }
+        )
+        document["accessors"].append(
+            {
+                "bufferView": add_view(triangles.tobytes(), 34963),
+                "componentType": 5125,
+                "count": triangles.size,
+                "type": "SCALAR",
+            }
+        )
+        accessor = len(document["accessors"]) - 2
+        document["meshes"].append(
+            {"primitives": [{"attributes": {"POSITION": accessor}, "indices": accessor + 1}]}
+        )
+
+        for matrix in np.asarray(matrices, dtype=float):
+            node = {"mesh": len(document["meshes"]) - 1}
+            if not np.allclose(matrix, np.eye(4)):
+                # glTF matrices are stored in column-major order
+                node["matrix"] = matrix.T.ravel().tolist()
+            document["scenes"][0]["nodes"].append(len(document["nodes"]))
+            document["nodes"].append(node)
+
+    document["buffers"].append({"byteLength": len(buffer)})
+    return document, bytes(buffer)
+
+
+def write_gltf(meshes, filename):
+    """Write instanced meshes to a glTF file.
+
+    Parameters
+    ----------
+    meshes : list of tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        Meshes as returned by `MeshLevels.level`.
+    filename : str or Path
+        Binary glTF file if the suffix is `.glb`, otherwise JSON glTF file with an embedded
+        buffer.
+    """
+    document, buffer = gltf_document(meshes)
+    path = Path(filename)
+
+    if path.suffix.lower() == ".glb":
+        content = _padded(json.dumps(document, separators=(",", ":")).encode(), b" ")
+        binary = _padded(buffer)
+        chunks = struct.pack("<I4s", len(content), b"JSON") + content
+        chunks += struct.pack("<I4s", len(binary), b"BIN\x00") + binary
+        path.write_bytes(struct.pack("<4sII", b"glTF", 2, 12 + len(chunks)) + chunks)
+    else:
+        encoded = base64.b64encode(buffer).decode()
+        document["buffers"][0]["uri"] = f"data:application/octet-stream;base64,{encoded}"
+        path.write_text(json.dumps(document))
@@ -0,0 +1,132 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+
+def _logistic(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    x = np.exp(x - x.max(axis=1, keepdims=True))
+    return x / x.sum(axis=1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "identity": lambda x: x,
+    "logistic": _logistic,
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "softmax": _softmax,
+}
+
+
+def export_classifier(classifier, filename, mean=None, std=None, features=None):
+    """Write the weights of a trained `MLPClassifier` to a NumPy `.npz` file.
+
+    The file holds plain arrays only: it is loaded by `MLPKernel` without scikit-learn nor
+    unpickling.
+
+    Parameters
+    ----------
+    classifier : sklearn.neural_network.MLPClassifier
+        Trained classifier.
+    filename : str or Path
+        Output `.npz` file.
+    mean, std : pandas.Series or array-like, optional
+        Normalization of the inputs on the training set, e.g. `Xmean` and `Xstd` of
+        notebook 7; default no normalization.
+    features : list of str, optional
+        Input names; default the `mean` index, if any.
+    """
+    n = classifier.n_features_in_
+    if features is None:
+        features = list(getattr(mean, "index", [])) or [f"x{i}" for i in range(n)]
+    layers = {}
+    for i, (weights, bias) in enumerate(zip(classifier.coefs_, classifier.intercepts_)):
+        layers[f"weights_{i}"] = weights
+        layers[f"bias_{i}"] = bias
+    np.savez_compressed(
+        filename,
+        activation=classifier.activation,
+        out_activation=classifier.out_activation_,
+        classes=np.asarray(classifier.classes_),
+        features=np.asarray(features, dtype=str),
+        mean=np.zeros(n) if mean is None else np.asarray(mean, dtype=float),
+        std=np.ones(n) if std is None else np.asarray(std, dtype=float),
+        **layers,
+    )
+
+
+class MLPKernel:
+    """Batched NumPy forward pass of a multi-layer perceptron classifier.
+
+    Drop-in replacement of `MLPClassifier.predict_proba` and `predict` for inference, e.g.
+    with `event_detection.FanEventDetector`; inputs are already normalized.
+
+    Parameters
+    ----------
+    weights, biases : list of numpy.ndarray
+        Weights and biases of the layers.
+    activation : str
+        Hidden layers activation, one of `ACTIVATIONS`.
+    out_activation : str
+        Output layer activation, "logistic" for binary classes or "softmax".
+    classes : array-like
+        Class labels.
+    mean, std : numpy.ndarray, optional
+        Input normalization stored alongside the weights; unused by the forward pass.
+    features : list of str, optional
+        Input names.
+    """
+
+    def __init__(
+        self,
+        weights,
+        biases,
+        activation,
+        out_activation,
+        classes,
+        mean=None,
+        std=None,
+        features=None,
+    ):
+        self.weights = [np.ascontiguousarray(w, dtype=float) for w in weights]
+        self.biases = [np.asarray(b, dtype=float) for b in biases]
+        self.activation = ACTIVATIONS[activation]
+        self.out_activation = ACTIVATIONS[out_activation]
+        self.classes_ = np.asarray(classes)
+        self.mean = mean
+        self.std = std
+        self.features = features
+
+    @classmethod
+    def load(cls, filename):
+        """Load a kernel from a file written by `export_classifier`."""
+        with np.load(filename, allow_pickle=False) as data:
+            layers = sum(name.startswith("weights_") for name in data.files)
+            return cls(
+                [data[f"weights_{i}"] for i in range(layers)],
+                [data[f"bias_{i}"] for i in range(layers)],
+                str(data["activation"]),
+                str(data["out_activation"]),
+                data["classes"],
+                data["mean"],
+                data["std"],
+                data["features"].tolist(),
+            )
+
+    def predict_proba(self, x):
+        """Return the class probabilities of the samples `x` (one per row)."""
+        x = np.asarray(x, dtype=float)
+        for weights, bias in zip(self.weights[:-1], self.biases[:-1]):
+            x = self.activation(x @ weights + bias)
+        y = self.out_activation(x @ self.weights[-1] + self.biases[-1])
+        if y.shape[1] == 1:
+            y = np.hstack([1.0 - y, y])
+        return y
+
+    def predict(self, x):
+        """Return the most probable classes of the samples `x`."""
+        return self.classes_[np.argmax(self.predict_proba(x), axis=1)]
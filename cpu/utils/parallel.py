@@ -0,0 +1,134 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from cosapp.recorders.recorder import BaseRecorder
+from cosapp.utils.find_variables import find_variables
+from cosapp.utils.helpers import is_numerical
+
+_worker = {}
+
+
+def _input_values(system):
+    """Return copies of the input values of `system` and of all its children."""
+    return [
+        (port, name, copy.deepcopy(value))
+        for child in system.tree()
+        for port in child.inputs.values()
+        for name, value in port.items()
+    ]
+
+
+def _init_worker(filename, setup, includes, excludes):
+    """Build the worker system once; it is reused for every case of the worker.
+
+    Its input values after `setup` are saved, and restored before each case, so that a case
+    does not depend on the cases run before it by the same worker.
+    """
+    from cpu.systems import CPUSystem
+
+    system = CPUSystem.load(filename) if filename else CPUSystem("cpu")
+    if setup is not None:
+        setup(system)
+
+    _worker["system"] = system
+    _worker["inputs"] = _input_values(system)
+    _worker["names"] = sorted(
+        find_variables(system, includes, excludes, advanced_filter=is_numerical)
+    )
+
+
+def _run_chunk(names, values, references):
+    """Run a chunk of cases on the worker system and return recorder-like rows."""
+    system = _worker["system"]
+    fields = _worker["names"]
+
+    rows = []
+    for case, reference in zip(values, references):
+        for port, name, value in _worker["inputs"]:
+            port[name] = copy.deepcopy(value)
+        for name, value in zip(names, case):
+            system[name] = value
+        if system.drivers:
+            system.run_drivers()
+        else:
+            system.run_once()
+        rows.append(["", "", "0", reference] + [copy.deepcopy(system[f]) for f in fields])
+
+    return fields, rows
+
+
+def run_sweep(
+    cases,
+    setup=None,
+    filename=None,
+    includes="*",
+    excludes=None,
+    max_workers=None,
+    chunksize=None,
+):
+    """Run a set of cases on `CPUSystem` instances distributed over a process pool.
+
+    Each worker builds its `CPUSystem` once (from `filename` if given), applies `setup`
+    to add drivers, then runs all cases of its chunks in sequence. Unlike `LinearDoE` or
+    `MonteCarlo` on a single system, every case starts from the inputs of the system after
+    `setup` (e.g. the initial temperature of a transient, or the initial guess of a solver),
+    so results do not depend on how cases are distributed over workers.
+
+    Parameters
+    ----------
+    cases : pandas.DataFrame or dict[str, array-like]
+        Input values, one column per variable name and one row per case.
+    setup : callable, optional
+        Function taking the worker system and adding its drivers (e.g. a design solver
+        or a time driver); must be picklable, i.e. defined at module level.
+    filename : str or Path, optional
+        JSON file loaded with `CPUSystem.load`; default `None` builds `CPUSystem("cpu")`.
+    includes : str or list of str, optional
+        Variables to record; default `"*"`.
+    excludes : str or list of str, optional
+        Variables excluded from recording; default `None`.
+    max_workers : int, optional
+        Number of worker processes; default `os.cpu_count()`.
+    chunksize : int, optional
+        Number of cases per task; default splits the cases in four tasks per worker.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Records in the original case order, with the columns of `DataFrameRecorder`.
+    """
+    cases = pd.DataFrame(cases)
+    names = list(cases.columns)
+    values = cases.to_numpy().tolist()
+    references = [str(i) for i in range(len(values))]
+
+    max_workers = max_workers or os.cpu_count()
+    if chunksize is None:
+        chunksize = max(1, int(np.ceil(len(values) / (4 * max_workers))))
+    bounds = range(0, len(values), chunksize)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(filename, setup, includes, excludes),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_chunk, names, values[i : i + chunksize], references[i : i + chunksize]
+            )
+            for i in bounds
+        ]
+        fields, rows = [], []
+        for future in futures:
+            fields, chunk = future.result()
+            rows.extend(chunk)
+
+    specials = BaseRecorder.SPECIALS
+    headers = [specials.section, specials.status, specials.code, specials.reference]
+    return pd.DataFrame(rows, columns=headers + list(fields))
@@ -1,12 +1,30 @@
 # Copyright (C) 2024, twiinIT
 # SPDX-License-Identifier: Apache-2.0
 
+from pathlib import Path
+
 import ipywidgets
 import plotly.graph_objs as go
 
+from ..recorders import read_recording, recording_columns
+
 
 def plot_recorders(recs, pplots, *args, **kwargs):
-    """plot_recorders."""
+    """plot_recorders.
+
+    Values of `recs` may be data frames or recording files (Parquet, Arrow IPC or CSV),
+    of which only the plotted columns are read.
+    """
+    names = {name for r in pplots for p in r for name in p}
+    recs = {
+        n: (
+            read_recording(r, [c for c in recording_columns(r) if c in names])
+            if isinstance(r, (str, Path))
+            else r
+        )
+        for n, r in recs.items()
+    }
+
     plots = []
     for r in pplots:
         r_plots = []
@@ -0,0 +1,245 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .batch import evaluate_batch
+
+SURROGATE_INPUTS = ["T_cpu", "cpu.usage", "fan.T_air"]
+SURROGATE_OUTPUTS = ["cpu.next_T", "exchanger.heat_flow", "fan.tension"]
+
+
+def doe_samples(system, input_vars, outputs=None):
+    """Evaluate `CPUSystem` on a full factorial grid, as `LinearDoE` would.
+
+    Parameters
+    ----------
+    system : CPUSystem
+        System to evaluate; left unchanged.
+    input_vars : dict[str, dict]
+        Grid definition, as given to `LinearDoE.add_input_var`, e.g.
+        `{"fan.T_air": {"lower": 30.0, "upper": 60.0, "count": 31}}`.
+    outputs : list of str, optional
+        Output variable names; default `SURROGATE_OUTPUTS`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per grid point, with input and output columns.
+    """
+    names = list(input_vars)
+    axes = [
+        np.linspace(spec["lower"], spec["upper"], spec.get("count", 2))
+        for spec in input_vars.values()
+    ]
+    grid = np.meshgrid(*axes, indexing="ij")
+    inputs = {name: values.ravel() for name, values in zip(names, grid)}
+    return evaluate_batch(system, inputs, outputs or SURROGATE_OUTPUTS)
+
+
+class PolynomialSurrogate:
+    """Polynomial approximation of `CPUSystem` outputs, fitted on DoE samples.
+
+    Outputs are fitted by least squares on all monomials of the inputs up to `degree`,
+    inputs being scaled to [-1, 1] over the validity domain. The fan controller makes
+    outputs piecewise smooth in `T_cpu`; giving its thresholds as `breakpoints` fits one
+    polynomial per tension regime. The validity domain is the box spanned by the
+    training inputs, restricted to regimes with training samples.
+
+    Parameters
+    ----------
+    inputs : list of str, optional
+        Input variable names; default `SURROGATE_INPUTS`.
+    outputs : list of str, optional
+        Output variable names; default `SURROGATE_OUTPUTS`.
+    degree : int, optional
+        Total polynomial degree; default 3.
+    breakpoints : dict[str, list of float], optional
+        Regime boundaries along one input, e.g. `{"T_cpu": [40.0, 60.0]}`; a value equal
+        to a boundary belongs to the lower regime. Default `None` fits a single polynomial.
+    """
+
+    def __init__(self, inputs=None, outputs=None, degree=3, breakpoints=None):
+        self.inputs = list(inputs or SURROGATE_INPUTS)
+        self.outputs = list(outputs or SURROGATE_OUTPUTS)
+        self.degree = degree
+        self.breakpoints = dict(breakpoints or {})
+        if len(self.breakpoints) > 1:
+            raise ValueError("Regimes may only be defined along one input")
+        for name in self.breakpoints:
+            if name not in self.inputs:
+                raise ValueError(f"Breakpoints are defined on {name!r}, which is not an input")
+
+        dims = len(self.inputs)
+        terms = [
+            np.bincount(combination, minlength=dims)
+            for d in range(degree + 1)
+            for combination in itertools.combinations_with_replacement(range(dims), d)
+        ]
+        self._exponents = np.array(terms, dtype=int).reshape(-1, dims)
+        self.domain = None
+        self.coefficients = None
+
+    @classmethod
+    def for_system(cls, system, inputs=None, outputs=None, degree=3):
+        """Return a surrogate with regimes given by the fan controller thresholds of `system`."""
+        inputs = list(inputs or SURROGATE_INPUTS)
+        breakpoints = None
+        if "T_cpu" in inputs:
+            thresholds = [system.controler.low_threshold, system.controler.high_threshold]
+            breakpoints = {"T_cpu": sorted(thresholds)}
+        return cls(inputs, outputs, degree, breakpoints)
+
+    @property
+    def n_regimes(self):
+        """int: Number of regimes."""
+        return sum(len(values) for values in self.breakpoints.values()) + 1
+
+    def _array(self, values):
+        if isinstance(values, pd.DataFrame):
+            columns = [values[name].to_numpy(dtype=float) for name in self.inputs]
+        else:
+            columns = [np.asarray(values[name], dtype=float) for name in self.inputs]
+        return np.stack(np.broadcast_arrays(*columns), axis=-1).reshape(-1, len(self.inputs))
+
+    def _regimes(self, x):
+        regimes = np.zeros(len(x), dtype=int)
+        for name, values in self.breakpoints.items():
+            column = x[:, self.inputs.index(name)]
+            regimes = np.searchsorted(np.asarray(values, dtype=float), column, side="left")
+        return regimes
+
+    def _features(self, x):
+        lower, upper = self.domain
+        half = np.where(upper > lower, 0.5 * (upper - lower), 1.0)
+        scaled = (x - 0.5 * (upper + lower)) / half
+        powers = [np.ones_like(scaled), scaled]
+        for _ in range(2, self.degree + 1):
+            powers.append(powers[-1] * scaled)
+
+        features = np.empty((len(x), len(self._exponents)))
+        for k, exponents in enumerate(self._exponents):
+            column = features[:, k]
+            column[:] = 1.0
+            for j, e in enumerate(exponents):
+                if e:
+                    column *= powers[e][:, j]
+        return features
+
+    def fit(self, data):
+        """Fit the surrogate on samples, e.g. the records of a `LinearDoE`.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Samples with all `inputs` and `outputs` columns.
+
+        Returns
+        -------
+        PolynomialSurrogate
+            The fitted surrogate itself.
+        """
+        x = self._array(data)
+        y = data[self.outputs].to_numpy(dtype=float)
+        self.domain = (x.min(axis=0), x.max(axis=0))
+
+        features = self._features(x)
+        regimes = self._regimes(x)
+        coefficients = np.full((self.n_regimes, features.shape[1], len(self.outputs)), np.nan)
+        for regime in np.unique(regimes):
+            mask = regimes == regime
+            coefficients[regime] = np.linalg.lstsq(features[mask], y[mask], rcond=None)[0]
+        self.coefficients = coefficients
+        return self
+
+    def _check_fitted(self):
+        if self.coefficients is None:
+            raise RuntimeError("Surrogate must be fitted first")
+
+    def in_domain(self, values):
+        """Return whether input points lie in the validity domain.
+
+        Parameters
+        ----------
+        values : pandas.DataFrame or dict[str, float or array-like]
+            Input values, keyed by variable name.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array, one entry per point.
+        """
+        self._check_fitted()
+        x = self._array(values)
+        lower, upper = self.domain
+        inside = np.all((x >= lower) & (x <= upper), axis=1)
+        fitted = ~np.isnan(self.coefficients[:, 0, 0])
+        return inside & fitted[self._regimes(x)]
+
+    def predict_array(self, values):
+        """Return predicted outputs as an array of shape `(points, outputs)`."""
+        self._check_fitted()
+        x = self._array(values)
+        features = self._features(x)
+        if self.n_regimes == 1:
+            return features @ self.coefficients[0]
+
+        # Evaluating all regimes in a single product is cheaper than masking points
+        predicted = np.einsum("ij,rjk->irk", features, self.coefficients, optimize=True)
+        return predicted[np.arange(len(x)), self._regimes(x)]
+
+    def predict(self, values):
+        """Predict outputs at input points, whether in the validity domain or not.
+
+        Parameters
+        ----------
+        values : pandas.DataFrame or dict[str, float or array-like]
+            Input values, keyed by variable name; they are broadcast against each other.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per point, with output columns.
+        """
+        return pd.DataFrame(self.predict_array(values), columns=self.outputs)
+
+    def error_report(self, system, size=1000, seed=None):
+        """Compare the surrogate with the full model over its validity domain.
+
+        Parameters
+        ----------
+        system : CPUSystem
+            Full model, evaluated with `evaluate_batch`; left unchanged.
+        size : int, optional
+            Number of points drawn uniformly in the validity domain; default 1000.
+        seed : int, optional
+            Random seed.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Maximum and root mean square absolute errors, and the maximum error relative
+            to the output range, one row per output.
+        """
+        self._check_fitted()
+        lower, upper = self.domain
+        x = np.random.default_rng(seed).uniform(lower, upper, (size, len(self.inputs)))
+        inputs = dict(zip(self.inputs, x.T))
+        x = x[self.in_domain(inputs)]
+        inputs = dict(zip(self.inputs, x.T))
+
+        expected = evaluate_batch(system, inputs, self.outputs)[self.outputs].to_numpy()
+        error = np.abs(self.predict_array(inputs) - expected)
+        span = np.ptp(expected, axis=0) if len(x) else np.full(len(self.outputs), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame(
+                {
+                    "max": error.max(axis=0, initial=0.0),
+                    "rms": np.sqrt(np.mean(error**2, axis=0)),
+                    "relative": error.max(axis=0, initial=0.0) / span,
+                },
+                index=pd.Index(self.outputs, name="output"),
+            )
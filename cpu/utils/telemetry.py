@@ -0,0 +1,273 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import platform
+import re
+import subprocess
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from ..recorders import read_recording
+
+Sample = namedtuple("Sample", ["time", "usage", "T_cpu", "fan_rpm", "cores"])
+Sample.__doc__ = """Telemetry sample.
+
+Time (s), CPU usage (%), CPU temperature (degC), first fan speed (rpm) and per-core usages
+(%); values of unavailable sensors are `None`.
+"""
+
+# hwmon chips reporting the CPU temperature, by order of preference
+CPU_TEMPERATURE_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal", "acpitz")
+
+
+def _sensor_index(path):
+    return int(re.search(r"(\d+)_input$", path.name).group(1))
+
+
+def _read_int(fd):
+    return int(os.pread(fd, 32, 0))
+
+
+class HwmonSensors:
+    """Read CPU temperature and fan speeds from Linux `hwmon` sysfs files.
+
+    Sensor files are looked up once and kept open; each reading is a single `pread`.
+
+    Parameters
+    ----------
+    root : str or Path, optional
+        hwmon class directory; default "/sys/class/hwmon".
+    """
+
+    def __init__(self, root="/sys/class/hwmon"):
+        chips = {}
+        for path in sorted(Path(root).glob("hwmon*")):
+            name_file = path / "name"
+            name = name_file.read_text().strip() if name_file.exists() else path.name
+            chips.setdefault(name, path)
+
+        preferred = [name for name in CPU_TEMPERATURE_CHIPS if name in chips]
+        temperatures = []
+        for name in preferred + [name for name in chips if name not in preferred]:
+            temperatures = sorted(chips[name].glob("temp*_input"), key=_sensor_index)
+            if temperatures:
+                break
+        fans = [
+            path
+            for chip in chips.values()
+            for path in sorted(chip.glob("fan*_input"), key=_sensor_index)
+        ]
+
+        self._temperature = os.open(temperatures[0], os.O_RDONLY) if temperatures else None
+        self._fans = [os.open(path, os.O_RDONLY) for path in fans]
+
+    def temperature(self):
+        """Return the CPU package temperature in degC, or `None` without sensor."""
+        if self._temperature is None:
+            return None
+        return _read_int(self._temperature) / 1000.0
+
+    def fan_speeds(self):
+        """Return the speeds of all fans (rpm)."""
+        return [_read_int(fd) for fd in self._fans]
+
+    def close(self):
+        """Close sensor files."""
+        for fd in self._fans + [self._temperature]:
+            if fd is not None:
+                os.close(fd)
+        self._temperature, self._fans = None, []
+
+
+class IStatsSensors:
+    """Read CPU temperature and fan speed with the macOS `istats` command.
+
+    `istats` runs in a subprocess, so it is called at most once per `period` and the last
+    values are returned in between.
+
+    Parameters
+    ----------
+    period : float, optional
+        Minimum time between two `istats` calls (s); default 5.0.
+    """
+
+    def __init__(self, period=5.0):
+        self.period = period
+        self._last = -np.inf
+        self._values = (None, [])
+
+    def _istats(self, sensor):
+        result = subprocess.run(["istats", sensor, "--value-only"], capture_output=True, text=True)
+        return result.stdout.strip().splitlines()
+
+    def _update(self):
+        now = time.perf_counter()
+        if now - self._last < self.period:
+            return
+        self._last = now
+
+        try:
+            temperature = float(self._istats("cpu")[0].replace("°C", "").strip())
+        except (ValueError, IndexError, OSError):
+            temperature = None
+        try:
+            fans = [int(self._istats("fan")[1].replace("RPM", "").strip())]
+        except (ValueError, IndexError, OSError):
+            fans = []
+        self._values = (temperature, fans)
+
+    def temperature(self):
+        """Return the CPU package temperature in degC, or `None` if unavailable."""
+        self._update()
+        return self._values[0]
+
+    def fan_speeds(self):
+        """Return the fan speeds (rpm)."""
+        self._update()
+        return self._values[1]
+
+    def close(self):
+        pass
+
+
+class LiveSource:
+    """Sample the CPU of this machine.
+
+    Per-core usages are read with `psutil` without blocking, as averages since the previous
+    sample; the CPU usage is their mean. Temperature and fan speeds are read with
+    `HwmonSensors` on Linux and `IStatsSensors` on macOS.
+
+    Parameters
+    ----------
+    hwmon_root : str or Path, optional
+        hwmon class directory on Linux; default "/sys/class/hwmon".
+    istats_period : float, optional
+        Minimum time between two `istats` calls on macOS (s); default 5.0.
+    """
+
+    def __init__(self, hwmon_root="/sys/class/hwmon", istats_period=5.0):
+        system = platform.system()
+        if system == "Linux":
+            self.sensors = HwmonSensors(hwmon_root)
+        elif system == "Darwin":
+            self.sensors = IStatsSensors(istats_period)
+        else:
+            self.sensors = None
+        # The first call only sets the reference of the next one
+        psutil.cpu_percent(percpu=True)
+
+    def read(self, elapsed):
+        """Return the sample at `elapsed` time (s)."""
+        cores = np.array(psutil.cpu_percent(percpu=True))
+        temperature, fans = None, []
+        if self.sensors is not None:
+            temperature, fans = self.sensors.temperature(), self.sensors.fan_speeds()
+        return Sample(elapsed, float(cores.mean()), temperature, fans[0] if fans else None, cores)
+
+    def close(self):
+        """Release the sensors."""
+        if self.sensors is not None:
+            self.sensors.close()
+
+
+class ReplaySource:
+    """Replay a recorded telemetry trace, possibly faster than real time.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or str or Path
+        Trace, or CSV, Parquet or Arrow file (see `read_recording`), sorted by time.
+    speed : float, optional
+        Replay speed relative to real time; default 1.0.
+    columns : dict[str, str], optional
+        Trace column of the `time`, `usage`, `T_cpu` and `fan_rpm` sample fields; defaults
+        are the columns written by `monitor_simulation.run_simulation`. Per-core usages
+        are read from columns `cores[0]`, `cores[1]`, etc. if any.
+    """
+
+    COLUMNS = {
+        "time": "time",
+        "usage": "cpu.usage",
+        "T_cpu": "T_cpu_measured",
+        "fan_rpm": "Fan_rpm_1",
+    }
+
+    def __init__(self, data, speed=1.0, columns=None):
+        if not isinstance(data, pd.DataFrame):
+            data = read_recording(data)
+        columns = {**self.COLUMNS, **(columns or {})}
+        cores = [name for name in data.columns if re.fullmatch(r"cores\[\d+\]", name)]
+
+        self.speed = speed
+        self._time = data[columns["time"]].to_numpy(dtype=float)
+        self._values = {
+            field: data[name].to_numpy(dtype=float) if name in data else None
+            for field, name in columns.items()
+            if field != "time"
+        }
+        self._cores = data[cores].to_numpy(dtype=float)
+
+    def read(self, elapsed):
+        """Return the last recorded sample at `elapsed * speed`, or `None` past the trace end."""
+        t = self._time[0] + elapsed * self.speed
+        if t > self._time[-1]:
+            return None
+        i = np.searchsorted(self._time, t, side="right") - 1
+
+        def value(field):
+            values = self._values[field]
+            return None if values is None or np.isnan(values[i]) else float(values[i])
+
+        return Sample(
+            float(self._time[i]), value("usage"), value("T_cpu"), value("fan_rpm"), self._cores[i]
+        )
+
+    def close(self):
+        pass
+
+
+def sample_telemetry(queue, source=LiveSource, rate=10.0, duration=90.0):
+    """Put telemetry samples in `queue` at a fixed rate, then "DONE".
+
+    Samples are taken on a fixed schedule; if reading gets late, missed samples are skipped
+    rather than taken in a burst.
+
+    Parameters
+    ----------
+    queue : multiprocessing.Queue or queue.Queue
+        Queue receiving `Sample` tuples.
+    source : callable, optional
+        Source factory, called in the sampling process, e.g. `LiveSource` (default) or
+        `functools.partial(ReplaySource, "trace.csv", speed=10.0)`.
+    rate : float, optional
+        Sampling rate (Hz); default 10.0.
+    duration : float, optional
+        Sampling duration (s); default 90.0. Replay sources may end earlier.
+    """
+    source = source()
+    period = 1.0 / rate
+    try:
+        t0 = time.perf_counter()
+        k = 0
+        while k * period < duration:
+            delay = t0 + k * period - time.perf_counter()
+            if delay > 0.0:
+                time.sleep(delay)
+            elif delay < -period:
+                k = int((time.perf_counter() - t0) / period) + 1
+                continue
+
+            sample = source.read(k * period)
+            if sample is None:
+                break
+            queue.put(sample)
+            k += 1
+    finally:
+        source.close()
+        queue.put("DONE")
@@ -0,0 +1,399 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pandas as pd
+from cosapp.core.eval_str import EvalString
+from cosapp.recorders.recorder import BaseRecorder
+
+from cpu.systems.cpu import thermal_power
+from cpu.systems.fan import fan_mass_flow
+from cpu.systems.fancontroller import tension_schedule
+from cpu.systems.heatexchanger import heat_conductivity
+
+PARAMETERS = [
+    "controler.high_threshold",
+    "controler.low_tension",
+    "controler.low_threshold",
+    "controler.max_tension",
+    "controler.medium_tension",
+    "cpu.expected_next_T",
+    "cpu.heat_capacity",
+    "cpu.tdp",
+    "cpu.usage",
+    "exchanger.cp",
+    "exchanger.h_adder",
+    "exchanger.h_forced",
+    "exchanger.h_natural",
+    "exchanger.max_mass_flow",
+    "exchanger.surface",
+    "fan.T_air",
+    "fan.design_tension",
+    "fan.mass_flow_max",
+    "fan.mass_flow_scalar",
+]
+
+# Stage time fractions and weights of the explicit schemes used by cosapp time drivers
+SCHEMES = {
+    1: (np.r_[0.0], np.r_[1.0]),
+    2: (np.r_[0.0, 2.0 / 3.0], np.r_[0.25, 0.75]),
+    3: (np.r_[0.0, 1.0, 2.0] / 3.0, np.r_[0.25, 0.0, 0.75]),
+    4: (np.r_[0.0, 0.5, 0.5, 1.0], np.r_[1.0, 2.0, 2.0, 1.0] / 6.0),
+}
+
+
+def system_parameters(system):
+    """Return the current values of `CPUSystem` free inputs, keyed by `PARAMETERS` names."""
+    return {name: system[name] for name in PARAMETERS}
+
+
+def evaluate_state(T_cpu, p):
+    """Evaluate every `CPUSystem` variable for CPU temperature(s) `T_cpu`.
+
+    Parameters
+    ----------
+    T_cpu : float or numpy.ndarray
+        CPU temperature.
+    p : dict[str, float or numpy.ndarray]
+        Values of `PARAMETERS`, broadcast against `T_cpu`.
+
+    Returns
+    -------
+    dict[str, float or numpy.ndarray]
+        Variable values, keyed by the names recorded by `DataFrameRecorder(includes=["*"])`.
+    """
+    tension = tension_schedule(
+        T_cpu,
+        p["controler.low_threshold"],
+        p["controler.high_threshold"],
+        p["controler.low_tension"],
+        p["controler.medium_tension"],
+        p["controler.max_tension"],
+    )
+    mass_flow = fan_mass_flow(
+        tension, p["fan.design_tension"], p["fan.mass_flow_max"], p["fan.mass_flow_scalar"]
+    )
+    h = heat_conductivity(
+        mass_flow,
+        p["exchanger.max_mass_flow"],
+        p["exchanger.h_natural"],
+        p["exchanger.h_forced"],
+        p["exchanger.h_adder"],
+    )
+    heat_flow = h * (T_cpu - p["fan.T_air"]) * p["exchanger.surface"]
+    power = thermal_power(p["cpu.usage"], p["cpu.tdp"])
+    balance = power - heat_flow
+
+    return {
+        **p,
+        "T_cpu": T_cpu,
+        "controler.T_cpu": T_cpu,
+        "controler.tension": tension,
+        "cpu.T": T_cpu,
+        "cpu.heat_flow": heat_flow,
+        "cpu.heat_flow_balance": balance,
+        "cpu.next_T": balance / p["cpu.heat_capacity"] + T_cpu,
+        "cpu.power": power,
+        "exchanger.T_cpu": T_cpu,
+        "exchanger.fl_in.T": p["fan.T_air"],
+        "exchanger.fl_in.mass_flow": mass_flow,
+        "exchanger.fl_out.T": p["fan.T_air"] + heat_flow / p["exchanger.cp"],
+        "exchanger.fl_out.mass_flow": mass_flow,
+        "exchanger.h": h,
+        "exchanger.heat_flow": heat_flow,
+        "fan.fl_out.T": p["fan.T_air"],
+        "fan.fl_out.mass_flow": mass_flow,
+        "fan.tension": tension,
+    }
+
+
+def sample_scenario(values, times):
+    """Sample scenario values on an array of times.
+
+    Values may be constants, callables of time (e.g. `Interpolator`), `(time, value)`
+    tables, or string expressions of `time` as used in `set_scenario`, evaluated with the
+    functions and constants of cosapp expressions (e.g. `"100 * exp(-time)"`).
+    """
+    symbols = {**EvalString.available_symbols(), "np": np}
+    samples = {}
+    for name, value in values.items():
+        if isinstance(value, str):
+            expression = compile(value, name, "eval")
+            sample = [eval(expression, symbols, {"time": t}) for t in times.ravel()]
+        elif callable(value):
+            sample = [np.asarray(value(t)).item() for t in times.ravel()]
+        elif np.ndim(value) == 2:
+            table = np.asarray(value, dtype=float)
+            sample = np.interp(times, table[:, 0], table[:, 1])
+        else:
+            sample = np.broadcast_to(np.asarray(value, dtype=float), times.shape)
+        samples[name] = np.asarray(sample, dtype=float).reshape(times.shape)
+
+    return samples
+
+
+def _stage_coefficients(p):
+    """Precompute the terms of `dT/dt = b - a(T) * (T - T_air)` for the three tension levels."""
+    C = p["cpu.heat_capacity"]
+    b = thermal_power(p["cpu.usage"], p["cpu.tdp"]) / C
+
+    a = []
+    for level in ("low_tension", "medium_tension", "max_tension"):
+        mass_flow = fan_mass_flow(
+            p[f"controler.{level}"],
+            p["fan.design_tension"],
+            p["fan.mass_flow_max"],
+            p["fan.mass_flow_scalar"],
+        )
+        h = heat_conductivity(
+            mass_flow,
+            p["exchanger.max_mass_flow"],
+            p["exchanger.h_natural"],
+            p["exchanger.h_forced"],
+            p["exchanger.h_adder"],
+        )
+        a.append(h * p["exchanger.surface"] / C)
+
+    return b, a, p["fan.T_air"], p["controler.low_threshold"], p["controler.high_threshold"]
+
+
+def _as_list(values, n):
+    return np.broadcast_to(values, (n,)).tolist()
+
+
+def _time_grid(t0, t1, dt, period=None):
+    """Return the step times of a cosapp time driver and the indices of the recorded ones.
+
+    Steps of `dt` are shortened to end on each recording time `t0 + k * period` and on
+    `t1`, as in `EulerExplicit` or `RungeKutta`; default `period` only records `t0` and
+    `t1`. Remainders shorter than `1e-3 * dt` are neglected, as by cosapp.
+    """
+    period = period or t1 - t0
+    n_records = max(1, int(np.ceil((t1 - t0) / period - 1e-3 * dt / period)))
+    bounds = np.minimum(t0 + period * np.arange(n_records + 1), t1)
+    counts = np.maximum(1, np.ceil(np.diff(bounds) / dt - 1e-3)).astype(int)
+    starts = np.r_[0, np.cumsum(counts)]
+    offsets = np.arange(starts[-1]) - np.repeat(starts[:-1], counts)
+    times = np.r_[np.repeat(bounds[:-1], counts) + dt * offsets, t1]
+    return times, starts
+
+
+def integrate_transient(system, time_interval, dt, init=None, values=None, order=1, period=None):
+    """Integrate the `CPUSystem` thermal transient without the cosapp driver tree.
+
+    The only state is `T_cpu`, with `dT_cpu/dt = cpu.heat_flow_balance / cpu.heat_capacity`.
+    The scenario is sampled once on every stage time, the right-hand side is reduced to
+    precomputed coefficients and the state is advanced in a plain Python loop with the same
+    explicit schemes as `EulerExplicit` (`order=1`) and `RungeKutta` (`order=2..4`).
+
+    Parameters
+    ----------
+    system : CPUSystem
+        System providing the default parameter values; left unchanged.
+    time_interval : tuple[float, float]
+        Start and end times.
+    dt : float
+        Time step; steps are shortened to end on recording times and on the end time, as
+        by cosapp time drivers.
+    init : dict[str, Any], optional
+        Initial values, e.g. `{"T_cpu": 10.0, "exchanger.h_adder": -30.0}`.
+    values : dict[str, Any], optional
+        Scenario values, as in `set_scenario` (see `sample_scenario`).
+    order : int, optional
+        1 for explicit Euler, 2 to 4 for cosapp Runge-Kutta schemes; default 1.
+    period : float, optional
+        Recording period; default `dt`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Trajectory with the columns of `DataFrameRecorder(includes=["*"])`.
+    """
+    p = system_parameters(system)
+    init = dict(init or {})
+    T = float(init.pop("T_cpu", system.T_cpu))
+    p.update(init)
+
+    times, recorded = _time_grid(*time_interval, dt, period or dt)
+    n = len(times) - 1
+    fracs, weights = SCHEMES[order]
+
+    stage_times = times[:-1, None] + np.diff(times)[:, None] * fracs
+    samples = sample_scenario(values or {}, stage_times)
+    stages = []
+    for j in range(len(fracs)):
+        b, a, T_air, low, high = _stage_coefficients(
+            {**p, **{name: sample[:, j] for name, sample in samples.items()}}
+        )
+        stages.append(
+            (
+                _as_list(b, n),
+                [_as_list(c, n) for c in a],
+                _as_list(T_air, n),
+                _as_list(low, n),
+                _as_list(high, n),
+            )
+        )
+
+    hs = np.diff(times).tolist()
+    steps = fracs[1:].tolist()
+    weights = weights.tolist()
+    trajectory = [T]
+    for i in range(n):
+        h = hs[i]
+        k = []
+        for j, (b, a, T_air, low, high) in enumerate(stages):
+            x = T if j == 0 else T + h * steps[j - 1] * k[-1]
+            level = 0 if x <= low[i] else (1 if x <= high[i] else 2)
+            k.append(b[i] - a[level][i] * (x - T_air[i]))
+        T += h * sum(w * ki for w, ki in zip(weights, k))
+        trajectory.append(T)
+
+    p.update(sample_scenario(values or {}, times[recorded]))
+    return make_records(np.asarray(trajectory)[recorded], times[recorded], p)
+
+
+def make_records(T_cpu, times, p, references=None):
+    """Build a `DataFrameRecorder`-like frame from a temperature trajectory."""
+    state = evaluate_state(T_cpu, p)
+    specials = BaseRecorder.SPECIALS
+    columns = {
+        specials.section: "",
+        specials.status: "",
+        specials.code: "0",
+        specials.reference: (
+            references if references is not None else [f"t={t}" for t in times.ravel()]
+        ),
+    }
+    columns.update(
+        {name: np.broadcast_to(state[name], times.shape).ravel() for name in sorted(state)}
+    )
+    columns["time"] = times.ravel()
+    return pd.DataFrame(columns)
+
+
+def sample_members(values, times, size):
+    """Sample per-member scenario values on an array of times.
+
+    A list or 1D array holds one entry per member (number, expression or callable);
+    identical entries are sampled once. Any other value is shared by all members.
+
+    Returns
+    -------
+    dict[str, tuple[numpy.ndarray, numpy.ndarray or None]]
+        For each name, samples of shape `times.shape + (n_unique,)` and the member
+        indices into the last axis (`None` when it already broadcasts over members).
+    """
+    samples = {}
+    for name, value in values.items():
+        if not isinstance(value, (list, tuple, np.ndarray)) or np.ndim(value) != 1:
+            samples[name] = (sample_scenario({name: value}, times)[name][..., None], None)
+            continue
+        if len(value) != size:
+            raise ValueError(f"{name!r} has {len(value)} entries for {size} members")
+        if np.issubdtype(np.asarray(value).dtype, np.number):
+            table = np.broadcast_to(np.asarray(value, dtype=float), times.shape + (size,))
+            samples[name] = (table, None)
+            continue
+
+        unique, index = {}, []
+        for spec in value:
+            key = spec if isinstance(spec, (str, int, float)) else id(spec)
+            index.append(unique.setdefault(key, (len(unique), spec))[0])
+        table = np.stack(
+            [sample_scenario({name: spec}, times)[name] for _, spec in unique.values()], axis=-1
+        )
+        samples[name] = (table, np.asarray(index))
+
+    return samples
+
+
+def _members_at(samples, *index):
+    return {
+        name: table[index] if members is None else table[index][members]
+        for name, (table, members) in samples.items()
+    }
+
+
+def integrate_ensemble(
+    system, time_interval, dt, init=None, values=None, order=1, period=None, size=None
+):
+    """Integrate many `CPUSystem` thermal transients at once as arrays.
+
+    Member `T_cpu` states are stored in one vector and advanced together by vectorized
+    Euler or Runge-Kutta steps (see `integrate_transient`). Initial values and scenario
+    values may differ per member (see `sample_members`).
+
+    Parameters
+    ----------
+    system : CPUSystem
+        System providing the default parameter values; left unchanged.
+    time_interval : tuple[float, float]
+        Start and end times.
+    dt : float
+        Time step, shortened as in `integrate_transient`.
+    init : dict[str, Any], optional
+        Initial values; array values hold one entry per member.
+    values : dict[str, Any], optional
+        Scenario values; lists or 1D arrays hold one entry per member.
+    order : int, optional
+        1 for explicit Euler, 2 to 4 for cosapp Runge-Kutta schemes; default 1.
+    period : float, optional
+        Recording period; default `None` only records final states.
+    size : int, optional
+        Number of members; default inferred from `init` and `values`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Records with the columns of `DataFrameRecorder(includes=["*"])`; one row per
+        member referenced by its index (as a `LinearDoE` would record each case) or, if
+        `period` is given, one row per member and recorded time with a `member` column.
+    """
+    values = dict(values or {})
+    init = dict(init or {})
+    if size is None:
+        lengths = [len(v) for v in (*init.values(), *values.values()) if np.ndim(v) == 1]
+        size = max(lengths, default=1)
+
+    p = system_parameters(system)
+    T = np.broadcast_to(np.asarray(init.pop("T_cpu", system.T_cpu), dtype=float), (size,))
+    T = T.copy()
+    p.update({name: np.asarray(value, dtype=float) for name, value in init.items()})
+
+    times, indices = _time_grid(*time_interval, dt, period)
+    n = len(times) - 1
+    hs = np.diff(times)
+    fracs, weights = SCHEMES[order]
+    samples = sample_members(values, times[:-1, None] + hs[:, None] * fracs, size)
+
+    is_recorded = np.zeros(n + 1, dtype=bool)
+    is_recorded[indices] = True
+    trajectory = [T.copy()]
+    steps = fracs[1:]
+    for i in range(n):
+        h = hs[i]
+        k = []
+        for j in range(len(fracs)):
+            b, a, T_air, low, high = _stage_coefficients({**p, **_members_at(samples, i, j)})
+            x = T if j == 0 else T + h * steps[j - 1] * k[-1]
+            a = np.where(x <= low, a[0], np.where(x <= high, a[1], a[2]))
+            k.append(b - a * (x - T_air))
+        T = T + h * sum(w * ki for w, ki in zip(weights, k))
+        if is_recorded[i + 1]:
+            trajectory.append(T)
+
+    recorded = times[indices]
+    if period is None:
+        final = {**p, **_members_at(sample_members(values, times[-1:], size), 0)}
+        references = [str(m) for m in range(size)]
+        return make_records(T, np.full(size, times[-1]), final, references)
+
+    # Member-major (member, time) grids, flattened by `make_records`
+    trajectory = np.stack(trajectory, axis=1)
+    grid = {name: v[:, None] if np.ndim(v) == 1 else v for name, v in p.items()}
+    for name, (table, members) in sample_members(values, recorded, size).items():
+        grid[name] = table.T if members is None else table.T[members]
+    frame = make_records(trajectory, np.broadcast_to(recorded, trajectory.shape), grid)
+    frame.insert(4, "member", np.repeat(np.arange(size), len(recorded)))
+    return frame
@@ -0,0 +1,282 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import multiprocessing
+import queue as queues
+import time
+from collections.abc import Mapping
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Fixed-width fields of telemetry samples (see `telemetry.Sample`), per-core usages aside
+SAMPLE_FIELDS = ["time", "usage", "T_cpu", "fan_rpm"]
+
+_WRITTEN, _READ, _DROPPED, _CLOSED = range(4)
+
+
+class _Transport:
+    """Stream of fixed-width float records between a producer and a consumer process.
+
+    Items are put as sequences (in `fields` order, followed by the per-core values if
+    `cores` is not 0) or mappings, `None` values being stored as NaN. Putting "DONE" ends
+    the stream. Counters of written, read and dropped records are shared by both ends.
+    """
+
+    def __init__(self, fields, cores=0, block=False):
+        self.fields = list(fields)
+        self.cores = cores
+        self.block = block
+        self.dtype = np.dtype(
+            [(name, "f8") for name in self.fields] + ([("cores", "f8", (cores,))] if cores else [])
+        )
+        self._items = []
+        self._done = False
+
+    def _next_batch(self, timeout):
+        if self._done:
+            return None
+        batch = self._get_batch(timeout)
+        self._done = batch is None
+        return batch
+
+    def _record(self, item):
+        record = np.full((), np.nan, dtype=self.dtype)
+        if isinstance(item, Mapping):
+            values = [item.get(name) for name in self.fields]
+            cores = item.get("cores")
+        else:
+            values = list(item[: len(self.fields)])
+            cores = item[len(self.fields)] if len(item) > len(self.fields) else None
+        for name, value in zip(self.fields, values):
+            if value is not None:
+                record[name] = value
+        if self.cores and cores is not None:
+            cores = np.ravel(cores)[: self.cores]
+            record["cores"][: len(cores)] = cores
+        return record
+
+    def put(self, item):
+        """Send `item`; "DONE" closes the stream.
+
+        If the consumer lags and the transport is full, the record is dropped and counted,
+        unless the transport blocks until there is room.
+        """
+        if isinstance(item, str) and item == "DONE":
+            self.close()
+        else:
+            self._put(self._record(item))
+
+    def get(self, timeout=None):
+        """Return the next record as a tuple (NaN values as `None`), or "DONE" at the end.
+
+        Raises
+        ------
+        queue.Empty
+            If no record arrived within `timeout`.
+        """
+        while not self._items:
+            batch = self._next_batch(timeout)
+            if batch is None:
+                return "DONE"
+            self._items = batch.tolist()[::-1]
+        values = self._items.pop()
+        values = tuple(None if v != v else v for v in values[: len(self.fields)]) + tuple(
+            np.array(v) for v in values[len(self.fields) :]
+        )
+        return values
+
+    def batches(self, timeout=None):
+        """Yield structured arrays of the records received until the end of the stream."""
+        if self._items:
+            yield np.array([tuple(v) for v in self._items[::-1]], dtype=self.dtype)
+            self._items = []
+        while True:
+            batch = self._next_batch(timeout)
+            if batch is None:
+                return
+            if len(batch):
+                yield batch
+
+    def read_frame(self, timeout=None):
+        """Read all records until the end of the stream into a pandas.DataFrame.
+
+        Per-core values are split into `cores[0]`, `cores[1]`, etc. columns.
+        """
+        batches = list(self.batches(timeout))
+        records = np.concatenate(batches) if batches else np.empty(0, dtype=self.dtype)
+        data = pd.DataFrame({name: records[name] for name in self.fields})
+        for i in range(self.cores):
+            data[f"cores[{i}]"] = records["cores"][:, i]
+        return data
+
+    def stats(self):
+        """Return the numbers of records `written`, `read` and `dropped` and the `lag`.
+
+        Dropped records are not counted as written; `lag` is the number of records written
+        but not read yet.
+        """
+        written, read, dropped = (int(self._counters[i]) for i in (_WRITTEN, _READ, _DROPPED))
+        return {"written": written, "read": read, "dropped": dropped, "lag": written - read}
+
+
+class QueueTransport(_Transport):
+    """Send records in batches over a `multiprocessing.Queue`.
+
+    Records are pickled by batches: a batch is sent once `batch_size` records are buffered,
+    or when a record is put `max_delay` after the previous batch was sent, so slow streams
+    are sent record by record.
+
+    Parameters
+    ----------
+    fields : list of str
+        Record field names.
+    cores : int, optional
+        Width of the per-core values field; default 0 means no such field.
+    batch_size : int, optional
+        Maximum number of records per batch; default 64.
+    max_delay : float, optional
+        Maximum time between two batches while records are put (s); default 0.1.
+    maxsize : int, optional
+        Maximum number of batches in the queue; default 1024.
+    block : bool, optional
+        Wait for room in a full queue rather than drop the batch; default `False`.
+    """
+
+    def __init__(self, fields, cores=0, batch_size=64, max_delay=0.1, maxsize=1024, block=False):
+        super().__init__(fields, cores, block)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue = multiprocessing.Queue(maxsize)
+        self._counters = multiprocessing.Array("q", 3, lock=False)
+        self._buffer = np.empty(batch_size, dtype=self.dtype)
+        self._size = 0
+        self._sent = time.perf_counter()
+
+    def __getstate__(self):
+        """Pickle the queue and settings only; the copy starts with empty batches."""
+        state = self.__dict__.copy()
+        state.update(
+            _buffer=np.empty(self.batch_size, dtype=self.dtype), _size=0, _items=[], _done=False
+        )
+        return state
+
+    def _put(self, record):
+        self._buffer[self._size] = record
+        self._size += 1
+        self._counters[_WRITTEN] += 1
+        if self._size == self.batch_size or time.perf_counter() - self._sent >= self.max_delay:
+            self.flush()
+
+    def flush(self):
+        """Send buffered records."""
+        if self._size == 0:
+            return
+        batch = self._buffer[: self._size].copy()
+        self._size = 0
+        self._sent = time.perf_counter()
+        try:
+            self._queue.put(batch, block=self.block)
+        except queues.Full:
+            self._counters[_WRITTEN] -= len(batch)
+            self._counters[_DROPPED] += len(batch)
+
+    def close(self):
+        """Send buffered records and end the stream."""
+        self.flush()
+        self._queue.put(None)
+
+    def _get_batch(self, timeout):
+        batch = self._queue.get(timeout=timeout)
+        if batch is not None:
+            self._counters[_READ] += len(batch)
+        return batch
+
+
+class SharedMemoryTransport(_Transport):
+    """Send records through a ring buffer in shared memory, without pickling.
+
+    The transport is created by the parent process, passed to the producer and consumer
+    processes, which attach to the shared memory block, and released by `unlink` once
+    consumed. It supports a single producer and a single consumer.
+
+    Parameters
+    ----------
+    fields : list of str
+        Record field names.
+    cores : int, optional
+        Width of the per-core values field; default 0 means no such field.
+    capacity : int, optional
+        Number of records of the ring buffer; default 4096.
+    block : bool, optional
+        Wait for room in a full buffer rather than drop the record; default `False`.
+    poll_interval : float, optional
+        Sleep time between two checks of a waiting end (s); default 1e-3.
+    """
+
+    def __init__(self, fields, cores=0, capacity=4096, block=False, poll_interval=1e-3):
+        super().__init__(fields, cores, block)
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+        size = 32 + capacity * self.dtype.itemsize
+        self._memory = shared_memory.SharedMemory(create=True, size=size)
+        self._attach()
+        self._counters[:] = 0
+
+    def _attach(self):
+        self._counters = np.ndarray(4, dtype=np.int64, buffer=self._memory.buf)
+        self._records = np.ndarray(
+            self.capacity, dtype=self.dtype, buffer=self._memory.buf, offset=32
+        )
+
+    def __getstate__(self):
+        """Pickle the shared memory name, the copy re-attaches to the same ring buffer."""
+        state = self.__dict__.copy()
+        del state["_counters"], state["_records"]
+        state.update(_memory=self._memory.name, _items=[], _done=False)
+        return state
+
+    def __setstate__(self, state):
+        """Re-attach to the shared memory of the pickled transport."""
+        self.__dict__.update(state)
+        self._memory = shared_memory.SharedMemory(name=state["_memory"])
+        self._attach()
+
+    def _put(self, record):
+        counters = self._counters
+        while counters[_WRITTEN] - counters[_READ] >= self.capacity:
+            if not self.block:
+                counters[_DROPPED] += 1
+                return
+            time.sleep(self.poll_interval)
+        self._records[counters[_WRITTEN] % self.capacity] = record
+        # The record is complete before the consumer can see it
+        counters[_WRITTEN] += 1
+
+    def close(self):
+        """End the stream."""
+        self._counters[_CLOSED] = 1
+
+    def _get_batch(self, timeout):
+        counters = self._counters
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while counters[_READ] == counters[_WRITTEN]:
+            # Records written before closing are read first
+            if counters[_CLOSED] and counters[_READ] == counters[_WRITTEN]:
+                return None
+            if deadline is not None and time.perf_counter() > deadline:
+                raise queues.Empty
+            time.sleep(self.poll_interval)
+
+        start, stop = int(counters[_READ]), int(counters[_WRITTEN])
+        indices = np.arange(start, stop) % self.capacity
+        batch = self._records[indices]
+        counters[_READ] = stop
+        return batch
+
+    def unlink(self):
+        """Release the shared memory block; to be called once by the creating process."""
+        self._counters = self._records = None
+        self._memory.close()
+        self._memory.unlink()
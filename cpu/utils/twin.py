@@ -0,0 +1,261 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import math
+import queue as queues
+import time
+from collections import deque
+
+import numpy as np
+
+from cpu.systems import CPUSystem
+
+from .transient import evaluate_state, system_parameters
+
+POLICIES = ("aggregate", "drop")
+
+# Fields of the simulation results, and of the twin results
+RESULT_FIELDS = ["time", "cpu.usage", "T_cpu_simulated", "T_cpu_measured", "Fan_rpm_1"]
+TWIN_FIELDS = RESULT_FIELDS + ["residual"]
+
+
+def _mean(values):
+    """Mean of the available values, or `None` if all are missing."""
+    values = [value for value in values if value is not None]
+    return float(np.mean(values)) if values else None
+
+
+class RateLimitedSink:
+    """Print (or write) at most one result line per `interval`.
+
+    Parameters
+    ----------
+    interval : float, optional
+        Minimum time between two lines (s); default 1.0.
+    write : callable, optional
+        Line writer; default `print`.
+    """
+
+    def __init__(self, interval=1.0, write=print):
+        self.interval = interval
+        self.write = write
+        self.skipped = 0
+        self._last = -math.inf
+
+    def __call__(self, result, lag=0):
+        now = time.perf_counter()
+        if now - self._last < self.interval:
+            self.skipped += 1
+            return
+        self._last = now
+        self.write(
+            f"[SIM] t={result['time']:.1f}s | usage={result['cpu.usage']:.1f}% | "
+            f"T_sim={result['T_cpu_simulated']:.2f}°C | T_meas={result['T_cpu_measured']} | "
+            f"Fan_rpm={result['Fan_rpm_1']} | lag={lag}"
+        )
+
+
+class TwinRunner:
+    """Run a `CPUSystem` digital twin in real time on a stream of telemetry samples.
+
+    Each tick takes the samples received since the previous one and advances the CPU
+    temperature with the compiled model of `transient.evaluate_state`, integrating
+    `heat_flow_balance / heat_capacity` over the time elapsed between samples. If the
+    twin falls behind, the pending samples are merged into a single tick ("aggregate",
+    with the mean usage, measured temperature and fan speed of the samples, at the time of
+    the last one) or all but the last one are ignored ("drop"), so the cost of a tick does
+    not grow with the backlog.
+
+    Parameters
+    ----------
+    system : CPUSystem, optional
+        System providing the model parameters (controller, fan, exchanger, CPU inputs);
+        default a new `CPUSystem`.
+    parameters : dict[str, float], optional
+        Values overriding those of `system`, keyed by `transient.PARAMETERS` names.
+    policy : str, optional
+        Backlog policy, "aggregate" (default) or "drop".
+    deadline : float, optional
+        Maximum tick duration (s); longer ticks are counted as overruns. Default 0.01.
+    max_step : float, optional
+        Maximum integration step (s); longer intervals are integrated in several steps.
+        Default 1.0.
+    sink : callable, optional
+        Called with each result and the current backlog, e.g. `RateLimitedSink()`.
+    window : int, optional
+        Number of last ticks the latency percentiles and residual statistics are computed
+        on; default 1000.
+    """
+
+    def __init__(
+        self,
+        system=None,
+        parameters=None,
+        policy="aggregate",
+        deadline=0.01,
+        max_step=1.0,
+        sink=None,
+        window=1000,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; expected one of {POLICIES}")
+        system = CPUSystem("cpu") if system is None else system
+        self.parameters = {**system_parameters(system), **(parameters or {})}
+        self.initial_T = system["T_cpu"]
+        self.policy = policy
+        self.deadline = deadline
+        self.max_step = max_step
+        self.sink = sink
+
+        self.T = None
+        self.time = None
+        self.samples = 0
+        self.ticks = 0
+        self.merged = 0
+        self.overruns = 0
+        self._latencies = deque(maxlen=window)
+        self._residuals = deque(maxlen=window)
+        self._backlogs = deque(maxlen=window)
+
+    def step(self, t, usage, measured_T=None, fan_rpm=None):
+        """Advance the twin to time `t` and return the result of the tick.
+
+        The twin starts from the first measured temperature, if any.
+
+        Returns
+        -------
+        dict[str, float]
+            `TWIN_FIELDS` values, `residual` being the simulated minus measured temperature.
+        """
+        p = {**self.parameters, "cpu.usage": usage}
+        if self.T is None:
+            self.T = self.initial_T if measured_T is None else measured_T
+            self.time = t
+
+        duration = t - self.time
+        n = max(1, math.ceil(duration / self.max_step))
+        dt = duration / n
+        for _ in range(n):
+            state = evaluate_state(self.T, p)
+            self.T = self.T + dt * state["cpu.heat_flow_balance"] / p["cpu.heat_capacity"]
+        self.time = t
+
+        residual = math.nan if measured_T is None else self.T - measured_T
+        return dict(zip(TWIN_FIELDS, (t, usage, self.T, measured_T, fan_rpm, residual)))
+
+    def _tick(self, samples):
+        start = time.perf_counter()
+        if len(samples) > 1 and self.policy == "aggregate":
+            t = samples[-1][0]
+            usage, measured_T, fan_rpm = (
+                _mean([sample[i] for sample in samples]) for i in (1, 2, 3)
+            )
+        else:
+            t, usage, measured_T, fan_rpm = samples[-1][:4]
+        result = self.step(t, usage, measured_T, fan_rpm)
+
+        self.samples += len(samples)
+        self.merged += len(samples) - 1
+        self.ticks += 1
+        latency = time.perf_counter() - start
+        self.overruns += latency > self.deadline
+        self._latencies.append(latency)
+        self._backlogs.append(len(samples) - 1)
+        if not math.isnan(result["residual"]):
+            self._residuals.append(result["residual"])
+        return result
+
+    def run(self, samples, results=None, timeout=None):
+        """Process samples from a queue or transport until "DONE".
+
+        Parameters
+        ----------
+        samples : multiprocessing.Queue or transport
+            Source of `telemetry.Sample`-like tuples, ended by "DONE".
+        results : queue or transport, optional
+            Receives the result of each tick, then "DONE".
+        timeout : float, optional
+            Maximum wait for a sample (s); default `None` waits forever.
+
+        Returns
+        -------
+        dict
+            Final `metrics`, with the `stats` of `samples` prefixed by "transport_" if it is
+            a transport.
+        """
+        done = False
+        while not done:
+            pending = [samples.get(timeout=timeout)]
+            # Take every sample already received
+            while not (isinstance(pending[-1], str) and pending[-1] == "DONE"):
+                try:
+                    pending.append(samples.get(timeout=0))
+                except queues.Empty:
+                    break
+            if isinstance(pending[-1], str) and pending[-1] == "DONE":
+                done = True
+                pending.pop()
+            if not pending:
+                continue
+
+            result = self._tick(pending)
+            if results is not None:
+                results.put(result)
+            if self.sink is not None:
+                self.sink(result, len(pending) - 1)
+
+        if results is not None:
+            results.put("DONE")
+        metrics = self.metrics()
+        if hasattr(samples, "stats"):
+            metrics.update({f"transport_{k}": v for k, v in samples.stats().items()})
+        return metrics
+
+    def metrics(self):
+        """Return the runner metrics.
+
+        Returns
+        -------
+        dict[str, float]
+            Numbers of `samples`, `ticks`, `merged` samples and deadline `overruns`, step
+            latency percentiles `latency_p50`, `latency_p90`, `latency_p99` and
+            `latency_max` (s), `backlog_mean` and `backlog_max` (samples pending at a tick),
+            and `residual_mean` and `residual_rms` (degC), over the last ticks.
+        """
+        metrics = {
+            "samples": self.samples,
+            "ticks": self.ticks,
+            "merged": self.merged,
+            "overruns": self.overruns,
+        }
+        latencies = np.array(self._latencies)
+        for q in (50, 90, 99):
+            metrics[f"latency_p{q}"] = np.percentile(latencies, q) if latencies.size else np.nan
+        metrics["latency_max"] = latencies.max() if latencies.size else np.nan
+        backlogs = np.array(self._backlogs)
+        metrics["backlog_mean"] = backlogs.mean() if backlogs.size else np.nan
+        metrics["backlog_max"] = backlogs.max() if backlogs.size else np.nan
+        residuals = np.array(self._residuals)
+        metrics["residual_mean"] = residuals.mean() if residuals.size else np.nan
+        metrics["residual_rms"] = np.sqrt(np.mean(residuals**2)) if residuals.size else np.nan
+        return metrics
+
+
+def run_twin(samples, results=None, metrics=None, **options):
+    """Run a `TwinRunner` on `samples`, e.g. as a `multiprocessing.Process` target.
+
+    Parameters
+    ----------
+    samples : multiprocessing.Queue or transport
+        Telemetry samples, ended by "DONE".
+    results : queue or transport, optional
+        Receives the results, e.g. a `QueueTransport` of `RESULT_FIELDS` records.
+    metrics : queue, optional
+        Receives the final metrics dictionary.
+    **options
+        `TwinRunner` keyword arguments; `sink` defaults to a `RateLimitedSink()`.
+    """
+    options.setdefault("sink", RateLimitedSink())
+    final = TwinRunner(**options).run(samples, results)
+    if metrics is not None:
+        metrics.put(final)
@@ -0,0 +1,258 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from cpu.systems import CPUSystem
+
+from .calibration import FLEET_UNKNOWNS
+from .telemetry import ReplaySource
+from .transient import PARAMETERS, evaluate_state, system_parameters
+
+# Fields of the telemetry batches served to a `TwinHost`
+BATCH_FIELDS = ["machine", "time", "usage", "T_cpu"]
+
+
+def concat_batches(batches):
+    """Concatenate telemetry batches, dictionaries of `BATCH_FIELDS` arrays."""
+    return {
+        name: np.concatenate([np.asarray(batch[name]) for batch in batches])
+        for name in BATCH_FIELDS
+    }
+
+
+class TwinHost:
+    """Serve the digital twins of many machines from one process.
+
+    Twin states are stored as structure of arrays, one entry per machine: time, CPU
+    temperature, last usage, measured temperature and residual, and the per-machine model
+    parameters (`FLEET_UNKNOWNS` by default, e.g. as calibrated by `calibrate_fleet`).
+    Each tick advances every machine with new samples in a single vectorized step of the
+    compiled model of `transient.evaluate_state`; samples of the same machine within a
+    batch are merged (mean usage, last time and temperature), as with the "aggregate"
+    policy of `TwinRunner`.
+
+    Parameters
+    ----------
+    machines : list
+        Machine identifiers.
+    system : CPUSystem, optional
+        System providing the common model parameters; default a new `CPUSystem`.
+    parameters : pandas.DataFrame, optional
+        Per-machine parameter values indexed by machine, with `transient.PARAMETERS` columns,
+        e.g. the result of `calibrate_fleet`; other columns are ignored.
+    max_step : float, optional
+        Maximum integration step (s); default 1.0.
+    window : int, optional
+        Number of last ticks the latency percentiles are computed on; default 1000.
+    """
+
+    def __init__(self, machines, system=None, parameters=None, max_step=1.0, window=1000):
+        system = CPUSystem("cpu") if system is None else system
+        self.machines = list(machines)
+        self._index = pd.Index(self.machines)
+        self.max_step = max_step
+        self.initial_T = system["T_cpu"]
+
+        n = len(self.machines)
+        self.parameters = system_parameters(system)
+        for name in FLEET_UNKNOWNS:
+            self.parameters[name] = np.full(n, float(self.parameters[name]))
+        if parameters is not None:
+            self.set_parameters(parameters)
+
+        self.time = np.full(n, np.nan)
+        self.T = np.full(n, np.nan)
+        self.usage = np.full(n, np.nan)
+        self.measured_T = np.full(n, np.nan)
+        self.residual = np.full(n, np.nan)
+        self.samples = np.zeros(n, dtype=np.int64)
+
+        self.ticks = 0
+        self._latencies = deque(maxlen=window)
+
+    def set_parameters(self, parameters):
+        """Set per-machine parameter values from a DataFrame indexed by machine."""
+        index = self.indices(parameters.index)
+        for name in parameters.columns.intersection(PARAMETERS):
+            values = self.parameters[name]
+            if np.ndim(values) == 0:
+                values = self.parameters[name] = np.full(len(self.machines), float(values))
+            values[index] = parameters[name].to_numpy(dtype=float)
+
+    def indices(self, machines):
+        """Return the state indices of `machines`."""
+        index = self._index.get_indexer(machines)
+        if np.any(index < 0):
+            unknown = np.asarray(machines)[index < 0]
+            raise KeyError(f"Unknown machines {sorted(set(unknown.tolist()))}")
+        return index
+
+    def tick(self, batch):
+        """Advance the twins of the machines with samples in `batch`.
+
+        Parameters
+        ----------
+        batch : dict[str, array-like]
+            Telemetry samples, as `BATCH_FIELDS` arrays; unknown temperatures are NaN.
+
+        Returns
+        -------
+        numpy.ndarray
+            State indices of the updated machines.
+        """
+        start = time.perf_counter()
+        index = self.indices(batch["machine"])
+        if index.size == 0:
+            return index
+        t = np.asarray(batch["time"], dtype=float)
+        usage = np.asarray(batch["usage"], dtype=float)
+        measured = np.asarray(batch["T_cpu"], dtype=float)
+
+        # Merge samples per machine: mean usage, last sample time and temperature
+        order = np.lexsort((t, index))
+        machines, first, counts = np.unique(index[order], return_index=True, return_counts=True)
+        last = order[first + counts - 1]
+        usage = np.add.reduceat(usage[order], first) / counts
+        t, measured = t[last], measured[last]
+
+        T = self.T[machines]
+        fresh = np.isnan(T)
+        T[fresh] = np.where(np.isnan(measured[fresh]), self.initial_T, measured[fresh])
+        previous = np.where(fresh, t, self.time[machines])
+
+        p = {
+            name: value[machines] if np.ndim(value) else value
+            for name, value in self.parameters.items()
+        }
+        p["cpu.usage"] = usage
+        # Same steps as `TwinRunner.step`: machines with fewer steps stop early
+        duration = t - previous
+        n = np.maximum(1, np.ceil(duration / self.max_step))
+        dt = duration / n
+        for k in range(int(n.max())):
+            state = evaluate_state(T, p)
+            dT = dt * state["cpu.heat_flow_balance"] / p["cpu.heat_capacity"]
+            T = T + np.where(k < n, dT, 0.0)
+
+        self.T[machines] = T
+        self.time[machines] = t
+        self.usage[machines] = usage
+        self.measured_T[machines] = measured
+        self.residual[machines] = T - measured
+        self.samples[machines] += counts
+        self.ticks += 1
+        self._latencies.append(time.perf_counter() - start)
+        return machines
+
+    def snapshot(self):
+        """Return the current twin states as a DataFrame indexed by machine."""
+        return pd.DataFrame(
+            {
+                "time": self.time,
+                "cpu.usage": self.usage,
+                "T_cpu_simulated": self.T,
+                "T_cpu_measured": self.measured_T,
+                "residual": self.residual,
+                "samples": self.samples,
+                **{name: self.parameters[name] for name in FLEET_UNKNOWNS},
+            },
+            index=self._index,
+        )
+
+    def metrics(self):
+        """Return the numbers of `ticks` and `samples`, and tick latency percentiles (s)."""
+        latencies = np.array(self._latencies)
+        metrics = {"ticks": self.ticks, "samples": int(self.samples.sum())}
+        for q in (50, 90, 99):
+            metrics[f"latency_p{q}"] = np.percentile(latencies, q) if latencies.size else np.nan
+        metrics["latency_max"] = latencies.max() if latencies.size else np.nan
+        residuals = self.residual[~np.isnan(self.residual)]
+        metrics["residual_rms"] = np.sqrt(np.mean(residuals**2)) if residuals.size else np.nan
+        return metrics
+
+    async def serve(self, queue, on_tick=None):
+        """Advance the twins as telemetry batches arrive, until a `None` batch.
+
+        Batches queued while a tick runs are concatenated into the next one.
+
+        Parameters
+        ----------
+        queue : asyncio.Queue
+            Telemetry batches (see `tick`), ended by `None`.
+        on_tick : callable, optional
+            Called with the host and the updated state indices after each tick.
+
+        Returns
+        -------
+        dict
+            Final `metrics`.
+        """
+        done = False
+        while not done:
+            batches = [await queue.get()]
+            while not queue.empty():
+                batches.append(queue.get_nowait())
+            if None in batches:
+                done = True
+                batches = batches[: batches.index(None)]
+            if batches:
+                updated = self.tick(concat_batches(batches))
+                if on_tick is not None:
+                    on_tick(self, updated)
+            # Let producers run between ticks
+            await asyncio.sleep(0)
+        return self.metrics()
+
+
+async def replay_traces(queue, traces, speed=1.0, rate=10.0, columns=None):
+    """Replay recorded traces of many machines as telemetry batches, then put `None`.
+
+    Local stand-in for the telemetry of a rack: each trace is played by a `ReplaySource`
+    and the new samples of all machines are put as one batch per period.
+
+    Parameters
+    ----------
+    queue : asyncio.Queue
+        Queue receiving the batches (see `TwinHost.tick`).
+    traces : dict
+        Trace of each machine: pandas.DataFrame or CSV, Parquet or Arrow file.
+    speed : float, optional
+        Replay speed relative to real time; default 1.0.
+    rate : float, optional
+        Batch rate (Hz); default 10.0.
+    columns : dict[str, str], optional
+        Trace columns, see `ReplaySource`.
+    """
+    sources = {machine: ReplaySource(trace, speed, columns) for machine, trace in traces.items()}
+    last = {machine: None for machine in sources}
+    period = 1.0 / rate
+    t0 = time.perf_counter()
+    k = 0
+    while sources:
+        await asyncio.sleep(max(0.0, t0 + k * period - time.perf_counter()))
+        rows = []
+        for machine, source in list(sources.items()):
+            sample = source.read(k * period)
+            if sample is None:
+                del sources[machine]
+            elif sample.time != last[machine]:
+                last[machine] = sample.time
+                rows.append((machine, sample.time, sample.usage, sample.T_cpu))
+        if rows:
+            machines, times, usage, T_cpu = zip(*rows)
+            await queue.put(
+                {
+                    "machine": np.array(machines),
+                    "time": np.array(times),
+                    "usage": np.array(usage, dtype=float),
+                    "T_cpu": np.array([np.nan if T is None else T for T in T_cpu]),
+                }
+            )
+        k += 1
+    await queue.put(None)
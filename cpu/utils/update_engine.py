@@ -0,0 +1,156 @@
+# Copyright (C) 2024, twiinIT
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+import time
+
+
+class UpdateEngine:
+    """Apply coalesced input changes to a system in a background thread.
+
+    Changes submitted while the worker is busy are merged, only the latest value of each
+    variable being kept, and applied in a single rebuild once the current one is over.
+    The display is therefore at most one rebuild behind the inputs, however fast they
+    change. After each rebuild, `publish(False)` is called for a quick preview; if no
+    change arrives within `refine_delay`, `publish(True)` is called for the final
+    display, unless a newer change cancels it.
+
+    Only the worker thread modifies `system` once the engine is started, so callbacks
+    must go through `submit` rather than set values themselves. The engine is stopped by
+    `close`, or on leaving a `with` block. With a `loop`, e.g. the
+    kernel event loop of a notebook, `publish` is called on that loop rather than in the
+    worker thread, and the final display is scheduled there after `refine_delay`; a call
+    is skipped if a newer change is already pending or being applied.
+
+    Parameters
+    ----------
+    system : cosapp.systems.System
+        System to update, e.g. `FanGeometry`.
+    publish : callable
+        Called with a `final` flag once `system` is up to date, in the worker thread or on
+        `loop`.
+    delay : float, optional
+        Time the first change of a burst waits for following ones before the rebuild (s);
+        default 0.05.
+    refine_delay : float, optional
+        Time without change after which the final display is published (s); default 0.3.
+    loop : asyncio.AbstractEventLoop, optional
+        Event loop `publish` is called on; default `None` calls it in the worker thread.
+    """
+
+    def __init__(self, system, publish, delay=0.05, refine_delay=0.3, loop=None):
+        self.system = system
+        self.publish = publish
+        self.delay = delay
+        self.refine_delay = refine_delay
+        self.loop = loop
+        self.rebuilds = 0
+        self.error = None
+
+        self._pending = {}
+        self._changes = 0
+        self._busy = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, **changes):
+        """Request new values of `system` variables, e.g. `**{"rotor.count": 7}`."""
+        with self._condition:
+            self._pending.update(changes)
+            self._changes += 1
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """Wait until all changes are applied and, without `loop`, published.
+
+        Returns `False` on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not (self._pending or self._busy) or self._closed, timeout
+            )
+
+    def close(self):
+        """Stop and join the worker thread; pending changes are dropped.
+
+        The owner of the engine, e.g. the display it updates, must close it once done. Closing
+        again is a no-op.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        """Return the running engine."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the engine, see `close`."""
+        self.close()
+
+    def _publish(self, final):
+        try:
+            self.publish(final)
+        except Exception as error:  # keep serving later changes
+            self.error = error
+
+    def _publish_on_loop(self, changes, final):
+        """Publish on `loop` unless a newer change is pending or being applied."""
+        with self._condition:
+            if changes != self._changes or self._busy or self._closed:
+                return
+            # Hold the condition so the worker cannot start a rebuild meanwhile
+            self._publish(final)
+        if not final:
+            self.loop.call_later(self.refine_delay, self._publish_on_loop, changes, True)
+
+    def _idle(self):
+        with self._condition:
+            self._busy = False
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                self._busy = True
+
+            # Let the burst of events go on, then take the latest values only
+            time.sleep(self.delay)
+            with self._condition:
+                changes, self._pending = self._pending, {}
+                count = self._changes
+
+            try:
+                for name, value in changes.items():
+                    self.system[name] = value
+                if self.system.drivers:
+                    self.system.run_drivers()
+                else:
+                    self.system.run_once()
+                self.rebuilds += 1
+                self.error = None
+            except Exception as error:  # keep serving later changes
+                self.error = error
+                self._idle()
+                continue
+
+            if self.loop is not None:
+                self._idle()
+                self.loop.call_soon_threadsafe(self._publish_on_loop, count, False)
+                continue
+
+            self._publish(False)
+            with self._condition:
+                changed = self._condition.wait_for(
+                    lambda: self._pending or self._closed, self.refine_delay
+                )
+            if not changed:
+                self._publish(True)
+            self._idle()